@@ -0,0 +1,251 @@
+"""Benchmarks of Controller matching and cursor planning on synthetic screens.
+
+OCR, input and eye tracking are replaced with fakes, and sleeps are skipped, so that
+timings reflect only the work done by gaze_ocr and screen_ocr matching. Results are
+written as JSON. If a baseline file from an earlier run is provided, exits with
+status 1 when any scenario's fastest time regressed by more than the tolerance.
+
+Usage:
+    uv run python benchmarks/controller_benchmark.py [--output results.json]
+        [--baseline previous.json] [--sizes 100 1000 5000 20000]
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from collections.abc import Callable, Generator
+from typing import Any, Optional, cast
+from unittest import mock
+
+import screen_ocr
+from screen_ocr import _base
+
+import gaze_ocr
+
+DEFAULT_SIZES = (100, 1000, 5000, 20000)
+WORDS_PER_LINE = 12
+CHAR_WIDTH = 8
+LINE_HEIGHT = 20
+TEXT_HEIGHT = 16
+# Planted on the middle line, so that they are nearest the center of the screen.
+# Filler words are built from syllables that never form these words.
+PLANTED_WORDS = ["zephyr", "quixotic", "jukebox", "wavering", "blossom"]
+_SYLLABLES = ["ba", "co", "de", "fi", "go", "hu", "ka", "le", "mo", "ni", "pa", "ro"]
+
+
+class FakeReader:
+    """Returns the same screen contents for every read."""
+
+    radius = 200
+    search_radius = 125
+    confidence_threshold = 0.5
+    homophones: dict[str, str] = {}
+
+    def __init__(self, screen_contents: screen_ocr.ScreenContents):
+        self.screen_contents = screen_contents
+
+    def read_screen(self, bounding_box=None):
+        return self.screen_contents
+
+    def read_current_window(self):
+        return self.screen_contents
+
+    def read_nearby(self, screen_coordinates, search_radius=None, crop_radius=None):
+        return self.screen_contents
+
+
+class FakeAppActions:
+    def focus_at(self, x: int, y: int):
+        pass
+
+    def peek_left(self) -> Optional[str]:
+        return "a "
+
+    def peek_right(self) -> Optional[str]:
+        return " a"
+
+
+def synthetic_screen_contents(
+    word_count: int, seed: int = 0
+) -> screen_ocr.ScreenContents:
+    """Return ScreenContents with word_count words of filler text, with
+    PLANTED_WORDS in order on the middle line."""
+    rng = random.Random(seed)
+    texts = [
+        "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(1, 4)))
+        for _ in range(word_count)
+    ]
+    line_count = -(-word_count // WORDS_PER_LINE)
+    middle = (line_count // 2) * WORDS_PER_LINE
+    texts[middle : middle + len(PLANTED_WORDS)] = PLANTED_WORDS
+    texts = texts[:word_count]
+    lines = []
+    right = 0
+    for line_index in range(line_count):
+        words = []
+        left = 0
+        for text in texts[
+            line_index * WORDS_PER_LINE : (line_index + 1) * WORDS_PER_LINE
+        ]:
+            width = len(text) * CHAR_WIDTH
+            words.append(
+                _base.OcrWord(text, left, line_index * LINE_HEIGHT, width, TEXT_HEIGHT)
+            )
+            left += width + CHAR_WIDTH
+        right = max(right, left)
+        lines.append(_base.OcrLine(words))
+    return screen_ocr.ScreenContents(
+        screen_coordinates=None,
+        bounding_box=(0, 0, right, line_count * LINE_HEIGHT),
+        screenshot=None,
+        result=_base.OcrResult(lines),
+        confidence_threshold=FakeReader.confidence_threshold,
+        homophones=FakeReader.homophones,
+        search_radius=None,
+    )
+
+
+def _complete(generator: Generator[Any, Any, Any]) -> Any:
+    try:
+        while True:
+            next(generator)
+    except StopIteration as e:
+        return e.value
+
+
+# Scenarios return a truthy value if the planted text was found.
+SCENARIOS: dict[str, Callable[[gaze_ocr.Controller], Any]] = {
+    "move_text_cursor_to_words": lambda controller: (
+        controller.move_text_cursor_to_words("quixotic jukebox", "after")
+    ),
+    "move_text_cursor_to_longest_prefix": lambda controller: (
+        controller.move_text_cursor_to_longest_prefix("zephyr quixotic unseen")[0]
+    ),
+    "move_text_cursor_to_longest_suffix": lambda controller: (
+        controller.move_text_cursor_to_longest_suffix("unseen wavering blossom")[0]
+    ),
+    "move_text_cursor_to_difference": lambda controller: _complete(
+        controller.move_text_cursor_to_difference_generator(
+            "zephyr quixotic unseen jukebox wavering", disambiguate=False
+        )
+    ),
+    "select_text": lambda controller: (
+        controller.select_text("quixotic", end_words="wavering")
+    ),
+    "select_matching_text": lambda controller: (
+        controller.select_matching_text("zephyr quixotic unseen wavering blossom")
+    ),
+}
+
+
+def run_benchmarks(
+    sizes: tuple[int, ...] = DEFAULT_SIZES, repeat: int = 5
+) -> dict[str, Any]:
+    """Time each scenario on screens of each size, returning JSON-serializable
+    results."""
+    results = []
+    # Sleeps only wait for the UI to settle.
+    with mock.patch("time.sleep"):
+        for size in sizes:
+            screen_contents = synthetic_screen_contents(size)
+            for name, scenario in SCENARIOS.items():
+                controller = gaze_ocr.Controller(
+                    cast(screen_ocr.Reader, FakeReader(screen_contents)),
+                    eye_tracker=None,
+                    mouse=gaze_ocr.ReplayMouse(),
+                    keyboard=gaze_ocr.ReplayKeyboard(),
+                    app_actions=FakeAppActions(),
+                )
+                try:
+                    # Warm up caches of compiled regexes and homophones.
+                    found = bool(scenario(controller))
+                    controller.stats.reset()
+                    timings = []
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        scenario(controller)
+                        timings.append(time.perf_counter() - start)
+                    stage_latencies = controller.stats.snapshot()["latency"]
+                finally:
+                    controller.shutdown()
+                results.append(
+                    {
+                        "scenario": name,
+                        "words": size,
+                        "found": found,
+                        "repeat": repeat,
+                        "min_seconds": min(timings),
+                        "median_seconds": statistics.median(timings),
+                        "mean_seconds": statistics.fmean(timings),
+                        "stage_seconds": {
+                            stage: latency["total_seconds"] / repeat
+                            for stage, latency in stage_latencies.items()
+                            if latency["count"]
+                        },
+                    }
+                )
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def find_regressions(
+    results: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Return descriptions of scenarios whose fastest time exceeds the baseline by
+    more than the tolerance fraction."""
+    baseline_times = {
+        (result["scenario"], result["words"]): result["min_seconds"]
+        for result in baseline["results"]
+    }
+    regressions = []
+    for result in results["results"]:
+        key = (result["scenario"], result["words"])
+        if key not in baseline_times:
+            continue
+        if result["min_seconds"] > baseline_times[key] * (1 + tolerance):
+            regressions.append(
+                f"{key[0]} ({key[1]} words): {result['min_seconds']:.6f}s vs. "
+                f"{baseline_times[key]:.6f}s"
+            )
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write JSON here instead of stdout.")
+    parser.add_argument("--baseline", help="JSON from an earlier run to compare.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown relative to the baseline, as a fraction.",
+    )
+    args = parser.parse_args(argv)
+    results = run_benchmarks(tuple(args.sizes), repeat=args.repeat)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = find_regressions(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1 +1,18 @@
+from ._async import AsyncController  # noqa: F401
+from ._data_writer import DataWriter, ImageFormat  # noqa: F401
+from ._disk_cache import PersistentOcrReader  # noqa: F401
 from ._gaze_ocr import *  # noqa: F403
+from ._matching import PhraseMatch, TokenIndex, match_phrases, token_index  # noqa: F401
+from ._recording import (  # noqa: F401
+    ReplayEyeTracker,
+    ReplayKeyboard,
+    ReplayMouse,
+    ReplayReader,
+    SessionRecorder,
+    load_session,
+    replay_session,
+)
+from ._speculation import SpeculativeReader  # noqa: F401
+from ._stats import LatencyHistogram, OcrStats  # noqa: F401
+from ._tiles import DirtyTileReader, ParallelTileReader  # noqa: F401
+from ._tracing import Tracer  # noqa: F401
@@ -0,0 +1,217 @@
+"""Asyncio interface to Controller."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Generator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from screen_ocr import ScreenContents
+
+from ._gaze_ocr import Controller, CursorLocation
+from ._matching import Phrase
+
+Disambiguator = Callable[[Sequence[CursorLocation]], Awaitable[CursorLocation]]
+
+
+def _step(generator: Generator, value: Any) -> tuple[bool, Any]:
+    """Advance the generator, returning (done, yielded or returned value).
+    StopIteration can't be propagated through a Future."""
+    try:
+        return False, generator.send(value)
+    except StopIteration as e:
+        return True, e.value
+
+
+class AsyncController:
+    """Coroutine versions of the Controller commands.
+
+    OCR, screenshots and input run on a single worker thread, so that the event loop
+    stays responsive and commands never run concurrently. Only one AsyncController
+    should wrap a Controller, and the Controller shouldn't be used directly while
+    commands are running.
+
+    If disambiguate is provided, commands pass it the candidate cursor locations
+    when there is more than one match and move to the awaited choice. Otherwise,
+    the match nearest the gaze point is used. It can also be provided per command.
+
+    Arguments of each command are the same as the corresponding Controller method.
+    """
+
+    def __init__(
+        self, controller: Controller, disambiguate: Optional[Disambiguator] = None
+    ):
+        self.controller = controller
+        self.disambiguate = disambiguate
+        # Separate from the Controller's prefetch worker, which commands wait on.
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="gaze_ocr_async"
+        )
+
+    def start_reading_nearby(
+        self, time_ranges: Optional[Sequence[tuple[float, float]]] = None
+    ) -> None:
+        """Start OCR nearby the gaze point in a worker thread. Doesn't block."""
+        self.controller.start_reading_nearby(time_ranges)
+
+    async def read_nearby(
+        self,
+        time_range: Optional[tuple[float, float]] = None,
+        words: Optional[str] = None,
+    ) -> ScreenContents:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.controller.read_nearby, time_range, words
+        )
+
+    async def move_cursor_to_words(
+        self,
+        words: str,
+        *args,
+        disambiguate: Optional[Disambiguator] = None,
+        **kwargs,
+    ) -> Optional[tuple[int, int]]:
+        return await self._run(
+            self.controller.move_cursor_to_words_generator,
+            disambiguate,
+            words,
+            *args,
+            **kwargs,
+        )
+
+    async def move_text_cursor_to_words(
+        self,
+        words: str,
+        *args,
+        disambiguate: Optional[Disambiguator] = None,
+        **kwargs,
+    ) -> Optional[CursorLocation]:
+        return await self._run(
+            self.controller.move_text_cursor_to_words_generator,
+            disambiguate,
+            words,
+            *args,
+            **kwargs,
+        )
+
+    async def move_text_cursor_to_phrases(
+        self,
+        phrases: Sequence[Phrase],
+        *args,
+        disambiguate: Optional[Disambiguator] = None,
+        **kwargs,
+    ) -> tuple[Optional[CursorLocation], Optional[str]]:
+        return await self._run(
+            self.controller.move_text_cursor_to_phrases_generator,
+            disambiguate,
+            phrases,
+            *args,
+            **kwargs,
+        )
+
+    async def move_text_cursor_to_longest_prefix(
+        self,
+        words: str,
+        *args,
+        disambiguate: Optional[Disambiguator] = None,
+        **kwargs,
+    ) -> tuple[Optional[CursorLocation], int]:
+        return await self._run(
+            self.controller.move_text_cursor_to_longest_prefix_generator,
+            disambiguate,
+            words,
+            *args,
+            **kwargs,
+        )
+
+    async def move_text_cursor_to_longest_suffix(
+        self,
+        words: str,
+        *args,
+        disambiguate: Optional[Disambiguator] = None,
+        **kwargs,
+    ) -> tuple[Optional[CursorLocation], int]:
+        return await self._run(
+            self.controller.move_text_cursor_to_longest_suffix_generator,
+            disambiguate,
+            words,
+            *args,
+            **kwargs,
+        )
+
+    async def move_text_cursor_to_difference(
+        self,
+        words: str,
+        *args,
+        disambiguate: Optional[Disambiguator] = None,
+        **kwargs,
+    ) -> Optional[tuple[int, int]]:
+        return await self._run(
+            self.controller.move_text_cursor_to_difference_generator,
+            disambiguate,
+            words,
+            *args,
+            **kwargs,
+        )
+
+    async def select_text(
+        self,
+        start_words: str,
+        *args,
+        disambiguate: Optional[Disambiguator] = None,
+        **kwargs,
+    ) -> Optional[CursorLocation]:
+        return await self._run(
+            self.controller.select_text_generator,
+            disambiguate,
+            start_words,
+            *args,
+            **kwargs,
+        )
+
+    async def select_matching_text(
+        self,
+        words: str,
+        *args,
+        disambiguate: Optional[Disambiguator] = None,
+        **kwargs,
+    ) -> Optional[tuple[int, int]]:
+        return await self._run(
+            self.controller.select_matching_text_generator,
+            disambiguate,
+            words,
+            *args,
+            **kwargs,
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker thread and the Controller's background OCR."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+        self.controller.shutdown(wait=wait)
+
+    async def _run(
+        self,
+        generator_function: Callable[..., Generator],
+        disambiguate: Optional[Disambiguator],
+        words: Any,
+        *args,
+        **kwargs,
+    ) -> Any:
+        disambiguate = disambiguate or self.disambiguate
+        loop = asyncio.get_running_loop()
+        # Creating the generator doesn't run any of the command.
+        generator = generator_function(words, disambiguate is not None, *args, **kwargs)
+        done = False
+        try:
+            done, value = await loop.run_in_executor(
+                self._executor, _step, generator, None
+            )
+            while not done:
+                assert disambiguate
+                choice = await disambiguate(value)
+                done, value = await loop.run_in_executor(
+                    self._executor, _step, generator, choice
+                )
+        finally:
+            if not done:
+                # Cancelled, e.g. while waiting for disambiguation.
+                await loop.run_in_executor(self._executor, generator.close)
+        return value
@@ -0,0 +1,202 @@
+"""Background writer for screenshots and queries saved for debugging."""
+
+import collections
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from enum import Enum, auto
+from typing import Any, Optional
+
+from screen_ocr import ScreenContents
+
+# Matches files written by DataWriter, e.g. "success_1700000000.00.png".
+_FILE_NAME_PATTERN = re.compile(
+    r"^(?P<prefix>(?:success|multiple|failure)_\d+\.\d+)\.(?:png|bmp|txt)$"
+)
+
+
+class ImageFormat(Enum):
+    # PNG with Pillow's default compression.
+    PNG = auto()
+    # PNG with minimal compression, which is several times faster to encode.
+    FAST_PNG = auto()
+    # Uncompressed bitmap, which is fastest to write but largest.
+    RAW = auto()
+
+
+class DataWriter:
+    """Saves screenshots with the queried words in a worker thread.
+
+    Each capture is written as a screenshot and a text file named by result and
+    time. Captures are queued so that encoding doesn't delay commands; if
+    max_queue_size captures are pending, new captures are dropped and counted in
+    dropped. If max_captures or max_bytes are set, the oldest captures in the
+    directory (including those from earlier sessions) are deleted to stay within
+    them.
+
+    Image format and cropping options only apply to Pillow screenshots; other
+    screenshots are written whole as PNG.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        image_format: ImageFormat = ImageFormat.PNG,
+        crop_to_search_area: bool = False,
+        max_queue_size: int = 8,
+        max_captures: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        self.directory = directory
+        self.image_format = image_format
+        # Only save the area searched around the gaze point.
+        self.crop_to_search_area = crop_to_search_area
+        self.max_captures = max_captures
+        self.max_bytes = max_bytes
+        self.dropped = 0
+        self._queue: queue.Queue[Optional[tuple[ScreenContents, str, str, float]]] = (
+            queue.Queue(maxsize=max_queue_size)
+        )
+        self._stop = threading.Event()
+        # Paths and total size of each capture on disk, oldest first. Only accessed
+        # by the worker thread.
+        self._captures: collections.deque[tuple[list[str], int]] = collections.deque()
+        self._total_bytes = 0
+        self._thread = threading.Thread(
+            target=self._run, name="gaze_ocr_data_writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, screen_contents: ScreenContents, words: str, result: str) -> bool:
+        """Queue a capture for writing. Returns False if it was dropped."""
+        try:
+            self._queue.put_nowait((screen_contents, words, result, time.time()))
+        except queue.Full:
+            self.dropped += 1
+            logging.debug("Dropped data capture: writer queue is full.")
+            return False
+        return True
+
+    def flush(self) -> None:
+        """Block until all queued captures are written."""
+        self._queue.join()
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the worker thread. If wait is True, queued captures are written
+        first; otherwise they are discarded."""
+        if not wait:
+            self._stop.set()
+        try:
+            self._queue.put(None, block=wait)
+        except queue.Full:
+            # The worker checks _stop after each capture.
+            pass
+        if wait:
+            self._thread.join()
+
+    def _run(self) -> None:
+        try:
+            self._load_existing_captures()
+        except OSError:
+            logging.exception("Failed to list existing data captures.")
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None or self._stop.is_set():
+                    return
+                try:
+                    self._write(*item)
+                    self._enforce_retention()
+                except Exception:
+                    logging.exception("Failed to write data capture.")
+            finally:
+                self._queue.task_done()
+
+    def _write(
+        self, screen_contents: ScreenContents, words: str, result: str, timestamp: float
+    ) -> None:
+        path_prefix = os.path.join(self.directory, f"{result}_{timestamp:.2f}")
+        paths = []
+        screenshot = screen_contents.screenshot
+        if screenshot is not None:
+            paths.append(self._save_image(screen_contents, screenshot, path_prefix))
+        with open(path_prefix + ".txt", "w") as file:
+            file.write(words)
+        paths.append(path_prefix + ".txt")
+        size = sum(os.path.getsize(path) for path in paths)
+        self._captures.append((paths, size))
+        self._total_bytes += size
+
+    def _save_image(
+        self, screen_contents: ScreenContents, screenshot: Any, path_prefix: str
+    ) -> str:
+        if not hasattr(screenshot, "save"):
+            screenshot.write_file(path_prefix + ".png")
+            return path_prefix + ".png"
+        if self.crop_to_search_area:
+            screenshot = self._crop(screen_contents, screenshot)
+        if self.image_format == ImageFormat.RAW:
+            screenshot.save(path_prefix + ".bmp")
+            return path_prefix + ".bmp"
+        elif self.image_format == ImageFormat.FAST_PNG:
+            screenshot.save(path_prefix + ".png", compress_level=1)
+        else:
+            screenshot.save(path_prefix + ".png")
+        return path_prefix + ".png"
+
+    @staticmethod
+    def _crop(screen_contents: ScreenContents, screenshot: Any) -> Any:
+        """Return the part of the screenshot within the search radius of the gaze
+        point, if known."""
+        if not screen_contents.screen_coordinates or not screen_contents.search_radius:
+            return screenshot
+        x, y = screen_contents.screen_coordinates
+        radius = screen_contents.search_radius
+        left, top, right, bottom = screen_contents.bounding_box
+        width, height = screenshot.size
+        # Screenshots are cropped along with their contents (see _merging.cropped),
+        # so the origin is the top-left of the bounding box. High-DPI screenshots
+        # have more pixels than the box.
+        scale_x = width / max(1, right - left)
+        scale_y = height / max(1, bottom - top)
+        box = (
+            max(0, round((x - radius - left) * scale_x)),
+            max(0, round((y - radius - top) * scale_y)),
+            min(width, round((x + radius - left) * scale_x)),
+            min(height, round((y + radius - top) * scale_y)),
+        )
+        if box[0] >= box[2] or box[1] >= box[3]:
+            return screenshot
+        return screenshot.crop(box)
+
+    def _load_existing_captures(self) -> None:
+        if self.max_captures is None and self.max_bytes is None:
+            return
+        captures: dict[str, list[str]] = collections.defaultdict(list)
+        for name in os.listdir(self.directory):
+            match = _FILE_NAME_PATTERN.match(name)
+            if match:
+                captures[match["prefix"]].append(os.path.join(self.directory, name))
+        for prefix in sorted(
+            captures, key=lambda prefix: float(prefix.split("_", 1)[1])
+        ):
+            paths = captures[prefix]
+            size = sum(os.path.getsize(path) for path in paths)
+            self._captures.append((paths, size))
+            self._total_bytes += size
+
+    def _enforce_retention(self) -> None:
+        while self._captures and (
+            (self.max_captures is not None and len(self._captures) > self.max_captures)
+            or (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+        ):
+            paths, size = self._captures.popleft()
+            self._total_bytes -= size
+            for path in paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,294 @@
+"""Persistent OCR cache keyed by screenshot contents."""
+
+import collections
+import hashlib
+import json
+import os
+import struct
+import threading
+import zlib
+from typing import Optional
+
+from screen_ocr import Reader, ScreenContents, _base
+
+from . import _merging
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+BoundingBox = _merging.BoundingBox
+
+_MAGIC = b"gaze_ocr cache 1\n"
+# Key digest followed by payload length.
+_RECORD_HEADER = struct.Struct("<16sI")
+
+
+class _AppendOnlyStore:
+    """Maps 16-byte keys to bytes in a single append-only file.
+
+    The index of record offsets is rebuilt by scanning the file when opened. A
+    partially written record at the end (e.g. after a crash) is truncated. Once the
+    file exceeds max_bytes, it is rewritten with the most recently used records that
+    fit in half of max_bytes.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        # Maps keys to (offset, length) of payloads, least recently used first.
+        self._index: collections.OrderedDict[bytes, tuple[int, int]] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._file = self._open()
+        self._load()
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        with self._lock:
+            location = self._index.get(key)
+            if not location:
+                return None
+            self._index.move_to_end(key)
+            offset, length = location
+            self._file.seek(offset)
+            return self._file.read(length)
+
+    def put(self, key: bytes, payload: bytes) -> None:
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+                return
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell() + _RECORD_HEADER.size
+            self._file.write(_RECORD_HEADER.pack(key, len(payload)) + payload)
+            self._file.flush()
+            self._index[key] = (offset, len(payload))
+            if offset + len(payload) > self.max_bytes:
+                self._compact()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._file.close()
+            self._index.clear()
+            self._file = self._open(reset=True)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _open(self, reset: bool = False):
+        if reset or not os.path.exists(self.path):
+            with open(self.path, "wb") as file:
+                file.write(_MAGIC)
+        # Kept open for the lifetime of the store.
+        return open(self.path, "r+b")  # noqa: SIM115
+
+    def _load(self) -> None:
+        """Index the records in the file."""
+        file = self._file
+        if file.read(len(_MAGIC)) != _MAGIC:
+            # Written by an incompatible version.
+            file.close()
+            self._file = self._open(reset=True)
+            return
+        end = os.fstat(file.fileno()).st_size
+        offset = len(_MAGIC)
+        while offset + _RECORD_HEADER.size <= end:
+            key, length = _RECORD_HEADER.unpack(file.read(_RECORD_HEADER.size))
+            if offset + _RECORD_HEADER.size + length > end:
+                break
+            self._index[key] = (offset + _RECORD_HEADER.size, length)
+            self._index.move_to_end(key)
+            offset += _RECORD_HEADER.size + length
+            file.seek(offset)
+        if offset < end:
+            file.truncate(offset)
+
+    def _compact(self) -> None:
+        """Rewrite the file with the most recently used records. Must be called with
+        the lock held."""
+        kept = []
+        size = len(_MAGIC)
+        for key in reversed(self._index):
+            length = self._index[key][1]
+            size += _RECORD_HEADER.size + length
+            if size > self.max_bytes // 2:
+                break
+            kept.append(key)
+        kept.reverse()
+        temporary_path = self.path + ".tmp"
+        index = collections.OrderedDict()
+        with open(temporary_path, "wb") as new_file:
+            new_file.write(_MAGIC)
+            for key in kept:
+                offset, length = self._index[key]
+                self._file.seek(offset)
+                payload = self._file.read(length)
+                new_file.write(_RECORD_HEADER.pack(key, length))
+                index[key] = (new_file.tell(), length)
+                new_file.write(payload)
+        self._file.close()
+        os.replace(temporary_path, self.path)
+        self._index = index
+        self._file = self._open()
+
+
+class PersistentOcrReader:
+    """Reader wrapper which stores OCR results on disk, keyed by a hash of the
+    captured pixels and the reader configuration.
+
+    Captures whose pixels were OCR'd before, in this or an earlier process, are
+    served from the file at path without OCR. Word positions are stored relative to
+    the capture, so identical content captured elsewhere on screen (e.g. a moved
+    dialog) is also served. The file is bounded by max_bytes, evicting the least
+    recently used results. config_key distinguishes readers whose configuration
+    isn't visible in their attributes (e.g. backend options).
+
+    Requires screenshots to be Pillow images; otherwise every read is OCR'd. The
+    file must only be used by one process at a time.
+
+    Implements the Reader methods used by Controller and OcrCache, and delegates
+    other attributes to the wrapped reader.
+    """
+
+    def __init__(
+        self,
+        ocr_reader: Reader,
+        path: str,
+        max_bytes: int = 64 * 1024 * 1024,
+        config_key: str = "",
+    ):
+        self.ocr_reader = ocr_reader
+        self.hits = 0
+        self.misses = 0
+        self._store = _AppendOnlyStore(path, max_bytes)
+        backend = getattr(ocr_reader, "_backend", None)
+        self._config = repr(
+            (
+                type(ocr_reader).__name__,
+                type(backend).__name__,
+                getattr(ocr_reader, "margin", None),
+                getattr(ocr_reader, "resize_factor", None),
+                config_key,
+            )
+        ).encode()
+
+    def __getattr__(self, name: str):
+        return getattr(self.ocr_reader, name)
+
+    def read_screen(self, bounding_box: Optional[BoundingBox] = None) -> ScreenContents:
+        """Return ScreenContents for the bounding box, or the entire screen."""
+        # !!! Using private screen_ocr API to capture without OCR !!!
+        screenshot, bounding_box = self.ocr_reader._clean_screenshot(bounding_box)
+        return self.read_image(screenshot, bounding_box=bounding_box)
+
+    def read_nearby(
+        self,
+        screen_coordinates: tuple[int, int],
+        search_radius: Optional[int] = None,
+        crop_radius: Optional[int] = None,
+    ) -> ScreenContents:
+        """Return ScreenContents nearby the provided coordinates."""
+        crop_radius = crop_radius or self.ocr_reader.radius
+        bounding_box = (
+            screen_coordinates[0] - crop_radius,
+            screen_coordinates[1] - crop_radius,
+            screen_coordinates[0] + crop_radius,
+            screen_coordinates[1] + crop_radius,
+        )
+        # !!! Using private screen_ocr API to capture without OCR !!!
+        screenshot, bounding_box = self.ocr_reader._clean_screenshot(bounding_box)
+        return self.read_image(
+            screenshot,
+            bounding_box=bounding_box,
+            screen_coordinates=screen_coordinates,
+            search_radius=search_radius,
+        )
+
+    def read_current_window(self) -> ScreenContents:
+        return self.ocr_reader.read_current_window()
+
+    def read_image(
+        self,
+        image,
+        bounding_box: Optional[BoundingBox] = None,
+        screen_coordinates: Optional[tuple[int, int]] = None,
+        search_radius: Optional[int] = None,
+    ) -> ScreenContents:
+        """Return ScreenContents of the provided image."""
+        bounding_box = bounding_box or (0, 0, image.width, image.height)
+        search_radius = search_radius or self.ocr_reader.search_radius
+        if not Image or not isinstance(image, Image.Image):
+            return self.ocr_reader.read_image(
+                image,
+                bounding_box=bounding_box,
+                screen_coordinates=screen_coordinates,
+                search_radius=search_radius,
+            )
+        key = self._key(image)
+        payload = self._store.get(key)
+        if payload is not None:
+            self.hits += 1
+            return ScreenContents(
+                screen_coordinates=screen_coordinates,
+                bounding_box=bounding_box,
+                screenshot=image,
+                result=_decode_result(payload, bounding_box[0], bounding_box[1]),
+                confidence_threshold=self.ocr_reader.confidence_threshold,
+                homophones=self.ocr_reader.homophones,
+                search_radius=search_radius,
+            )
+        self.misses += 1
+        contents = self.ocr_reader.read_image(
+            image,
+            bounding_box=bounding_box,
+            screen_coordinates=screen_coordinates,
+            search_radius=search_radius,
+        )
+        self._store.put(
+            key, _encode_result(contents.result, bounding_box[0], bounding_box[1])
+        )
+        return contents
+
+    def clear(self) -> None:
+        self._store.clear()
+
+    def close(self) -> None:
+        self._store.close()
+
+    def _key(self, image) -> bytes:
+        digest = hashlib.blake2b(self._config, digest_size=16)
+        digest.update(repr((image.mode, image.size)).encode())
+        digest.update(image.tobytes())
+        return digest.digest()
+
+
+def _encode_result(result: _base.OcrResult, left: float, top: float) -> bytes:
+    # Each word is [text, left, top, width, height], relative to the image.
+    lines = [
+        [
+            [word.text, word.left - left, word.top - top, word.width, word.height]
+            for word in line.words
+        ]
+        for line in result.lines
+    ]
+    return zlib.compress(json.dumps(lines, separators=(",", ":")).encode())
+
+
+def _decode_result(payload: bytes, left: float, top: float) -> _base.OcrResult:
+    return _base.OcrResult(
+        [
+            _base.OcrLine(
+                [
+                    _base.OcrWord(text, word_left + left, word_top + top, width, height)
+                    for text, word_left, word_top, width, height in line
+                ]
+            )
+            for line in json.loads(zlib.decompress(payload))
+        ]
+    )
@@ -0,0 +1,103 @@
+"""Fixation detection over gaze history."""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from . import _merging
+
+
+@dataclass
+class Fixation:
+    start_timestamp: float
+    end_timestamp: float
+    # Extent of the gaze samples, in pixels.
+    left: float
+    top: float
+    right: float
+    bottom: float
+
+    @property
+    def duration(self) -> float:
+        return self.end_timestamp - self.start_timestamp
+
+
+def find_fixations(
+    timestamps: Sequence[float],
+    xs: Sequence[float],
+    ys: Sequence[float],
+    dispersion_threshold: float = 50,
+    min_duration_seconds: float = 0.1,
+    max_gap_seconds: float = 0.1,
+) -> list[Fixation]:
+    """Return fixations in timestamp-ordered gaze samples using dispersion-threshold
+    identification (I-DT).
+
+    A fixation is a run of samples lasting at least min_duration_seconds whose
+    dispersion (width plus height of their extent) is at most dispersion_threshold.
+    Samples outside fixations (saccades) are discarded. A gap of more than
+    max_gap_seconds between samples, which trackers produce during blinks, ends a
+    fixation.
+    """
+    fixations = []
+    count = len(timestamps)
+    start = 0
+    while start < count:
+        left = right = xs[start]
+        top = bottom = ys[start]
+        end = start + 1
+        while end < count and timestamps[end] - timestamps[end - 1] <= max_gap_seconds:
+            x, y = xs[end], ys[end]
+            new_left, new_right = min(left, x), max(right, x)
+            new_top, new_bottom = min(top, y), max(bottom, y)
+            if (new_right - new_left) + (new_bottom - new_top) > dispersion_threshold:
+                break
+            left, right, top, bottom = new_left, new_right, new_top, new_bottom
+            end += 1
+        if timestamps[end - 1] - timestamps[start] >= min_duration_seconds:
+            fixations.append(
+                Fixation(
+                    start_timestamp=timestamps[start],
+                    end_timestamp=timestamps[end - 1],
+                    left=left,
+                    top=top,
+                    right=right,
+                    bottom=bottom,
+                )
+            )
+            start = end
+        else:
+            start += 1
+    return fixations
+
+
+def fixation_regions(
+    fixations: Sequence[Fixation], padding: int, max_regions: int
+) -> list[_merging.BoundingBox]:
+    """Return padded boxes around the fixations, merging boxes that overlap.
+
+    If there are more than max_regions, the regions with the longest total fixation
+    duration are kept.
+    """
+    regions: list[tuple[_merging.BoundingBox, float]] = []
+    for fixation in fixations:
+        box = (
+            int(fixation.left) - padding,
+            int(fixation.top) - padding,
+            int(fixation.right) + padding,
+            int(fixation.bottom) + padding,
+        )
+        duration = fixation.duration
+        # Merging can make a region overlap others that it didn't before.
+        merged = True
+        while merged:
+            merged = False
+            for i, (other_box, other_duration) in enumerate(regions):
+                if _merging.intersection(box, other_box):
+                    box = _merging.union(box, other_box)
+                    duration += other_duration
+                    del regions[i]
+                    merged = True
+                    break
+        regions.append((box, duration))
+    regions.sort(key=lambda region: region[1], reverse=True)
+    return [box for box, _ in regions[:max_regions]]
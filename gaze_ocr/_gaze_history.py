@@ -0,0 +1,149 @@
+"""Fixed-capacity history of timestamped gaze points."""
+
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+
+@dataclass
+class BoundingBox:
+    left: int
+    right: int
+    top: int
+    bottom: int
+
+
+class GazeHistory:
+    """Ring buffer of gaze points with fast time range queries.
+
+    Points are stored in preallocated NumPy arrays. Each point is written twice, at
+    its slot and capacity slots later, so that the retained points are always a
+    contiguous, timestamp-ordered slice which can be searched with searchsorted and
+    reduced with vectorized min/max. Appends and queries are O(1) and
+    O(log n + k), and may be made from different threads.
+
+    Timestamps must be non-decreasing; points older than the latest are dropped.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive: {capacity}")
+        self.capacity = capacity
+        self._timestamps = np.empty(2 * capacity, dtype=np.float64)
+        self._xs = np.empty(2 * capacity, dtype=np.float64)
+        self._ys = np.empty(2 * capacity, dtype=np.float64)
+        # Slot of the oldest point.
+        self._start = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, x: float, y: float) -> None:
+        with self._lock:
+            if self._size and timestamp < self._timestamps[self._end() - 1]:
+                return
+            slot = self._end() % self.capacity
+            for array, value in (
+                (self._timestamps, timestamp),
+                (self._xs, x),
+                (self._ys, y),
+            ):
+                array[slot] = value
+                array[slot + self.capacity] = value
+            if self._size < self.capacity:
+                self._size += 1
+            else:
+                self._start = (self._start + 1) % self.capacity
+
+    def clear(self) -> None:
+        with self._lock:
+            self._start = 0
+            self._size = 0
+
+    def latest(self) -> Optional[tuple[float, float, float]]:
+        """Return (timestamp, x, y) of the latest point, if any."""
+        with self._lock:
+            if not self._size:
+                return None
+            i = self._end() - 1
+            return (
+                float(self._timestamps[i]),
+                float(self._xs[i]),
+                float(self._ys[i]),
+            )
+
+    def bounds(
+        self,
+        start_timestamp: float,
+        end_timestamp: float,
+        tolerance_seconds: float = 0.0,
+    ) -> Optional[tuple[float, float, float, float]]:
+        """Return (left, top, right, bottom) of the points during the time range.
+
+        Also includes the first point after the range (or the last point, if the
+        range starts after it), provided it is within tolerance_seconds of the range.
+        This ensures a result if the range falls between samples. Returns None if
+        there are no such points.
+        """
+        with self._lock:
+            selection = self._select(start_timestamp, end_timestamp, tolerance_seconds)
+            if not selection:
+                return None
+            xs = self._xs[selection]
+            ys = self._ys[selection]
+            return (
+                float(xs.min()),
+                float(ys.min()),
+                float(xs.max()),
+                float(ys.max()),
+            )
+
+    def points(
+        self,
+        start_timestamp: float,
+        end_timestamp: float,
+        tolerance_seconds: float = 0.0,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return copies of the timestamps, xs and ys of the points during the time
+        range. Points are selected as in bounds()."""
+        with self._lock:
+            selection = self._select(start_timestamp, end_timestamp, tolerance_seconds)
+            if not selection:
+                selection = slice(0, 0)
+            return (
+                self._timestamps[selection].copy(),
+                self._xs[selection].copy(),
+                self._ys[selection].copy(),
+            )
+
+    def _select(
+        self, start_timestamp: float, end_timestamp: float, tolerance_seconds: float
+    ) -> Optional[slice]:
+        """Return the slice of the arrays selected by a time range. Must be called
+        with the lock held."""
+        if not self._size:
+            return None
+        timestamps = self._timestamps[self._start : self._end()]
+        last = self._size - 1
+        first_index = max(
+            min(int(np.searchsorted(timestamps, start_timestamp)), last),
+            int(np.searchsorted(timestamps, start_timestamp - tolerance_seconds)),
+        )
+        end_index = min(
+            min(int(np.searchsorted(timestamps, end_timestamp)), last) + 1,
+            int(
+                np.searchsorted(
+                    timestamps, end_timestamp + tolerance_seconds, side="right"
+                )
+            ),
+        )
+        if first_index >= end_index:
+            return None
+        return slice(self._start + first_index, self._start + end_index)
+
+    def _end(self) -> int:
+        return self._start + self._size
@@ -6,24 +6,65 @@ matches if disambiguation is needed. Resume computation with generator.send(matc
 completes, next() or send() will raise StopIteration with the .value set to the return value.
 """
 
+import contextlib
+import functools
+import inspect
 import logging
-import os.path
+import math
+import sys
+import threading
 import time
-from collections.abc import Callable, Generator, Sequence
+from collections.abc import Callable, Generator, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from typing import Any, Optional, TypeVar, cast
 
 from screen_ocr import Reader, ScreenContents, WordLocation
 
+from . import _fixations, _keystrokes, _matching, _merging
+from ._data_writer import DataWriter
+from ._recording import SessionRecorder
+from ._speculation import SpeculativeReader
+from ._stats import OcrStats, estimate_size_bytes
+from ._tiles import CoarseToFineReader, DirtyTileReader
+from ._tracing import Tracer
+
+# Used by cursor locations created without a tracer.
+_DISABLED_TRACER = Tracer(capacity=0)
+
 T = TypeVar("T")
 
-_populated_cache_call_count = 0
-_populated_cache_miss_count = 0
 
+@dataclass(slots=True)
+class InputContext:
+    """Input devices and click offset shared by the cursor locations planned for a
+    command."""
 
-@dataclass
+    mouse: Any
+    keyboard: Any
+    app_actions: Any
+    # Offset or callable to get it (resolved after focus).
+    click_offset_right: Callable[[], int] | int = 0
+    tracer: Tracer = _DISABLED_TRACER
+    # Whether the keyboard supports word_left() and word_right() and they should be
+    # used to shorten cursor movement.
+    use_word_jumps: bool = False
+
+    def resolve_click_offset_right(self) -> int:
+        offset = self.click_offset_right
+        return offset() if callable(offset) else offset
+
+
+@dataclass(slots=True, init=False)
 class CursorLocation:
+    """A planned cursor location.
+
+    Construct with the context shared by the locations planned for a command, or
+    (as before contexts were introduced) with click_offset_right, mouse, keyboard,
+    app_actions and tracer, from which a context is created.
+    """
+
     base_coordinates: tuple[int, int]
     visual_coordinates: tuple[int, int]
     # Move cursor to the right if True, left if False.
@@ -32,21 +73,97 @@ class CursorLocation:
     move_past_whitespace_left: bool
     move_past_whitespace_right: bool
     text_height: int
-    # Lambda to get click offset (resolved after focus)
-    click_offset_right: Optional[Callable[[], int]]
+    # Shared by all locations planned for a command.
+    context: InputContext = field(repr=False, compare=False)
+    # Text of the OCR word that the cursor moves within, if word jumps are enabled.
+    word_text: Optional[str] = field(default=None, repr=False)
+
+    def __init__(
+        self,
+        base_coordinates: tuple[int, int],
+        visual_coordinates: tuple[int, int],
+        move_cursor_right: bool,
+        move_distance: int,
+        move_past_whitespace_left: bool,
+        move_past_whitespace_right: bool,
+        text_height: int,
+        click_offset_right: Optional[Callable[[], int] | int] = None,
+        mouse: Any = None,
+        keyboard: Any = None,
+        app_actions: Any = None,
+        tracer: Optional[Tracer] = None,
+        *,
+        context: Optional[InputContext] = None,
+        word_text: Optional[str] = None,
+    ):
+        self.base_coordinates = base_coordinates
+        self.visual_coordinates = visual_coordinates
+        self.move_cursor_right = move_cursor_right
+        self.move_distance = move_distance
+        self.move_past_whitespace_left = move_past_whitespace_left
+        self.move_past_whitespace_right = move_past_whitespace_right
+        self.text_height = text_height
+        if context is None:
+            context = InputContext(
+                mouse=mouse,
+                keyboard=keyboard,
+                app_actions=app_actions,
+                click_offset_right=click_offset_right or 0,
+                tracer=tracer or _DISABLED_TRACER,
+            )
+        elif any(
+            value is not None
+            for value in (click_offset_right, mouse, keyboard, app_actions, tracer)
+        ):
+            raise TypeError(
+                "Provide either context or the input devices it contains, not both."
+            )
+        self.context = context
+        self.word_text = word_text
+
+    @property
+    def mouse(self) -> Any:
+        return self.context.mouse
+
+    @property
+    def keyboard(self) -> Any:
+        return self.context.keyboard
+
+    @property
+    def app_actions(self) -> Any:
+        return self.context.app_actions
+
+    @property
+    def tracer(self) -> Tracer:
+        return self.context.tracer
 
-    mouse: Any = field(repr=False, compare=False)
-    keyboard: Any = field(repr=False, compare=False)
-    app_actions: Any = field(repr=False, compare=False)
+    @property
+    def click_offset_right(self) -> Callable[[], int]:
+        return self.context.resolve_click_offset_right
 
     def _focus_and_get_final_coordinates(self) -> tuple[int, int]:
         """Focus window and return coordinates with offset applied."""
-        # Focus at base coordinates before resolving offset
-        if self.app_actions:
-            self.app_actions.focus_at(*self.base_coordinates)
-        # Resolve offset after focus (to get correct app-specific offset)
-        offset = self.click_offset_right() if self.click_offset_right else 0
-        return (self.base_coordinates[0] + offset, self.base_coordinates[1])
+        with self.tracer.span("focus_and_get_final_coordinates"):
+            # Focus at base coordinates before resolving offset
+            if self.app_actions:
+                self.app_actions.focus_at(*self.base_coordinates)
+            # Resolve offset after focus (to get correct app-specific offset)
+            offset = self.context.resolve_click_offset_right()
+            return (self.base_coordinates[0] + offset, self.base_coordinates[1])
+
+    def keyboard_moves(self) -> list[tuple[bool, int]]:
+        """Return the moves from the base coordinates, as (word_jump, count) pairs.
+        See _keystrokes.plan_moves."""
+        if not self.move_distance:
+            return []
+        if self.word_text is None:
+            return [(False, self.move_distance)]
+        if self.move_cursor_right:
+            return _keystrokes.plan_moves(self.word_text, 0, self.move_distance)
+        length = len(self.word_text)
+        return _keystrokes.plan_moves(
+            self.word_text, length, length - self.move_distance
+        )
 
     def move_mouse_cursor(self):
         final_coordinates = self._focus_and_get_final_coordinates()
@@ -58,34 +175,40 @@ class CursorLocation:
         self.mouse.click()
         # Needed to avoid selection issues on Mac.
         time.sleep(0.01)
-        if self.move_distance:
-            if self.move_cursor_right:
-                self.keyboard.right(self.move_distance)
-            else:
-                self.keyboard.left(self.move_distance)
-        if (
-            self.move_past_whitespace_left
-            and not self.keyboard.is_shift_down()
-            and self.app_actions
-        ):
-            left_chars = self.app_actions.peek_left()
-            # Check that there is actually a space adjacent (not a newline). Google docs
-            # represents a newline as newline followed by space, so we handle that case as
-            # well.
+        with self.tracer.span("keyboard_moves"):
+            for word_jump, count in self.keyboard_moves():
+                if word_jump:
+                    if self.move_cursor_right:
+                        self.keyboard.word_right(count)
+                    else:
+                        self.keyboard.word_left(count)
+                elif self.move_cursor_right:
+                    self.keyboard.right(count)
+                else:
+                    self.keyboard.left(count)
             if (
-                len(left_chars) >= 2
-                and left_chars[-1].isspace()
-                and left_chars[-2] != "\n"
+                self.move_past_whitespace_left
+                and not self.keyboard.is_shift_down()
+                and self.app_actions
             ):
-                self.keyboard.left(1)
-        if (
-            self.move_past_whitespace_right
-            and not self.keyboard.is_shift_down()
-            and self.app_actions
-        ):
-            right_chars = self.app_actions.peek_right()
-            if right_chars and right_chars[0].isspace():
-                self.keyboard.right(1)
+                left_chars = self.app_actions.peek_left()
+                # Check that there is actually a space adjacent (not a newline). Google docs
+                # represents a newline as newline followed by space, so we handle that case as
+                # well.
+                if (
+                    len(left_chars) >= 2
+                    and left_chars[-1].isspace()
+                    and left_chars[-2] != "\n"
+                ):
+                    self.keyboard.left(1)
+            if (
+                self.move_past_whitespace_right
+                and not self.keyboard.is_shift_down()
+                and self.app_actions
+            ):
+                right_chars = self.app_actions.peek_right()
+                if right_chars and right_chars[0].isspace():
+                    self.keyboard.right(1)
 
 
 class EyeTrackerFallback(Enum):
@@ -93,77 +216,426 @@ class EyeTrackerFallback(Enum):
     ACTIVE_WINDOW = auto()
 
 
+@dataclass
+class _OcrCacheEntry:
+    # Time range that the contents were read for.
+    time_range: tuple[float, float]
+    # Requested bounds, or None if the fallback area was read.
+    requested_bounds: Optional[tuple[int, int, int, int]]
+    screen_contents: ScreenContents
+    capture_time: float
+    size_bytes: int
+
+    def covers_time_range(self, time_range: tuple[float, float]) -> bool:
+        return (
+            time_range[0] >= self.time_range[0] and time_range[1] <= self.time_range[1]
+        )
+
+    def covers(
+        self,
+        time_range: tuple[float, float],
+        bounding_box: Optional[tuple[int, int, int, int]],
+    ) -> bool:
+        if not self.covers_time_range(time_range):
+            return False
+        if not bounding_box:
+            return not self.requested_bounds
+        # Captures are clamped to the screen, so also accept boxes within the
+        # original request.
+        return _merging.contains(
+            self.screen_contents.bounding_box, bounding_box
+        ) or bool(
+            self.requested_bounds
+            and _merging.contains(self.requested_bounds, bounding_box)
+        )
+
+
 class OcrCache:
+    """Caches OCR results by time range and screen area.
+
+    A read is served by any entry whose time range contains the requested time range
+    and whose area contains the requested bounding box. Entries are evicted least
+    recently used first once there are more than max_entries or their screenshots
+    exceed max_bytes in total, and are discarded after max_age_seconds. The most
+    recently used entry is retained regardless of size.
+
+    If partial_reads is True, a bounding box that overlaps a cached entry without
+    being contained in it is served by reading only the uncovered strips and merging
+    them with the cached words.
+
+    If track_dirty_tiles is True, misses reuse words from screen tiles whose pixels
+    are unchanged since they were last read, and only OCR the changed tiles. See
+    DirtyTileReader for details.
+
+    If coarse_to_fine is True, misses of areas of at least coarse_to_fine_min_area
+    pixels (or the entire screen) for which the searched words are provided are read
+    in two stages: a downscaled read locates the words, and only the areas around
+    them are read at full resolution. Only the areas read at full resolution are
+    cached, each with its own bounds. See CoarseToFineReader for details.
+
+    Hits, misses and OCR latency are recorded in stats (see OcrStats).
+    """
+
+    # Minimum fraction of the requested box that must already be cached to read
+    # only the uncovered strips.
+    PARTIAL_READ_MIN_OVERLAP = 0.25
+    # Log at most one cache miss warning per interval.
+    MISS_WARNING_INTERVAL_SECONDS = 60.0
+
     def __init__(
         self,
         ocr_reader: Reader,
         fallback_when_no_eye_tracker: EyeTrackerFallback = EyeTrackerFallback.MAIN_SCREEN,
+        max_entries: int = 8,
+        max_age_seconds: float = 60.0,
+        max_bytes: int = 128 * 1024 * 1024,
+        partial_reads: bool = False,
+        seam_margin: int = 50,
+        track_dirty_tiles: bool = False,
+        stats: Optional[OcrStats] = None,
+        tracer: Optional[Tracer] = None,
+        coarse_to_fine: bool = False,
+        coarse_to_fine_min_area: int = 1024 * 1024,
     ):
         self.ocr_reader = ocr_reader
-        self._last_time_range = None
-        self._last_screen_contents = None
+        self.stats = stats or OcrStats()
+        self.tracer = tracer or Tracer()
+        # Held while using ocr_reader and the tile readers, which aren't thread-safe,
+        # so that background reads never run concurrently with foreground reads.
+        self.reader_lock = threading.RLock()
+        self._dirty_tile_reader = (
+            DirtyTileReader(ocr_reader, stats=self.stats) if track_dirty_tiles else None
+        )
+        self._coarse_to_fine_reader = (
+            CoarseToFineReader(ocr_reader, stats=self.stats) if coarse_to_fine else None
+        )
+        self.coarse_to_fine_min_area = coarse_to_fine_min_area
         self.fallback_when_no_eye_tracker = fallback_when_no_eye_tracker
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        self.partial_reads = partial_reads
+        # Strips are extended this far into the cached area so that words crossing
+        # the seam are read whole.
+        self.seam_margin = seam_margin
+        # Ordered from least to most recently used.
+        self._entries: list[_OcrCacheEntry] = []
+        self._last_miss_warning_time = -math.inf
+        self._suppressed_miss_warnings = 0
 
     def read(
         self,
         time_range: tuple[float, float],
         bounding_box: Optional[tuple[int, int, int, int]],
+        words: Optional[str] = None,
     ):
-        global _populated_cache_call_count, _populated_cache_miss_count
+        """Return the contents of the bounding box (or the fallback area if None)
+        during the time range, from the cache if possible.
 
-        cache_was_populated = self._last_screen_contents is not None
-        if cache_was_populated:
-            _populated_cache_call_count += 1
-        if (
-            self._last_time_range
-            and time_range[0] >= self._last_time_range[0]
-            and time_range[1] <= self._last_time_range[1]
-        ):
-            # Assume that bounding box is a subset if the time range is a subset.
-            # Don't update the cache, in case multiple subsets are requested.
-            assert self._last_screen_contents is not None
-            if bounding_box:
-                return self._last_screen_contents.cropped(bounding_box)
+        Arguments:
+        words: The words that will be searched for, if known. See coarse_to_fine.
+        """
+        with self.tracer.span("OcrCache.read"):
+            self._evict()
+            entry = next(
+                (
+                    entry
+                    for entry in reversed(self._entries)
+                    if entry.covers(time_range, bounding_box)
+                ),
+                None,
+            )
+            if entry:
+                self.stats.record_hit()
+                # Don't replace the entry, in case multiple subsets are requested.
+                self._entries.remove(entry)
+                self._entries.append(entry)
+                if bounding_box:
+                    cropped = _merging.cropped(entry.screen_contents, bounding_box)
+                    # Crops of an entry are often matched against the same words.
+                    _matching.share_scores(entry.screen_contents, cropped)
+                    return cropped
+                else:
+                    return entry.screen_contents
+            if not self._entries:
+                self.stats.record_miss("empty")
             else:
-                return self._last_screen_contents
-        else:
-            if cache_was_populated:
-                _populated_cache_miss_count += 1
-                miss_percentage = (
-                    100 * _populated_cache_miss_count / _populated_cache_call_count
-                )
-                logging.warning(
-                    "OCR cache miss with populated cache: requested_time_range=%r, "
-                    "cached_time_range=%r, requested_bounds=%r; "
-                    "misses=%.1f%% of %d calls",
-                    time_range,
-                    self._last_time_range,
-                    bounding_box,
-                    miss_percentage,
-                    _populated_cache_call_count,
+                reason = (
+                    "bounds"
+                    if any(
+                        entry.covers_time_range(time_range) for entry in self._entries
+                    )
+                    else "time_range"
                 )
-            self._last_time_range = time_range
+                self.stats.record_miss(reason)
+                self._warn_miss(reason, time_range, bounding_box)
+            screen_contents = None
+            if self.partial_reads and bounding_box:
+                screen_contents = self._read_partial(time_range, bounding_box)
+            if not screen_contents:
+                if self._reads_coarse_to_fine(bounding_box, words):
+                    assert words
+                    return self._read_coarse_to_fine(time_range, bounding_box, words)
+                screen_contents = self.read_uncached(bounding_box)
+            self.store(time_range, bounding_box, screen_contents)
+            return screen_contents
+
+    def read_uncached(
+        self,
+        bounding_box: Optional[tuple[int, int, int, int]],
+        words: Optional[str] = None,
+    ) -> ScreenContents:
+        """Capture and OCR the bounding box (or the fallback area if None), bypassing
+        the cache. Safe to call from a worker thread.
+
+        Arguments:
+        words: The words that will be searched for, if known. See coarse_to_fine.
+        """
+        with self.reader_lock:
+            if words and self._reads_coarse_to_fine(bounding_box, words):
+                assert self._coarse_to_fine_reader
+                with self.tracer.span(
+                    "read_coarse_to_fine", lambda: {"bounding_box": bounding_box}
+                ):
+                    return self._coarse_to_fine_reader.read_screen(bounding_box, words)
             if bounding_box:
-                self._last_screen_contents = self.ocr_reader.read_screen(bounding_box)
+                return self._read_screen(bounding_box)
+            elif self.fallback_when_no_eye_tracker == EyeTrackerFallback.ACTIVE_WINDOW:
+                with self.stats.timer("ocr"):
+                    screen_contents = self.ocr_reader.read_current_window()
+                self.stats.record_ocr(screen_contents.bounding_box)
+                return screen_contents
             else:
-                if (
-                    self.fallback_when_no_eye_tracker
-                    == EyeTrackerFallback.ACTIVE_WINDOW
+                return self._read_screen(None)
+
+    def store(
+        self,
+        time_range: tuple[float, float],
+        bounding_box: Optional[tuple[int, int, int, int]],
+        screen_contents: ScreenContents,
+        capture_time: Optional[float] = None,
+    ) -> None:
+        """Populate the cache with contents read elsewhere (e.g. by a prefetch).
+
+        Arguments:
+        time_range: The time range the contents are valid for.
+        bounding_box: The requested bounds, or None if the fallback area was read.
+        screen_contents: The OCR result.
+        capture_time: When the screenshot was taken, in time.perf_counter() seconds,
+                      if not now. Entries expire max_age_seconds after capture.
+        """
+        self._entries.append(
+            _OcrCacheEntry(
+                time_range=time_range,
+                requested_bounds=bounding_box,
+                screen_contents=screen_contents,
+                capture_time=(
+                    time.perf_counter() if capture_time is None else capture_time
+                ),
+                size_bytes=estimate_size_bytes(screen_contents),
+            )
+        )
+        self._evict()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _read_coarse_to_fine(
+        self,
+        time_range: tuple[float, float],
+        bounding_box: Optional[tuple[int, int, int, int]],
+        words: str,
+    ) -> ScreenContents:
+        """Read the bounding box coarse to fine, caching the areas that were read at
+        full resolution."""
+        assert self._coarse_to_fine_reader
+        capture_time = time.perf_counter()
+        with (
+            self.reader_lock,
+            self.tracer.span(
+                "read_coarse_to_fine", lambda: {"bounding_box": bounding_box}
+            ),
+        ):
+            screen_contents, windows = self._coarse_to_fine_reader.read_screen_windows(
+                bounding_box, words
+            )
+        if windows == [screen_contents]:
+            # The whole area was read.
+            self.store(time_range, bounding_box, screen_contents, capture_time)
+        else:
+            for window in windows:
+                self.store(time_range, window.bounding_box, window, capture_time)
+        return screen_contents
+
+    def _reads_coarse_to_fine(
+        self, bounding_box: Optional[tuple[int, int, int, int]], words: Optional[str]
+    ) -> bool:
+        if not self._coarse_to_fine_reader or not words:
+            return False
+        if bounding_box:
+            return _merging.area(bounding_box) >= self.coarse_to_fine_min_area
+        return self.fallback_when_no_eye_tracker == EyeTrackerFallback.MAIN_SCREEN
+
+    def _read_screen(
+        self, bounding_box: Optional[tuple[int, int, int, int]]
+    ) -> ScreenContents:
+        with self.reader_lock:
+            if self._dirty_tile_reader:
+                # Records its own statistics, since it only OCRs part of the area.
+                with self.tracer.span(
+                    "read_dirty_tiles", lambda: {"bounding_box": bounding_box}
                 ):
-                    self._last_screen_contents = self.ocr_reader.read_current_window()
-                else:
-                    self._last_screen_contents = self.ocr_reader.read_screen()
-            return self._last_screen_contents
+                    return self._dirty_tile_reader.read_screen(bounding_box)
+            with (
+                self.stats.timer("ocr"),
+                self.tracer.span("read_screen", lambda: {"bounding_box": bounding_box}),
+            ):
+                screen_contents = self.ocr_reader.read_screen(bounding_box)
+        self.stats.record_ocr(screen_contents.bounding_box)
+        return screen_contents
+
+    def _warn_miss(
+        self,
+        reason: str,
+        time_range: tuple[float, float],
+        bounding_box: Optional[tuple[int, int, int, int]],
+    ) -> None:
+        now = time.perf_counter()
+        if now - self._last_miss_warning_time < self.MISS_WARNING_INTERVAL_SECONDS:
+            self._suppressed_miss_warnings += 1
+            return
+        calls = self.stats.populated_cache_calls
+        misses = self.stats.misses["time_range"] + self.stats.misses["bounds"]
+        logging.warning(
+            "OCR cache miss with populated cache (%s): requested_time_range=%r, "
+            "cached_time_range=%r, requested_bounds=%r; misses=%.1f%% of %d calls; "
+            "%d similar warnings suppressed",
+            reason,
+            time_range,
+            self._entries[-1].time_range,
+            bounding_box,
+            100 * misses / calls,
+            calls,
+            self._suppressed_miss_warnings,
+        )
+        self._last_miss_warning_time = now
+        self._suppressed_miss_warnings = 0
+
+    def _read_partial(
+        self,
+        time_range: tuple[float, float],
+        bounding_box: tuple[int, int, int, int],
+    ) -> Optional[ScreenContents]:
+        """Read the parts of the bounding box not covered by the overlapping entry
+        and merge them with its words. Returns None if no entry overlaps enough."""
+        candidates = [
+            (
+                _merging.area(
+                    _merging.intersection(
+                        entry.screen_contents.bounding_box, bounding_box
+                    )
+                ),
+                entry,
+            )
+            for entry in self._entries
+            if entry.requested_bounds and entry.covers_time_range(time_range)
+        ]
+        if not candidates:
+            return None
+        overlap_area, entry = max(candidates, key=lambda candidate: candidate[0])
+        if overlap_area < self.PARTIAL_READ_MIN_OVERLAP * _merging.area(bounding_box):
+            return None
+        assert entry.requested_bounds
+        cached_bounds = entry.screen_contents.bounding_box
+        # Captures are clamped to the screen, so where the cached area is smaller
+        # than requested, its edge is the screen edge.
+        screen_bounds = (
+            0,
+            0,
+            cached_bounds[2]
+            if cached_bounds[2] < entry.requested_bounds[2]
+            else sys.maxsize,
+            cached_bounds[3]
+            if cached_bounds[3] < entry.requested_bounds[3]
+            else sys.maxsize,
+        )
+        strips = []
+        for strip in _merging.subtract(bounding_box, cached_bounds):
+            expanded = (
+                strip[0] - self.seam_margin,
+                strip[1] - self.seam_margin,
+                strip[2] + self.seam_margin,
+                strip[3] + self.seam_margin,
+            )
+            expanded = _merging.intersection(expanded, bounding_box)
+            expanded = expanded and _merging.intersection(expanded, screen_bounds)
+            if expanded:
+                strips.append(expanded)
+        return _merging.merge_screen_contents(
+            [entry.screen_contents] + [self._read_screen(strip) for strip in strips],
+            bounding_box,
+        )
+
+    def _evict(self) -> None:
+        min_capture_time = time.perf_counter() - self.max_age_seconds
+        self._entries = [
+            entry for entry in self._entries if entry.capture_time >= min_capture_time
+        ]
+        total_bytes = sum(entry.size_bytes for entry in self._entries)
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or total_bytes > self.max_bytes
+        ):
+            total_bytes -= self._entries.pop(0).size_bytes
+
+
+@dataclass
+class _PendingRead:
+    """OCR started in the background by Controller.start_reading_nearby()."""
+
+    future: Future[ScreenContents]
+    start_time: float
+    # Requested bounds, or None if reading the fallback area.
+    bounding_box: Optional[tuple[int, int, int, int]]
+
+
+def _recorded_command(method):
+    """Decorate a command generator method so that its calls are recorded by the
+    Controller's recorder, if any, and speculative reads pause while it runs.
+    Commands run by another recorded command are part of its record."""
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        generator = method(self, *args, **kwargs)
+        if self._speculative_reader:
+            generator = self._pause_speculation(generator)
+        outer = self._recording_command
+        if not self.recorder or (outer and outer.gi_running):
+            return generator
+        arguments = signature.bind(self, *args, **kwargs).arguments
+        del arguments["self"]
+        self._recording_command = self._record_command(
+            generator, method.__name__, arguments
+        )
+        return self._recording_command
+
+    return wrapper
 
 
 class Controller:
     """Mediates interaction with gaze tracking and OCR.
 
     Provide Mouse and Keyboard from gaze_ocr.dragonfly or gaze_ocr.talon. AppActions is optional.
+
+    Set tracer.enabled to record timing spans of each command, and export them with
+    tracer.write_chrome_trace().
     """
 
     WordLocationsPredicate = Callable[[Sequence[WordLocation]], bool]
 
+    # Background OCR older than this is discarded instead of joined.
+    PREFETCH_MAX_AGE_SECONDS = 10.0
+
     class SelectionPosition(Enum):
         NONE = auto()
         LEFT = auto()
@@ -179,22 +651,109 @@ class Controller:
         save_data_directory: Optional[str] = None,
         gaze_box_padding: int = 100,
         fallback_when_no_eye_tracker: EyeTrackerFallback = EyeTrackerFallback.MAIN_SCREEN,
+        prefetch_radius: int = 300,
+        partial_reads: bool = False,
+        track_dirty_tiles: bool = False,
+        tracer: Optional[Tracer] = None,
+        use_fixations: bool = False,
+        max_fixation_regions: int = 4,
+        use_word_jumps: bool = False,
+        data_writer: Optional[DataWriter] = None,
+        recorder: Optional[SessionRecorder] = None,
+        union_selection_reads: bool = False,
+        coarse_to_fine: bool = False,
+        speculative_dwell_seconds: Optional[float] = None,
     ):
         self.ocr_reader = ocr_reader
         self.eye_tracker = eye_tracker
         self.mouse = mouse
         self.keyboard = keyboard
         self.app_actions = app_actions
-        self.save_data_directory = save_data_directory
+        # Captures are written in the background by the data writer, which is
+        # created for save_data_directory unless provided.
+        self._data_writer = data_writer
+        self.save_data_directory = (
+            data_writer.directory if data_writer else save_data_directory
+        )
         self.gaze_box_padding = gaze_box_padding
         self._latest_screen_contents: Optional[ScreenContents] = None
+        # Cache statistics and stage latencies. See OcrStats.
+        self.stats = OcrStats()
+        # Timing spans of commands, disabled by default. See Tracer.
+        self.tracer = tracer or Tracer()
         self._ocr_cache = OcrCache(
-            ocr_reader, fallback_when_no_eye_tracker=fallback_when_no_eye_tracker
+            ocr_reader,
+            fallback_when_no_eye_tracker=fallback_when_no_eye_tracker,
+            partial_reads=partial_reads,
+            track_dirty_tiles=track_dirty_tiles,
+            stats=self.stats,
+            tracer=self.tracer,
+            coarse_to_fine=coarse_to_fine,
         )
         self.fallback_when_no_eye_tracker = fallback_when_no_eye_tracker
+        self.prefetch_radius = prefetch_radius
+        # If the eye tracker detects fixations, read only the areas around them.
+        self.use_fixations = use_fixations
+        self.max_fixation_regions = max_fixation_regions
+        # Move the text cursor within words using the keyboard's word_left() and
+        # word_right() where they are safe. See _keystrokes.plan_moves.
+        self.use_word_jumps = use_word_jumps
+        # If select_text is given both time ranges, read the union of both gaze areas
+        # once, so that the start and end words are found in the same OCR result.
+        self.union_selection_reads = union_selection_reads
+        # Runs OCR started by start_reading_nearby() and speculative reads, one at a
+        # time. Reads on any thread hold the OCR cache's reader_lock.
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="gaze_ocr"
+        )
+        # Guards _pending_read, which AsyncController sets from the event loop thread
+        # while commands join it in the executor thread.
+        self._pending_read_lock = threading.Lock()
+        self._pending_read: Optional[_PendingRead] = None
+        self._is_shut_down = False
+        # When start_reading_nearby() was last called.
+        self._speech_start_time: Optional[float] = None
+        # If set, areas that the user fixates on for this long while idle are read
+        # in the background and cached for the next command. See SpeculativeReader.
+        self._speculative_reader: Optional[SpeculativeReader] = None
+        if speculative_dwell_seconds is not None:
+            if hasattr(eye_tracker, "get_fixations_during_time_range"):
+                self._speculative_reader = SpeculativeReader(
+                    eye_tracker,
+                    self._ocr_cache.read_uncached,
+                    self._executor,
+                    dwell_seconds=speculative_dwell_seconds,
+                    padding=prefetch_radius,
+                    max_age_seconds=self.PREFETCH_MAX_AGE_SECONDS,
+                )
+                self._speculative_reader.start()
+            else:
+                logging.warning(
+                    "Speculative OCR requires an eye tracker that detects fixations."
+                )
+        # Records commands for offline replay. See SessionRecorder.
+        self.recorder = recorder
+        self._recording_command: Optional[Generator] = None
+        if recorder:
+            recorder.record_session(ocr_reader)
 
     def shutdown(self, wait=True):
-        """Retained for compatibility; OCR execution is synchronous."""
+        """Stop background OCR.
+
+        If wait is True, blocks until in-flight OCR completes. Otherwise, pending OCR
+        is cancelled.
+        """
+        self._is_shut_down = True
+        if self._speculative_reader:
+            self._speculative_reader.stop()
+        if self._data_writer:
+            self._data_writer.close(wait=wait)
+            self._data_writer = None
+        with self._pending_read_lock:
+            pending_read, self._pending_read = self._pending_read, None
+        if pending_read and not wait:
+            pending_read.future.cancel()
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
 
     def __enter__(self):
         return self
@@ -208,66 +767,183 @@ class Controller:
         """Resolve a value that may be a callable or direct value."""
         return cast(T, value() if callable(value) else value)
 
-    @staticmethod
-    def _as_callable(value: Callable[[], T] | T) -> Callable[[], T]:
-        """Convert a value or callable to a callable."""
-        if callable(value):
-            return cast(Callable[[], T], value)
-        return lambda: cast(T, value)
+    def _input_context(
+        self, click_offset_right: Callable[[], int] | int
+    ) -> InputContext:
+        """Return the context shared by the cursor locations planned for a
+        command."""
+        return InputContext(
+            mouse=self.mouse,
+            keyboard=self.keyboard,
+            app_actions=self.app_actions,
+            click_offset_right=click_offset_right,
+            tracer=self.tracer,
+            use_word_jumps=self.use_word_jumps,
+        )
+
+    def start_reading_nearby(
+        self, time_ranges: Optional[Sequence[tuple[float, float]]] = None
+    ) -> None:
+        """Start OCR nearby the gaze point in a worker thread.
+
+        Call this when speech begins. The next call to read_nearby() (directly or via
+        the other methods) joins the in-flight result instead of starting a second
+        read, provided it covers the requested area.
+
+        Arguments:
+        time_ranges: If specified, read the union of the gaze bounds during these
+                     times instead of the area around the gaze point. For example,
+                     pass the time ranges of the start and end words of a selection
+                     as soon as they are recognized, with union_selection_reads.
+        """
+        if self._is_shut_down:
+            return
+        self._speech_start_time = time.perf_counter()
+        if self._speculative_reader:
+            self._speculative_reader.note_speech()
+        gaze_point = self._get_gaze_point()
+        ocr_bounds = self._ocr_bounds(time_ranges) if time_ranges else None
+        if ocr_bounds:
+            bounding_box = ocr_bounds
+        elif gaze_point:
+            bounding_box = (
+                int(gaze_point[0]) - self.prefetch_radius,
+                int(gaze_point[1]) - self.prefetch_radius,
+                int(gaze_point[0]) + self.prefetch_radius,
+                int(gaze_point[1]) + self.prefetch_radius,
+            )
+        else:
+            bounding_box = None
+        pending_read = _PendingRead(
+            future=self._executor.submit(self._ocr_cache.read_uncached, bounding_box),
+            start_time=time.perf_counter(),
+            bounding_box=bounding_box,
+        )
+        with self._pending_read_lock:
+            previous_read, self._pending_read = self._pending_read, pending_read
+        if previous_read:
+            previous_read.future.cancel()
 
-    def start_reading_nearby(self) -> None:
-        """Retained as a no-op for compatibility with older integrations."""
+    def current_utterance_time_range(self) -> Optional[tuple[float, float]]:
+        """Return the time range from the last call to start_reading_nearby() until
+        now, or None if it wasn't called within PREFETCH_MAX_AGE_SECONDS.
+
+        Speech engines without word timestamps (e.g. Dragonfly) can pass this as the
+        time range of a command, so that the area looked at while speaking is read.
+        """
+        if self._speech_start_time is None:
+            return None
+        now = time.perf_counter()
+        if now - self._speech_start_time > self.PREFETCH_MAX_AGE_SECONDS:
+            return None
+        return (self._speech_start_time, now)
 
     def read_nearby(
         self,
         time_range: Optional[tuple[float, float]] = None,
+        words: Optional[str] = None,
     ) -> ScreenContents:
-        """Perform OCR nearby the gaze point in the current thread.
+        """Perform OCR nearby the gaze point.
+
+        Joins OCR started by start_reading_nearby() if it covers the requested area,
+        otherwise reads in the current thread.
+
+        If use_fixations is True and the eye tracker implements
+        get_fixations_during_time_range(), only the areas around fixations during the
+        time range are read, instead of the bounds of all gaze.
+
+        With speculative_dwell_seconds, areas read while the user was idle are cached
+        for the time range from the start of the fixation until now.
 
         Arguments:
         time_range: If specified, read within the bounds of gaze during that time.
+        words: The words that will be searched for, if known. With coarse_to_fine,
+               large areas are only read at full resolution around these words.
         """
+        with self.tracer.span("read_nearby"):
+            screen_contents = self._read_nearby(time_range, words)
+        if self.recorder:
+            self.recorder.record_read(screen_contents)
+        return screen_contents
+
+    def _read_nearby(
+        self, time_range: Optional[tuple[float, float]], words: Optional[str]
+    ) -> ScreenContents:
+        self._store_speculative_reads()
+        prefetched = self._join_pending_read()
         if time_range and time_range[0] and time_range[1]:
             start_timestamp, end_timestamp = time_range
-            # Pad the range to account for timestamp inaccuracy.
-            gaze_bounds = (
-                self.eye_tracker.get_gaze_bounds_during_time_range(
-                    start_timestamp - 0.5, end_timestamp + 0.5
-                )
-                if self.eye_tracker and self.eye_tracker.is_connected
-                else None
-            )
-            if not gaze_bounds:
+            ocr_bounds = self._ocr_bounds([time_range])
+            if not ocr_bounds:
+                if prefetched and not prefetched[0]:
+                    self._ocr_cache.store(
+                        (start_timestamp, end_timestamp), None, prefetched[1]
+                    )
                 self._latest_screen_contents = self._ocr_cache.read(
-                    (start_timestamp, end_timestamp), None
+                    (start_timestamp, end_timestamp), None, words
                 )
                 return self._latest_screen_contents
-            ocr_bounds = (
-                gaze_bounds.left - self.gaze_box_padding,
-                gaze_bounds.top - self.gaze_box_padding,
-                gaze_bounds.right + self.gaze_box_padding,
-                gaze_bounds.bottom + self.gaze_box_padding,
-            )
-            self._latest_screen_contents = self._ocr_cache.read(
-                (start_timestamp, end_timestamp), ocr_bounds
+            if (
+                prefetched
+                and prefetched[0]
+                and _merging.contains(prefetched[0], ocr_bounds)
+            ):
+                self._ocr_cache.store(
+                    (start_timestamp, end_timestamp), prefetched[0], prefetched[1]
+                )
+            regions = (
+                self._get_fixation_regions(start_timestamp, end_timestamp)
+                if self.use_fixations
+                else []
             )
+            if len(regions) > 1:
+                self._latest_screen_contents = _merging.merge_screen_contents(
+                    [
+                        self._ocr_cache.read((start_timestamp, end_timestamp), region)
+                        for region in regions
+                    ],
+                    functools.reduce(_merging.union, regions),
+                )
+            else:
+                self._latest_screen_contents = self._ocr_cache.read(
+                    (start_timestamp, end_timestamp),
+                    regions[0] if regions else ocr_bounds,
+                    words,
+                )
             return self._latest_screen_contents
         else:
-            gaze_point = (
-                self.eye_tracker.get_gaze_point()
-                if self.eye_tracker and self.eye_tracker.is_connected
-                else None
-            )
+            gaze_point = self._get_gaze_point()
             if gaze_point:
-                self._latest_screen_contents = self.ocr_reader.read_nearby(gaze_point)
-            else:
+                radius = self.ocr_reader.radius
+                nearby_bounds = (
+                    int(gaze_point[0]) - radius,
+                    int(gaze_point[1]) - radius,
+                    int(gaze_point[0]) + radius,
+                    int(gaze_point[1]) + radius,
+                )
                 if (
-                    self.fallback_when_no_eye_tracker
-                    == EyeTrackerFallback.ACTIVE_WINDOW
+                    prefetched
+                    and prefetched[0]
+                    and _merging.contains(prefetched[0], nearby_bounds)
                 ):
-                    self._latest_screen_contents = self.ocr_reader.read_current_window()
+                    self._latest_screen_contents = _recentered(
+                        prefetched[1],
+                        nearby_bounds,
+                        screen_coordinates=gaze_point,
+                        search_radius=self.ocr_reader.search_radius,
+                    )
                 else:
-                    self._latest_screen_contents = self.ocr_reader.read_screen()
+                    with self._ocr_cache.reader_lock, self.stats.timer("ocr"):
+                        self._latest_screen_contents = self.ocr_reader.read_nearby(
+                            gaze_point
+                        )
+                    self.stats.record_ocr(self._latest_screen_contents.bounding_box)
+            elif prefetched and not prefetched[0]:
+                self._latest_screen_contents = prefetched[1]
+            else:
+                self._latest_screen_contents = self._ocr_cache.read_uncached(
+                    None, words
+                )
             return self._latest_screen_contents
 
     def latest_screen_contents(self) -> ScreenContents:
@@ -303,6 +979,7 @@ class Controller:
             )
         )
 
+    @_recorded_command
     def move_cursor_to_words_generator(
         self,
         words: str,
@@ -314,45 +991,53 @@ class Controller:
         """Same as move_cursor_to_words, except it supports disambiguation through a generator.
         See header comment for details.
         """
-        screen_contents = self.read_nearby(time_range)
-        matches = screen_contents.find_matching_words(words)
+        screen_contents = self.read_nearby(time_range, words)
+        with self._measure_matching("find_matching_words"):
+            matches = _matching.token_index(screen_contents).find_matching_words(words)
         self._write_data(screen_contents, words, matches)
-        cursor_locations = []
-        for locations in matches:
+
+        def coordinates(i: int) -> tuple[int, int]:
+            locations = matches[i]
             if cursor_position == "before":
-                coordinates = locations[0].start_coordinates
+                return locations[0].start_coordinates
             elif cursor_position == "middle":
-                coordinates = (
-                    int((locations[0].left + locations[-1].right) / 2),
-                    int((locations[0].top + locations[-1].bottom) / 2),
-                )
+                return _middle_coordinates(locations)
             elif cursor_position == "after":
-                coordinates = locations[-1].end_coordinates
+                return locations[-1].end_coordinates
             else:
                 raise ValueError(cursor_position)
-            cursor_locations.append(
-                CursorLocation(
-                    base_coordinates=coordinates,
-                    visual_coordinates=coordinates,
-                    move_cursor_right=False,
-                    move_distance=0,
-                    move_past_whitespace_left=False,
-                    move_past_whitespace_right=False,
-                    text_height=locations[0].height,
-                    mouse=self.mouse,
-                    keyboard=self.keyboard,
-                    app_actions=self.app_actions,
-                    click_offset_right=self._as_callable(click_offset_right),
-                )
+
+        context = self._input_context(click_offset_right)
+
+        def plan(i: int) -> CursorLocation:
+            return CursorLocation(
+                base_coordinates=coordinates(i),
+                visual_coordinates=coordinates(i),
+                move_cursor_right=False,
+                move_distance=0,
+                move_past_whitespace_left=False,
+                move_past_whitespace_right=False,
+                text_height=matches[i][0].height,
+                context=context,
             )
-        location = yield from self._choose_cursor_location(
+
+        chosen = yield from self._choose_cursor_location(
             disambiguate=disambiguate,
-            matches=cursor_locations,
+            count=len(matches),
+            base_coordinates=coordinates,
+            plan=plan,
             screen_contents=screen_contents,
         )
-        if not location:
+        if not chosen:
             return None
-        location.move_mouse_cursor()
+        _, location = chosen
+        if self.recorder:
+            self.recorder.record_location(location)
+        with (
+            self.stats.timer("cursor_movement"),
+            self.tracer.span("move_mouse_cursor"),
+        ):
+            location.move_mouse_cursor()
         return location.base_coordinates
 
     move_cursor_to_word = move_cursor_to_words
@@ -391,6 +1076,7 @@ class Controller:
             )
         )
 
+    @_recorded_command
     def move_text_cursor_to_words_generator(
         self,
         words: str,
@@ -406,8 +1092,9 @@ class Controller:
         """Same as move_text_cursor_to_words, except it supports disambiguation through a generator.
         See header comment for details.
         """
-        screen_contents = self.read_nearby(time_range)
-        matches = screen_contents.find_matching_words(words)
+        screen_contents = self.read_nearby(time_range, words)
+        with self._measure_matching("find_matching_words"):
+            matches = _matching.token_index(screen_contents).find_matching_words(words)
         if filter_location_function:
             matches = list(filter(filter_location_function, matches))
         self._write_data(screen_contents, words, matches)
@@ -421,24 +1108,22 @@ class Controller:
                 selection_position = self.SelectionPosition.RIGHT
             else:
                 selection_position = self.SelectionPosition.NONE
-        locations = self._plan_cursor_locations(
-            matches,
+        chosen = yield from self._choose_text_cursor_location(
+            disambiguate=disambiguate,
+            matches=matches,
+            screen_contents=screen_contents,
             cursor_position=cursor_position,
             include_whitespace=include_whitespace,
             click_offset_right=click_offset_right,
             selection_position=selection_position,
         )
-        location = yield from self._choose_cursor_location(
-            disambiguate=disambiguate,
-            matches=locations,
-            screen_contents=screen_contents,
-        )
-        if not location:
+        if not chosen:
             return None
+        _, location = chosen
         if hold_shift:
             self.keyboard.shift_down()
         try:
-            location.move_text_cursor()
+            self._move_text_cursor(location)
         finally:
             if hold_shift:
                 self.keyboard.shift_up()
@@ -446,6 +1131,92 @@ class Controller:
 
     move_text_cursor_to_word = move_text_cursor_to_words
 
+    def move_text_cursor_to_phrases(
+        self,
+        phrases: Sequence[_matching.Phrase],
+        cursor_position: str = "middle",
+        filter_location_function: Optional[WordLocationsPredicate] = None,
+        include_whitespace: bool = False,
+        time_range: Optional[tuple[float, float]] = None,
+        click_offset_right: Callable[[], int] | int = 0,
+    ) -> tuple[Optional[CursorLocation], Optional[str]]:
+        """Move the text cursor nearby the best match of any of the phrases.
+
+        Use this to resolve alternatives, such as a speech recognizer's n-best list,
+        with a single read and a single pass of matching. Phrases may be weighted
+        (e.g. by recognition confidence) by passing (phrase, weight) tuples; the
+        phrase whose match score times weight is highest is used, earlier phrases
+        winning ties.
+
+        Returns the cursor location and the phrase that was matched, or (None, None).
+
+        Arguments: See move_text_cursor_to_words.
+        """
+        return self._extract_result(
+            self.move_text_cursor_to_phrases_generator(
+                phrases,
+                disambiguate=False,
+                cursor_position=cursor_position,
+                filter_location_function=filter_location_function,
+                include_whitespace=include_whitespace,
+                time_range=time_range,
+                click_offset_right=click_offset_right,
+            )
+        )
+
+    @_recorded_command
+    def move_text_cursor_to_phrases_generator(
+        self,
+        phrases: Sequence[_matching.Phrase],
+        disambiguate: bool,
+        cursor_position: str = "middle",
+        filter_location_function: Optional[WordLocationsPredicate] = None,
+        include_whitespace: bool = False,
+        time_range: Optional[tuple[float, float]] = None,
+        click_offset_right: Callable[[], int] | int = 0,
+    ) -> Generator[
+        Sequence[CursorLocation],
+        CursorLocation,
+        tuple[Optional[CursorLocation], Optional[str]],
+    ]:
+        """Same as move_text_cursor_to_phrases, except it supports disambiguation
+        through a generator. See header comment for details.
+        """
+        screen_contents = self.read_nearby(
+            time_range,
+            " ".join(
+                phrase if isinstance(phrase, str) else phrase[0] for phrase in phrases
+            ),
+        )
+        with self._measure_matching("match_phrases"):
+            phrase_matches = _matching.match_phrases(screen_contents, phrases)
+        if filter_location_function:
+            for phrase_match in phrase_matches:
+                phrase_match.matches = list(
+                    filter(filter_location_function, phrase_match.matches)
+                )
+            phrase_matches = [
+                phrase_match for phrase_match in phrase_matches if phrase_match.matches
+            ]
+        if not phrase_matches:
+            return None, None
+        best = phrase_matches[0]
+        self._write_data(screen_contents, best.phrase, best.matches)
+        chosen = yield from self._choose_text_cursor_location(
+            disambiguate=disambiguate,
+            matches=best.matches,
+            screen_contents=screen_contents,
+            cursor_position=cursor_position,
+            include_whitespace=include_whitespace,
+            click_offset_right=click_offset_right,
+            selection_position=self.SelectionPosition.NONE,
+        )
+        if not chosen:
+            return None, None
+        _, location = chosen
+        self._move_text_cursor(location)
+        return location, best.phrase
+
     def move_text_cursor_to_longest_prefix(
         self,
         words: str,
@@ -469,6 +1240,7 @@ class Controller:
             )
         )
 
+    @_recorded_command
     def move_text_cursor_to_longest_prefix_generator(
         self,
         words: str,
@@ -483,33 +1255,34 @@ class Controller:
     ]:
         """Same as move_text_cursor_to_longest_prefix, except it supports
         disambiguation through a generator. See header comment for details."""
-        screen_contents = self.read_nearby(time_range)
-        matches, prefix_length = screen_contents.find_longest_matching_prefix(
-            words, filter_location_function=filter_location_function
-        )
+        screen_contents = self.read_nearby(time_range, words)
+        with self._measure_matching("find_longest_matching_prefix"):
+            matches, prefix_length = _matching.token_index(
+                screen_contents
+            ).find_longest_matching_prefix(
+                words, filter_location_function=filter_location_function
+            )
         self._write_data(screen_contents, words, matches)
         # Guess the selection position.
         selection_position = (
             self.SelectionPosition.LEFT if hold_shift else self.SelectionPosition.NONE
         )
-        locations = self._plan_cursor_locations(
-            matches,
+        chosen = yield from self._choose_text_cursor_location(
+            disambiguate=disambiguate,
+            matches=matches,
+            screen_contents=screen_contents,
             cursor_position=cursor_position,
             include_whitespace=False,
             click_offset_right=click_offset_right,
             selection_position=selection_position,
         )
-        location = yield from self._choose_cursor_location(
-            disambiguate=disambiguate,
-            matches=locations,
-            screen_contents=screen_contents,
-        )
-        if not location:
+        if not chosen:
             return None, 0
+        _, location = chosen
         if hold_shift:
             self.keyboard.shift_down()
         try:
-            location.move_text_cursor()
+            self._move_text_cursor(location)
         finally:
             if hold_shift:
                 self.keyboard.shift_up()
@@ -538,6 +1311,7 @@ class Controller:
             )
         )
 
+    @_recorded_command
     def move_text_cursor_to_longest_suffix_generator(
         self,
         words: str,
@@ -552,38 +1326,40 @@ class Controller:
     ]:
         """Same as move_text_cursor_to_longest_suffix, except it supports
         disambiguation through a generator. See header comment for details."""
-        screen_contents = self.read_nearby(time_range)
-        matches, suffix_length = screen_contents.find_longest_matching_suffix(
-            words, filter_location_function=filter_location_function
-        )
+        screen_contents = self.read_nearby(time_range, words)
+        with self._measure_matching("find_longest_matching_suffix"):
+            matches, suffix_length = _matching.token_index(
+                screen_contents
+            ).find_longest_matching_suffix(
+                words, filter_location_function=filter_location_function
+            )
         self._write_data(screen_contents, words, matches)
         # Guess the selection position.
         selection_position = (
             self.SelectionPosition.RIGHT if hold_shift else self.SelectionPosition.NONE
         )
-        locations = self._plan_cursor_locations(
-            matches,
+        chosen = yield from self._choose_text_cursor_location(
+            disambiguate=disambiguate,
+            matches=matches,
+            screen_contents=screen_contents,
             cursor_position=cursor_position,
             include_whitespace=False,
             click_offset_right=click_offset_right,
             selection_position=selection_position,
         )
-        location = yield from self._choose_cursor_location(
-            disambiguate=disambiguate,
-            matches=locations,
-            screen_contents=screen_contents,
-        )
-        if not location:
+        if not chosen:
             return None, 0
+        _, location = chosen
         if hold_shift:
             self.keyboard.shift_down()
         try:
-            location.move_text_cursor()
+            self._move_text_cursor(location)
         finally:
             if hold_shift:
                 self.keyboard.shift_up()
         return location, suffix_length
 
+    @_recorded_command
     def move_text_cursor_to_difference_generator(
         self,
         words: str,
@@ -594,13 +1370,15 @@ class Controller:
         """Finds onscreen text that matches the start and/or end of the provided words,
         and moves the text cursor to the start of where the words differ. Returns the
         start and end indices of the differing text in the provided words, if found."""
-        screen_contents = self.read_nearby(time_range)
-        prefix_matches, prefix_length = screen_contents.find_longest_matching_prefix(
-            words
-        )
-        suffix_matches, suffix_length = screen_contents.find_longest_matching_suffix(
-            words
-        )
+        screen_contents = self.read_nearby(time_range, words)
+        with self._measure_matching("find_longest_matching_prefix"):
+            prefix_matches, prefix_length = _matching.token_index(
+                screen_contents
+            ).find_longest_matching_prefix(words)
+        with self._measure_matching("find_longest_matching_suffix"):
+            suffix_matches, suffix_length = _matching.token_index(
+                screen_contents
+            ).find_longest_matching_suffix(words)
         matches = list(prefix_matches) + list(suffix_matches)
         self._write_data(screen_contents, words, matches)
         # Find any pairs of matches that are adjacent onscreen. Track whether there is
@@ -610,74 +1388,68 @@ class Controller:
         adjacent_prefix_matches = []
         whitespace_between_matches_list = []
         if prefix_length + suffix_length < len(words):
-            for prefix_match in prefix_matches:
-                for suffix_match in suffix_matches:
-                    if prefix_match[-1].is_adjacent_left_of(
-                        suffix_match[0], allow_whitespace=True
-                    ):
-                        adjacent_prefix_matches.append(prefix_match)
-                        whitespace_between_matches_list.append(
-                            not prefix_match[-1].is_adjacent_left_of(
-                                suffix_match[0], allow_whitespace=False
-                            )
-                        )
+            for prefix_match, whitespace_between_matches in _adjacent_pairs(
+                prefix_matches, suffix_matches
+            ):
+                adjacent_prefix_matches.append(prefix_match)
+                whitespace_between_matches_list.append(whitespace_between_matches)
 
         if adjacent_prefix_matches:
-            locations = self._plan_cursor_locations(
-                adjacent_prefix_matches,
+            chosen = yield from self._choose_text_cursor_location(
+                disambiguate=disambiguate,
+                matches=adjacent_prefix_matches,
+                screen_contents=screen_contents,
                 cursor_position="after",
                 include_whitespace=False,
                 click_offset_right=click_offset_right,
                 selection_position=self.SelectionPosition.NONE,
             )
-
-            location = yield from self._choose_cursor_location(
-                disambiguate=disambiguate,
-                matches=locations,
-                screen_contents=screen_contents,
-            )
-            if not location:
+            if not chosen:
                 return None
-            location.move_text_cursor()
+            index, location = chosen
+            self._move_text_cursor(location)
 
-            whitespace_between_matches = whitespace_between_matches_list[
-                locations.index(location)
-            ]
+            whitespace_between_matches = whitespace_between_matches_list[index]
             if whitespace_between_matches and words[-suffix_length - 1].isspace():
                 return (prefix_length, len(words) - suffix_length - 1)
             else:
                 return (prefix_length, len(words) - suffix_length)
 
         else:
-            prefix_locations = self._plan_cursor_locations(
-                prefix_matches,
-                cursor_position="after",
-                include_whitespace=False,
-                click_offset_right=click_offset_right,
-                selection_position=self.SelectionPosition.NONE,
-            )
-            suffix_locations = self._plan_cursor_locations(
-                suffix_matches,
-                cursor_position="before",
-                include_whitespace=False,
-                click_offset_right=click_offset_right,
-                selection_position=self.SelectionPosition.NONE,
-            )
-            locations = [*prefix_locations, *suffix_locations]
+            # Prefix matches are followed by suffix matches.
+            candidates = [*prefix_matches, *suffix_matches]
+
+            def cursor_position(i: int) -> str:
+                return "after" if i < len(prefix_matches) else "before"
+
+            context = self._input_context(click_offset_right)
 
-            location = yield from self._choose_cursor_location(
+            chosen = yield from self._choose_cursor_location(
                 disambiguate=disambiguate,
-                matches=locations,
+                count=len(candidates),
+                base_coordinates=lambda i: self._plan_base_coordinates(
+                    candidates[i],
+                    cursor_position=cursor_position(i),
+                    selection_position=self.SelectionPosition.NONE,
+                ),
+                plan=lambda i: self._plan_cursor_location(
+                    candidates[i],
+                    cursor_position=cursor_position(i),
+                    include_whitespace=False,
+                    context=context,
+                    selection_position=self.SelectionPosition.NONE,
+                    screen_contents=screen_contents,
+                ),
                 screen_contents=screen_contents,
             )
-            if not location:
+            if not chosen:
                 return None
-            location.move_text_cursor()
+            index, location = chosen
+            self._move_text_cursor(location)
 
-            if location in prefix_locations:
+            if index < len(prefix_matches):
                 return (prefix_length, len(words))
             else:
-                assert location in suffix_locations
                 return (0, len(words) - suffix_length)
 
     def select_text(
@@ -720,6 +1492,7 @@ class Controller:
             )
         )
 
+    @_recorded_command
     def select_text_generator(
         self,
         start_words: str,
@@ -736,24 +1509,32 @@ class Controller:
         """Same as select_text, except it supports disambiguation through a generator.
         See header comment for details.
         """
-        screen_contents = self.read_nearby(start_time_range)
-        start_matches = screen_contents.find_matching_words(start_words)
+        if (
+            self.union_selection_reads
+            and end_words
+            and _is_time_range(start_time_range)
+            and _is_time_range(end_time_range)
+        ):
+            self._read_union(start_time_range, end_time_range)
+        screen_contents = self.read_nearby(start_time_range, start_words)
+        with self._measure_matching("find_matching_words"):
+            start_matches = _matching.token_index(screen_contents).find_matching_words(
+                start_words
+            )
         self._write_data(screen_contents, start_words, start_matches)
-        start_locations = self._plan_cursor_locations(
-            start_matches,
+        chosen = yield from self._choose_text_cursor_location(
+            disambiguate=disambiguate,
+            matches=start_matches,
+            screen_contents=screen_contents,
             cursor_position="after" if after_start else "before",
             include_whitespace=for_deletion and not after_start,
             click_offset_right=click_offset_right,
             selection_position=self.SelectionPosition.LEFT,
         )
-        start_location = yield from self._choose_cursor_location(
-            disambiguate=disambiguate,
-            matches=start_locations,
-            screen_contents=screen_contents,
-        )
-        if not start_location:
+        if not chosen:
             return None
-        start_location.move_text_cursor()
+        start_index, start_location = chosen
+        self._move_text_cursor(start_location)
         time.sleep(self._resolve_value(select_pause_seconds))
         if end_words:
 
@@ -777,17 +1558,18 @@ class Controller:
             )
         else:
             # Select until the end of the start_words match.
-            end_match = start_matches[start_locations.index(start_location)]
+            end_match = start_matches[start_index]
             end_location = self._plan_cursor_location(
                 end_match,
                 cursor_position="before" if before_end else "after",
                 include_whitespace=False,
-                click_offset_right=click_offset_right,
+                context=self._input_context(click_offset_right),
                 selection_position=self.SelectionPosition.RIGHT,
+                screen_contents=screen_contents,
             )
             self.keyboard.shift_down()
             try:
-                end_location.move_text_cursor()
+                self._move_text_cursor(end_location)
             finally:
                 self.keyboard.shift_up()
             return end_location
@@ -810,6 +1592,7 @@ class Controller:
             )
         )
 
+    @_recorded_command
     def select_matching_text_generator(
         self,
         words: str,
@@ -820,24 +1603,23 @@ class Controller:
     ) -> Generator[Sequence[CursorLocation], CursorLocation, Optional[tuple[int, int]]]:
         """Same as select_matching_text, except it supports disambiguation through a
         generator. See header comment for details."""
-        screen_contents = self.read_nearby(time_range)
-        prefix_matches, prefix_length = screen_contents.find_longest_matching_prefix(
-            words
-        )
-        before_prefix_locations = self._plan_cursor_locations(
-            prefix_matches,
+        screen_contents = self.read_nearby(time_range, words)
+        with self._measure_matching("find_longest_matching_prefix"):
+            prefix_matches, prefix_length = _matching.token_index(
+                screen_contents
+            ).find_longest_matching_prefix(words)
+        chosen_prefix = yield from self._choose_text_cursor_location(
+            disambiguate=disambiguate,
+            matches=prefix_matches,
+            screen_contents=screen_contents,
             cursor_position="before",
             include_whitespace=False,
             click_offset_right=click_offset_right,
             selection_position=self.SelectionPosition.LEFT,
         )
-        before_prefix_location = yield from self._choose_cursor_location(
-            disambiguate=disambiguate,
-            matches=before_prefix_locations,
-            screen_contents=screen_contents,
-        )
+        prefix_index, before_prefix_location = chosen_prefix or (None, None)
         if before_prefix_location:
-            before_prefix_location.move_text_cursor()
+            self._move_text_cursor(before_prefix_location)
             time.sleep(self._resolve_value(select_pause_seconds))
         if not time_range:
             screen_contents = self._read_nearby_if_gaze_moved(screen_contents)
@@ -850,25 +1632,26 @@ class Controller:
                 )
         else:
             filter_function = None  # type: ignore[assignment]
-        suffix_matches, suffix_length = screen_contents.find_longest_matching_suffix(
-            words, filter_location_function=filter_function
-        )
-        after_suffix_locations = self._plan_cursor_locations(
-            suffix_matches,
+        with self._measure_matching("find_longest_matching_suffix"):
+            suffix_matches, suffix_length = _matching.token_index(
+                screen_contents
+            ).find_longest_matching_suffix(
+                words, filter_location_function=filter_function
+            )
+        chosen_suffix = yield from self._choose_text_cursor_location(
+            disambiguate=disambiguate,
+            matches=suffix_matches,
+            screen_contents=screen_contents,
             cursor_position="after",
             include_whitespace=False,
             click_offset_right=click_offset_right,
             selection_position=self.SelectionPosition.RIGHT,
         )
-        after_suffix_location = yield from self._choose_cursor_location(
-            disambiguate=disambiguate,
-            matches=after_suffix_locations,
-            screen_contents=screen_contents,
-        )
+        suffix_index, after_suffix_location = chosen_suffix or (None, None)
         if before_prefix_location and after_suffix_location:
             self.keyboard.shift_down()
             try:
-                after_suffix_location.move_text_cursor()
+                self._move_text_cursor(after_suffix_location)
             finally:
                 self.keyboard.shift_up()
             return (prefix_length, len(words) - suffix_length)
@@ -876,39 +1659,39 @@ class Controller:
             return None
         elif before_prefix_location:
             assert not after_suffix_location
-            prefix_match = prefix_matches[
-                before_prefix_locations.index(before_prefix_location)
-            ]
+            assert prefix_index is not None
+            prefix_match = prefix_matches[prefix_index]
             after_prefix_location = self._plan_cursor_location(
                 prefix_match,
                 cursor_position="after",
                 include_whitespace=False,
-                click_offset_right=click_offset_right,
+                context=self._input_context(click_offset_right),
                 selection_position=self.SelectionPosition.RIGHT,
+                screen_contents=screen_contents,
             )
             self.keyboard.shift_down()
             try:
-                after_prefix_location.move_text_cursor()
+                self._move_text_cursor(after_prefix_location)
             finally:
                 self.keyboard.shift_up()
             return (0, prefix_length)
         else:
             assert after_suffix_location and not before_prefix_location
-            suffix_match = suffix_matches[
-                after_suffix_locations.index(after_suffix_location)
-            ]
+            assert suffix_index is not None
+            suffix_match = suffix_matches[suffix_index]
             before_suffix_location = self._plan_cursor_location(
                 suffix_match,
                 cursor_position="before",
                 include_whitespace=False,
-                click_offset_right=click_offset_right,
+                context=self._input_context(click_offset_right),
                 selection_position=self.SelectionPosition.LEFT,
+                screen_contents=screen_contents,
             )
-            before_suffix_location.move_text_cursor()
+            self._move_text_cursor(before_suffix_location)
             time.sleep(self._resolve_value(select_pause_seconds))
             self.keyboard.shift_down()
             try:
-                after_suffix_location.move_text_cursor()
+                self._move_text_cursor(after_suffix_location)
             finally:
                 self.keyboard.shift_up()
             return (len(words) - suffix_length, len(words))
@@ -922,23 +1705,15 @@ class Controller:
         available."""
         if not locations:
             return None
-        reference_point = screen_contents.screen_coordinates
+        reference_point = _reference_point(screen_contents)
         if not reference_point:
-            if screen_contents.bounding_box:
-                # Use center of bounding box as reference point
-                left, top, right, bottom = screen_contents.bounding_box
-                reference_point = ((left + right) // 2, (top + bottom) // 2)
-            else:
-                # "Nearest" is undefined.
-                return None
-        distance_to_words = [
-            (
-                _distance_squared(location.base_coordinates, reference_point),
-                location,
-            )
-            for location in locations
-        ]
-        return min(distance_to_words, key=lambda x: x[0])[1]
+            return None
+        return min(
+            locations,
+            key=lambda location: _distance_squared(
+                location.base_coordinates, reference_point
+            ),
+        )
 
     def move_cursor_to_word_action(self):
         raise RuntimeError(
@@ -960,14 +1735,196 @@ class Controller:
             "Use gaze_ocr.dragonfly.SelectTextAction instead."
         )
 
-    def _read_nearby_if_gaze_moved(
-        self, screen_contents: ScreenContents
-    ) -> ScreenContents:
-        current_gaze = (
+    def _get_gaze_point(self) -> Optional[tuple[float, float]]:
+        return (
             self.eye_tracker.get_gaze_point()
             if self.eye_tracker and self.eye_tracker.is_connected
             else None
         )
+
+    def _join_pending_read(
+        self,
+    ) -> Optional[tuple[Optional[tuple[int, int, int, int]], ScreenContents]]:
+        """Wait for OCR started by start_reading_nearby(), if any, and return the
+        requested bounds (None for the fallback area) with the result. Each result is
+        returned at most once."""
+        with self._pending_read_lock:
+            pending_read, self._pending_read = self._pending_read, None
+        if not pending_read:
+            return None
+        if (
+            time.perf_counter() - pending_read.start_time
+            > self.PREFETCH_MAX_AGE_SECONDS
+        ):
+            # Likely left over from an utterance that never read the screen. If it
+            # already started, wait for it so that the reader isn't used
+            # concurrently.
+            if not pending_read.future.cancel():
+                wait([pending_read.future])
+            return None
+        try:
+            return pending_read.bounding_box, pending_read.future.result()
+        except Exception:
+            logging.exception("Background OCR failed; reading in current thread.")
+            return None
+
+    def _store_speculative_reads(self) -> None:
+        """Cache the reads completed by the speculative reader, if any.
+
+        Reads happen after the words of a command were spoken, so each result is
+        valid from the start of its fixation until now. Later commands read again,
+        in case this one changes the screen.
+        """
+        if not self._speculative_reader:
+            return
+        now = time.perf_counter()
+        for result in self._speculative_reader.take_results():
+            self._ocr_cache.store(
+                (result.start_timestamp, now),
+                result.bounding_box,
+                result.screen_contents,
+                capture_time=result.capture_time,
+            )
+
+    def _ocr_bounds(
+        self, time_ranges: Sequence[tuple[float, float]]
+    ) -> Optional[tuple[int, int, int, int]]:
+        """Return the padded union of the gaze bounds during the time ranges, or None
+        if there was no gaze during any of them."""
+        if not (self.eye_tracker and self.eye_tracker.is_connected):
+            return None
+        ocr_bounds = None
+        for start_timestamp, end_timestamp in time_ranges:
+            with self.tracer.span("get_gaze_bounds_during_time_range"):
+                # Pad the range to account for timestamp inaccuracy.
+                gaze_bounds = self.eye_tracker.get_gaze_bounds_during_time_range(
+                    start_timestamp - 0.5, end_timestamp + 0.5
+                )
+            if not gaze_bounds:
+                return None
+            padded_bounds = (
+                gaze_bounds.left - self.gaze_box_padding,
+                gaze_bounds.top - self.gaze_box_padding,
+                gaze_bounds.right + self.gaze_box_padding,
+                gaze_bounds.bottom + self.gaze_box_padding,
+            )
+            ocr_bounds = (
+                _merging.union(ocr_bounds, padded_bounds)
+                if ocr_bounds
+                else padded_bounds
+            )
+        return ocr_bounds
+
+    def _read_union(self, *time_ranges: Optional[tuple[float, float]]) -> None:
+        """Populate the OCR cache with a single read of the union of the gaze areas
+        during the time ranges, valid for all of them, so that subsequent reads of
+        each time range are cache hits."""
+        ranges = [time_range for time_range in time_ranges if time_range]
+        ocr_bounds = self._ocr_bounds(ranges)
+        if not ocr_bounds:
+            return
+        combined_range = (
+            min(time_range[0] for time_range in ranges),
+            max(time_range[1] for time_range in ranges),
+        )
+        with self.tracer.span("read_union", lambda: {"bounding_box": ocr_bounds}):
+            self._store_speculative_reads()
+            prefetched = self._join_pending_read()
+            if (
+                prefetched
+                and prefetched[0]
+                and _merging.contains(prefetched[0], ocr_bounds)
+            ):
+                self._ocr_cache.store(combined_range, prefetched[0], prefetched[1])
+            else:
+                self._ocr_cache.read(combined_range, ocr_bounds)
+
+    @contextlib.contextmanager
+    def _measure_matching(self, method_name: str) -> Iterator[None]:
+        with self.stats.timer("matching"), self.tracer.span(method_name):
+            yield
+
+    def _move_text_cursor(self, location: CursorLocation) -> None:
+        if self.recorder:
+            self.recorder.record_location(location)
+        with self.stats.timer("cursor_movement"), self.tracer.span("move_text_cursor"):
+            location.move_text_cursor()
+
+    def _pause_speculation(self, generator: Generator) -> Generator:
+        """Run a command generator, without starting speculative reads while it runs.
+
+        Reads aren't paused while the generator waits for a disambiguation choice,
+        so that a generator which is dropped without being closed doesn't pause them
+        until it is garbage collected.
+        """
+        assert self._speculative_reader
+        reader = self._speculative_reader
+        paused = False
+        try:
+            reader.command_started()
+            paused = True
+            value = next(generator)
+            while True:
+                reader.command_finished()
+                paused = False
+                try:
+                    sent = yield value
+                except GeneratorExit:
+                    generator.close()
+                    raise
+                except BaseException as e:
+                    reader.command_started()
+                    paused = True
+                    value = generator.throw(e)
+                else:
+                    reader.command_started()
+                    paused = True
+                    value = generator.send(sent)
+        except StopIteration as e:
+            return e.value
+        finally:
+            if paused:
+                reader.command_finished()
+
+    def _record_command(
+        self, generator: Generator, name: str, arguments: dict[str, Any]
+    ) -> Generator:
+        """Run a command generator, recording it with the recorder."""
+        assert self.recorder
+        record = self.recorder.start_command(
+            name,
+            arguments,
+            eye_tracker_connected=bool(
+                self.eye_tracker and self.eye_tracker.is_connected
+            ),
+            gaze_point=self._get_gaze_point(),
+        )
+        try:
+            return (yield from generator)
+        finally:
+            self.recorder.finish_command(record, self.eye_tracker)
+
+    def _get_fixation_regions(
+        self, start_timestamp: float, end_timestamp: float
+    ) -> list[tuple[int, int, int, int]]:
+        """Return padded areas around fixations during the time range, or an empty
+        list if the eye tracker doesn't detect fixations or found none."""
+        get_fixations = getattr(
+            self.eye_tracker, "get_fixations_during_time_range", None
+        )
+        if not get_fixations:
+            return []
+        with self.tracer.span("get_fixations_during_time_range"):
+            # Pad the range to account for timestamp inaccuracy.
+            fixations = get_fixations(start_timestamp - 0.5, end_timestamp + 0.5)
+        return _fixations.fixation_regions(
+            fixations, self.gaze_box_padding, self.max_fixation_regions
+        )
+
+    def _read_nearby_if_gaze_moved(
+        self, screen_contents: ScreenContents
+    ) -> ScreenContents:
+        current_gaze = self._get_gaze_point()
         previous_gaze = screen_contents.screen_coordinates
         threshold_squared = (
             _squared(screen_contents.search_radius / 2.0)
@@ -979,35 +1936,74 @@ class Controller:
             and previous_gaze
             and _distance_squared(current_gaze, previous_gaze) > threshold_squared
         ):
-            return self.read_nearby()
+            with self.tracer.span("read_nearby_incrementally"):
+                extended = self._extend_nearby(screen_contents, current_gaze)
+            if not extended:
+                return self.read_nearby()
+            self._latest_screen_contents = extended
+            if self.recorder:
+                self.recorder.record_read(extended)
+            return extended
         return screen_contents
 
-    def _plan_cursor_locations(
-        self,
-        matches: Sequence[Sequence[WordLocation]],
-        cursor_position: str,
-        include_whitespace: bool,
-        click_offset_right: Callable[[], int] | int,
-        selection_position: SelectionPosition,
-    ) -> Sequence[CursorLocation]:
-        return [
-            self._plan_cursor_location(
-                match,
-                cursor_position=cursor_position,
-                include_whitespace=include_whitespace,
-                click_offset_right=click_offset_right,
-                selection_position=selection_position,
+    def _extend_nearby(
+        self, screen_contents: ScreenContents, gaze_point: tuple[float, float]
+    ) -> Optional[ScreenContents]:
+        """Read the area nearby the gaze point that screen_contents doesn't cover,
+        and merge it with screen_contents, centered on the gaze point. Returns None if
+        too little of the area is covered to be worth merging."""
+        radius = self.ocr_reader.radius
+        nearby_bounds = (
+            int(gaze_point[0]) - radius,
+            int(gaze_point[1]) - radius,
+            int(gaze_point[0]) + radius,
+            int(gaze_point[1]) + radius,
+        )
+        covered_bounds = screen_contents.bounding_box
+        overlap_area = _merging.area(
+            _merging.intersection(nearby_bounds, covered_bounds)
+        )
+        if overlap_area < OcrCache.PARTIAL_READ_MIN_OVERLAP * _merging.area(
+            nearby_bounds
+        ):
+            return None
+        # Captures are clamped to the screen, which starts at the origin.
+        screen_bounds = (0, 0, sys.maxsize, sys.maxsize)
+        seam_margin = self._ocr_cache.seam_margin
+        pieces = [screen_contents]
+        for strip in _merging.subtract(nearby_bounds, covered_bounds):
+            # Extend into the covered area so that words crossing the seam are read
+            # whole.
+            expanded = _merging.intersection(
+                (
+                    strip[0] - seam_margin,
+                    strip[1] - seam_margin,
+                    strip[2] + seam_margin,
+                    strip[3] + seam_margin,
+                ),
+                nearby_bounds,
             )
-            for match in matches
-        ]
+            expanded = expanded and _merging.intersection(expanded, screen_bounds)
+            if expanded:
+                pieces.append(self._ocr_cache.read_uncached(expanded))
+        return _merging.merge_screen_contents(
+            pieces,
+            _merging.intersection(
+                _merging.union(covered_bounds, nearby_bounds), screen_bounds
+            )
+            or covered_bounds,
+            screen_coordinates=gaze_point,
+            search_radius=self.ocr_reader.search_radius,
+        )
 
     def _plan_cursor_location(
         self,
         locations: Sequence[WordLocation],
         cursor_position: str,
         include_whitespace: bool,
-        click_offset_right: Callable[[], int] | int,
+        context: InputContext,
         selection_position: SelectionPosition,
+        screen_contents: Optional[ScreenContents] = None,
     ) -> CursorLocation:
         if cursor_position == "before":
             distance_from_left = locations[0].left_char_offset
@@ -1019,7 +2015,8 @@ class Controller:
             return self._plan_cursor_movement(
                 start_coordinates=locations[0].start_coordinates,
                 end_coordinates=locations[0].end_coordinates,
-                click_offset_right=click_offset_right,
+                context=context,
+                word_text=self._word_text(context, screen_contents, locations[0]),
                 distance_from_left=distance_from_left,
                 distance_from_right=distance_from_right,
                 selection_position=selection_position,
@@ -1030,10 +2027,7 @@ class Controller:
         elif cursor_position == "middle":
             # Note: if it's helpful, we could change this to position the cursor
             # in the middle of the word.
-            coordinates = (
-                int((locations[0].left + locations[-1].right) / 2),
-                int((locations[0].top + locations[-1].bottom) / 2),
-            )
+            coordinates = _middle_coordinates(locations)
             return CursorLocation(
                 base_coordinates=coordinates,
                 visual_coordinates=coordinates,
@@ -1042,10 +2036,7 @@ class Controller:
                 move_past_whitespace_left=False,
                 move_past_whitespace_right=False,
                 text_height=locations[0].height,
-                mouse=self.mouse,
-                keyboard=self.keyboard,
-                app_actions=self.app_actions,
-                click_offset_right=self._as_callable(click_offset_right),
+                context=context,
             )
         else:
             assert cursor_position == "after"
@@ -1058,7 +2049,8 @@ class Controller:
             return self._plan_cursor_movement(
                 start_coordinates=locations[-1].start_coordinates,
                 end_coordinates=locations[-1].end_coordinates,
-                click_offset_right=click_offset_right,
+                context=context,
+                word_text=self._word_text(context, screen_contents, locations[-1]),
                 distance_from_left=distance_from_left,
                 distance_from_right=distance_from_right,
                 selection_position=selection_position,
@@ -1067,11 +2059,34 @@ class Controller:
                 text_height=locations[0].height,
             )
 
+    @staticmethod
+    def _word_text(
+        context: InputContext,
+        screen_contents: Optional[ScreenContents],
+        location: WordLocation,
+    ) -> Optional[str]:
+        """Return the text of the OCR word containing the location, if word jumps
+        are enabled."""
+        if not context.use_word_jumps or not screen_contents:
+            return None
+        word = screen_contents.result.lines[location.ocr_line_index].words[
+            location.ocr_word_index
+        ]
+        if (
+            len(word.text)
+            != location.left_char_offset
+            + len(location.text)
+            + location.right_char_offset
+        ):
+            return None
+        return word.text
+
     def _plan_cursor_movement(
         self,
         start_coordinates: tuple[int, int],
         end_coordinates: tuple[int, int],
-        click_offset_right: Callable[[], int] | int,
+        context: InputContext,
+        word_text: Optional[str],
         distance_from_left: int,
         distance_from_right: int,
         selection_position: SelectionPosition,
@@ -1086,22 +2101,9 @@ class Controller:
             int(start_coordinates[0] + distance_from_left * estimated_char_width),
             int((start_coordinates[1] + end_coordinates[1]) / 2.0),
         )
-        # Determine whether to start from the left or the right.
-        if not distance_from_left:
-            start_from_left = True
-        elif not distance_from_right:
-            start_from_left = False
-        elif selection_position == self.SelectionPosition.RIGHT:
-            # Mac selection can only be reliably expanded outward.
-            start_from_left = True
-        elif selection_position == self.SelectionPosition.LEFT:
-            # Mac selection can only be reliably expanded outward.
-            start_from_left = False
-        elif distance_from_left <= distance_from_right:
-            start_from_left = True
-        else:
-            start_from_left = False
-        if start_from_left:
+        if self._start_from_left(
+            distance_from_left, distance_from_right, selection_position
+        ):
             return CursorLocation(
                 base_coordinates=start_coordinates,
                 visual_coordinates=visual_coordinates,
@@ -1110,10 +2112,8 @@ class Controller:
                 move_past_whitespace_left=move_past_whitespace_left,
                 move_past_whitespace_right=move_past_whitespace_right,
                 text_height=text_height,
-                mouse=self.mouse,
-                keyboard=self.keyboard,
-                app_actions=self.app_actions,
-                click_offset_right=self._as_callable(click_offset_right),
+                context=context,
+                word_text=word_text,
             )
         else:
             # Start from the right.
@@ -1125,26 +2125,129 @@ class Controller:
                 move_past_whitespace_left=move_past_whitespace_left,
                 move_past_whitespace_right=move_past_whitespace_right,
                 text_height=text_height,
-                mouse=self.mouse,
-                keyboard=self.keyboard,
-                app_actions=self.app_actions,
-                click_offset_right=self._as_callable(click_offset_right),
+                context=context,
+                word_text=word_text,
+            )
+
+    def _plan_base_coordinates(
+        self,
+        locations: Sequence[WordLocation],
+        cursor_position: str,
+        selection_position: SelectionPosition,
+    ) -> tuple[int, int]:
+        """Return the base coordinates of the location that _plan_cursor_location()
+        would plan, without building it."""
+        if cursor_position == "middle":
+            return _middle_coordinates(locations)
+        elif cursor_position == "before":
+            word = locations[0]
+            distance_from_left = word.left_char_offset
+            distance_from_right = word.right_char_offset + len(word.text)
+        else:
+            assert cursor_position == "after"
+            word = locations[-1]
+            distance_from_left = word.left_char_offset + len(word.text)
+            distance_from_right = word.right_char_offset
+        if self._start_from_left(
+            distance_from_left, distance_from_right, selection_position
+        ):
+            return word.start_coordinates
+        else:
+            return word.end_coordinates
+
+    def _start_from_left(
+        self,
+        distance_from_left: int,
+        distance_from_right: int,
+        selection_position: SelectionPosition,
+    ) -> bool:
+        """Determine whether to click at the left or the right of a word before moving
+        the cursor within it."""
+        if not distance_from_left:
+            return True
+        elif not distance_from_right:
+            return False
+        elif selection_position == self.SelectionPosition.RIGHT:
+            # Mac selection can only be reliably expanded outward.
+            return True
+        elif selection_position == self.SelectionPosition.LEFT:
+            # Mac selection can only be reliably expanded outward.
+            return False
+        else:
+            return distance_from_left <= distance_from_right
+
+    def _choose_text_cursor_location(
+        self,
+        disambiguate: bool,
+        matches: Sequence[Sequence[WordLocation]],
+        screen_contents: ScreenContents,
+        cursor_position: str,
+        include_whitespace: bool,
+        click_offset_right: Callable[[], int] | int,
+        selection_position: SelectionPosition,
+    ) -> Generator[
+        Sequence[CursorLocation], CursorLocation, Optional[tuple[int, CursorLocation]]
+    ]:
+        """Choose one of the matches with _choose_cursor_location() and plan the text
+        cursor location for it."""
+        context = self._input_context(click_offset_right)
+        return (
+            yield from self._choose_cursor_location(
+                disambiguate=disambiguate,
+                count=len(matches),
+                base_coordinates=lambda i: self._plan_base_coordinates(
+                    matches[i],
+                    cursor_position=cursor_position,
+                    selection_position=selection_position,
+                ),
+                plan=lambda i: self._plan_cursor_location(
+                    matches[i],
+                    cursor_position=cursor_position,
+                    include_whitespace=include_whitespace,
+                    context=context,
+                    selection_position=selection_position,
+                    screen_contents=screen_contents,
+                ),
+                screen_contents=screen_contents,
             )
+        )
 
     def _choose_cursor_location(
         self,
         disambiguate: bool,
-        matches: Sequence[CursorLocation],
+        count: int,
+        base_coordinates: Callable[[int], tuple[int, int]],
+        plan: Callable[[int], CursorLocation],
         screen_contents: ScreenContents,
-    ) -> Generator[Sequence[CursorLocation], CursorLocation, Optional[CursorLocation]]:
-        if not matches:
+    ) -> Generator[
+        Sequence[CursorLocation], CursorLocation, Optional[tuple[int, CursorLocation]]
+    ]:
+        """Choose among count candidates, returning the index and planned location of
+        the chosen one.
+
+        Without disambiguation, candidates are ranked by distance from their
+        base_coordinates to the gaze point, and only the nearest is planned. With
+        disambiguation, every candidate is planned so that the user can choose.
+        """
+        if not count:
             return None
-        if len(matches) == 1:
-            return matches[0]
-        if disambiguate:
-            return (yield matches)
+        if disambiguate and count > 1:
+            with self.tracer.span("plan_cursor_locations", lambda: {"matches": count}):
+                locations = [plan(i) for i in range(count)]
+            location = yield locations
+            return locations.index(location), location
+        if count == 1:
+            index = 0
         else:
-            return self.find_nearest_cursor_location(matches, screen_contents)
+            reference_point = _reference_point(screen_contents)
+            if not reference_point:
+                return None
+            index = min(
+                range(count),
+                key=lambda i: _distance_squared(base_coordinates(i), reference_point),
+            )
+        with self.tracer.span("plan_cursor_location"):
+            return index, plan(index)
 
     @staticmethod
     def _extract_result(generator):
@@ -1162,14 +2265,13 @@ class Controller:
             result = "multiple" if len(word_locations) > 1 else "success"
         else:
             result = "failure"
-        file_name_prefix = f"{result}_{time.time():.2f}"
-        file_path_prefix = os.path.join(self.save_data_directory, file_name_prefix)
-        if hasattr(screen_contents.screenshot, "save"):
-            screen_contents.screenshot.save(file_path_prefix + ".png")
-        else:
-            screen_contents.screenshot.write_file(file_path_prefix + ".png")
-        with open(file_path_prefix + ".txt", "w") as file:
-            file.write(word)
+        data_writer = self._data_writer
+        if not data_writer or data_writer.directory != self.save_data_directory:
+            # save_data_directory was set or changed after construction.
+            if data_writer:
+                data_writer.close(wait=False)
+            data_writer = self._data_writer = DataWriter(self.save_data_directory)
+        data_writer.submit(screen_contents, word, result)
 
     def _is_valid_selection(self, start_coordinates, end_coordinates):
         epsilon = 5  # pixels
@@ -1186,6 +2288,95 @@ class Controller:
             return True
 
 
+def _recentered(
+    screen_contents: ScreenContents,
+    bounding_box: tuple[int, int, int, int],
+    screen_coordinates: tuple[float, float],
+    search_radius: Optional[int],
+) -> ScreenContents:
+    """Crop the contents to the bounding box and center them on the provided
+    coordinates, as if read with Reader.read_nearby()."""
+    cropped = _merging.cropped(screen_contents, bounding_box)
+    return ScreenContents(
+        screen_coordinates=screen_coordinates,
+        bounding_box=bounding_box,
+        screenshot=cropped.screenshot,
+        result=cropped.result,
+        confidence_threshold=cropped.confidence_threshold,
+        homophones=cropped.homophones,
+        search_radius=search_radius,
+    )
+
+
+def _adjacent_pairs(
+    left_matches: Sequence[Sequence[WordLocation]],
+    right_matches: Sequence[Sequence[WordLocation]],
+) -> list[tuple[Sequence[WordLocation], bool]]:
+    """Return each left match with whether there is whitespace between it and a right
+    match it is adjacent to, once per adjacent right match, in the same order as
+    checking every pair with WordLocation.is_adjacent_left_of().
+
+    Right matches are indexed by where they start on their OCR line, so that each
+    left match looks up only the right matches that could be adjacent to it.
+    """
+    # Maps (line index, word index, char offset) to indices into right_matches.
+    starts: dict[tuple[int, int, int], list[int]] = {}
+    for i, match in enumerate(right_matches):
+        first = match[0]
+        starts.setdefault(
+            (first.ocr_line_index, first.ocr_word_index, first.left_char_offset), []
+        ).append(i)
+    pairs = []
+    for left_match in left_matches:
+        last = left_match[-1]
+        # Within the same OCR word.
+        adjacent = [
+            (i, False)
+            for i in starts.get(
+                (
+                    last.ocr_line_index,
+                    last.ocr_word_index,
+                    last.left_char_offset + len(last.text),
+                ),
+                [],
+            )
+        ]
+        # At the start of the next OCR word.
+        if last.right_char_offset == 0:
+            adjacent.extend(
+                (i, True)
+                for i in starts.get(
+                    (last.ocr_line_index, last.ocr_word_index + 1, 0), []
+                )
+            )
+        adjacent.sort()
+        pairs.extend((left_match, whitespace) for _, whitespace in adjacent)
+    return pairs
+
+
+def _is_time_range(time_range: Optional[tuple[float, float]]) -> bool:
+    return bool(time_range and time_range[0] and time_range[1])
+
+
+def _middle_coordinates(locations: Sequence[WordLocation]) -> tuple[int, int]:
+    return (
+        int((locations[0].left + locations[-1].right) / 2),
+        int((locations[0].top + locations[-1].bottom) / 2),
+    )
+
+
+def _reference_point(screen_contents: ScreenContents) -> Optional[tuple[int, int]]:
+    """Return the point used to find the nearest match: the gaze point if available,
+    otherwise the center of the screen contents."""
+    if screen_contents.screen_coordinates:
+        return screen_contents.screen_coordinates
+    if screen_contents.bounding_box:
+        left, top, right, bottom = screen_contents.bounding_box
+        return ((left + right) // 2, (top + bottom) // 2)
+    # "Nearest" is undefined.
+    return None
+
+
 def _squared(x):
     return x * x
 
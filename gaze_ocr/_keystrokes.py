@@ -0,0 +1,62 @@
+"""Planning of keystrokes that move the text cursor within a word."""
+
+# Characters which end a word jump in every common text widget. Excludes characters
+# which some widgets treat as part of a word, such as "_", "." and "'" (e.g. macOS
+# joins "e.g" and "don't").
+WORD_SEPARATORS = frozenset('()[]{}<>"/\\|-+=*&!?#@$%^~`')
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum()
+
+
+def plan_moves(word: str, start: int, end: int) -> list[tuple[bool, int]]:
+    """Return the moves that take the text cursor from character offset start to end
+    within an OCR word, as (word_jump, count) pairs.
+
+    A word jump (e.g. ctrl-right) is used to cross a run of two or more letters and
+    digits only where the run is bounded by a word separator, so that the jump stops
+    in the same place regardless of application. Rightward jumps never end at the end
+    of the word, because some platforms also skip the following whitespace. Remaining
+    characters are crossed one at a time. Consecutive moves of the same kind are
+    combined.
+    """
+    moves: list[tuple[bool, int]] = []
+
+    def add(word_jump: bool, count: int) -> None:
+        if moves and moves[-1][0] == word_jump:
+            moves[-1] = (word_jump, moves[-1][1] + count)
+        else:
+            moves.append((word_jump, count))
+
+    position = start
+    while position < end:
+        run_end = position
+        while run_end < len(word) and _is_word_char(word[run_end]):
+            run_end += 1
+        if (
+            run_end - position > 1
+            and run_end <= end
+            and run_end < len(word)
+            and word[run_end] in WORD_SEPARATORS
+        ):
+            add(True, 1)
+            position = run_end
+        else:
+            add(False, 1)
+            position += 1
+    while position > end:
+        run_start = position
+        while run_start > 0 and _is_word_char(word[run_start - 1]):
+            run_start -= 1
+        if (
+            position - run_start > 1
+            and run_start >= end
+            and (run_start == 0 or word[run_start - 1] in WORD_SEPARATORS)
+        ):
+            add(True, 1)
+            position = run_start
+        else:
+            add(False, 1)
+            position -= 1
+    return moves
@@ -0,0 +1,295 @@
+"""Indexed matching of words and phrases against ScreenContents."""
+
+import collections
+import re
+import weakref
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import Optional
+
+from screen_ocr import ScreenContents, WordLocation
+
+# A phrase, optionally with a weight (e.g. a speech recognition confidence).
+Phrase = str | tuple[str, float]
+
+WordLocationsPredicate = Callable[[Sequence[WordLocation]], bool]
+
+
+@dataclass
+class PhraseMatch:
+    phrase: str
+    weight: float
+    # Fuzzy match score of the matches, before weighting.
+    score: float
+    # Locations of all matches tied for the best score.
+    matches: Sequence[Sequence[WordLocation]]
+
+    @property
+    def weighted_score(self) -> float:
+        return self.score * self.weight
+
+
+class TokenIndex:
+    """Index of the words in screen contents, for matching with the same results as
+    the ScreenContents.find_* methods.
+
+    The OCR words are split into normalized subwords once, with the positions of each
+    distinct subword. The fuzzy score of each distinct pair of OCR subword and target
+    (or homophone group of the target) is computed once, and shared by all matching
+    using the index. Where every word must match (prefixes and suffixes), only the
+    positions of subwords matching the first target are considered.
+
+    Use token_index() to get the index of screen contents, so that it is shared by
+    every matcher.
+    """
+
+    def __init__(
+        self,
+        screen_contents: ScreenContents,
+        scores: Optional[dict[tuple[str, tuple[str, ...]], float]] = None,
+    ):
+        self.screen_contents = screen_contents
+        # !!! Using private screen_ocr API to match consistently !!!
+        self.lines = [
+            list(ScreenContents._generate_candidates_from_line(line, line_index))
+            for line_index, line in enumerate(screen_contents.result.lines)
+        ]
+        self.normalized_lines = [
+            [ScreenContents._normalize(candidate.text) for candidate in line]
+            for line in self.lines
+        ]
+        # Maps each normalized subword to its (line index, subword index) positions.
+        self.positions: dict[str, list[tuple[int, int]]] = collections.defaultdict(list)
+        for line_index, normalized_line in enumerate(self.normalized_lines):
+            for subword_index, text in enumerate(normalized_line):
+                self.positions[text].append((line_index, subword_index))
+        # Maps (normalized subword, homophone group) to score. May be shared with
+        # indexes of other contents with the same homophones and threshold.
+        self._scores = {} if scores is None else scores
+        self._homophone_groups: dict[str, tuple[str, ...]] = {}
+
+    def find_matching_words(
+        self, target: str, match_each_word: bool = False
+    ) -> Sequence[Sequence[WordLocation]]:
+        """Same as ScreenContents.find_matching_words."""
+        if not target:
+            raise ValueError("target is empty")
+        return self._best_matches(normalized_subwords(target), match_each_word)[1]
+
+    def find_longest_matching_prefix(
+        self,
+        target: str,
+        filter_location_function: Optional[WordLocationsPredicate] = None,
+    ) -> tuple[Sequence[Sequence[WordLocation]], int]:
+        """Same as ScreenContents.find_longest_matching_prefix."""
+        if not target:
+            raise ValueError("target is empty")
+        subwords = [
+            (ScreenContents._normalize(match.group()), match.end())
+            for match in re.finditer(ScreenContents._SUBWORD_REGEX, target)
+        ]
+        last_word_sequences: Sequence[Sequence[WordLocation]] = []
+        last_prefix_length = 0
+        for num_words in range(1, len(subwords) + 1):
+            word_sequences = self._filtered_each_word_matches(
+                [text for text, _ in subwords[:num_words]], filter_location_function
+            )
+            if not word_sequences:
+                break
+            last_word_sequences = word_sequences
+            last_prefix_length = subwords[num_words - 1][1]
+        return last_word_sequences, last_prefix_length
+
+    def find_longest_matching_suffix(
+        self,
+        target: str,
+        filter_location_function: Optional[WordLocationsPredicate] = None,
+    ) -> tuple[Sequence[Sequence[WordLocation]], int]:
+        """Same as ScreenContents.find_longest_matching_suffix."""
+        if not target:
+            raise ValueError("target is empty")
+        subwords = [
+            (ScreenContents._normalize(match.group()), len(target) - match.start())
+            for match in re.finditer(ScreenContents._SUBWORD_REGEX, target)
+        ]
+        last_word_sequences: Sequence[Sequence[WordLocation]] = []
+        last_suffix_length = 0
+        for num_words in range(1, len(subwords) + 1):
+            word_sequences = self._filtered_each_word_matches(
+                [text for text, _ in subwords[-num_words:]], filter_location_function
+            )
+            if not word_sequences:
+                break
+            last_word_sequences = word_sequences
+            last_suffix_length = subwords[-num_words][1]
+        return last_word_sequences, last_suffix_length
+
+    def match_phrases(self, phrases: Iterable[Phrase]) -> list[PhraseMatch]:
+        """Return the matches of each phrase that matched, ordered by descending
+        weighted score. Ties keep the order of the phrases."""
+        phrase_matches = []
+        for phrase in phrases:
+            text, weight = (phrase, 1.0) if isinstance(phrase, str) else phrase
+            if not text:
+                raise ValueError("phrase is empty")
+            score, matches = self._best_matches(
+                normalized_subwords(text), match_each_word=False
+            )
+            if matches:
+                phrase_matches.append(PhraseMatch(text, weight, score, matches))
+        phrase_matches.sort(key=lambda match: -match.weighted_score)
+        return phrase_matches
+
+    def _filtered_each_word_matches(
+        self,
+        targets: list[str],
+        filter_location_function: Optional[WordLocationsPredicate],
+    ) -> Sequence[Sequence[WordLocation]]:
+        # Prefixes are matched as their normalized words joined by spaces.
+        targets = normalized_subwords(" ".join(targets))
+        word_sequences = self._best_matches(targets, match_each_word=True)[1]
+        if filter_location_function:
+            word_sequences = list(filter(filter_location_function, word_sequences))
+        return word_sequences
+
+    def _best_matches(
+        self, targets: list[str], match_each_word: bool
+    ) -> tuple[float, Sequence[Sequence[WordLocation]]]:
+        """Return the best score and the locations of all matches with that score,
+        within the search radius of the screen coordinates."""
+        if not targets:
+            return 0, []
+        threshold = self.screen_contents.confidence_threshold
+        best_score = 0.0
+        best_matches: list[Sequence[WordLocation]] = []
+        for score, candidates in self._scored_candidates(targets, match_each_word):
+            if not score or score < threshold or score < best_score:
+                continue
+            if score > best_score:
+                best_score = score
+                best_matches = []
+            best_matches.append(candidates)
+        return best_score, self._within_search_radius(best_matches)
+
+    def _scored_candidates(self, targets: list[str], match_each_word: bool):
+        """Yield scores and candidates in the same order as ScreenContents."""
+        length = len(targets)
+        if match_each_word and length > 1:
+            # Every subword must score at least the threshold, so only windows
+            # starting with a match of the first target are scored.
+            threshold = self.screen_contents.confidence_threshold
+            starts = sorted(
+                position
+                for text, positions in self.positions.items()
+                if self._score(positions[0], text, targets[0]) >= threshold
+                for position in positions
+            )
+            for line_index, start in starts:
+                line = self.lines[line_index]
+                if start + length > len(line):
+                    continue
+                normalized_line = self.normalized_lines[line_index]
+                yield (
+                    min(
+                        self._score(
+                            (line_index, start + i), normalized_line[start + i], target
+                        )
+                        for i, target in enumerate(targets)
+                    ),
+                    tuple(line[start : start + length]),
+                )
+            return
+        compound_target = "".join(targets)
+        for line_index, (line, normalized_line) in enumerate(
+            zip(self.lines, self.normalized_lines, strict=True)
+        ):
+            # Handle the case where the target words are smashed together.
+            for subword_index, (candidate, text) in enumerate(
+                zip(line, normalized_line, strict=True)
+            ):
+                yield (
+                    self._score((line_index, subword_index), text, compound_target),
+                    [candidate],
+                )
+            if length == 1:
+                continue
+            for start in range(len(line) - length + 1):
+                yield (
+                    sum(
+                        self._score(
+                            (line_index, start + i), normalized_line[start + i], target
+                        )
+                        * len(target)
+                        for i, target in enumerate(targets)
+                    )
+                    / len(compound_target),
+                    tuple(line[start : start + length]),
+                )
+
+    def _score(self, position: tuple[int, int], text: str, target: str) -> float:
+        group = self._homophone_groups.get(target)
+        if group is None:
+            group = tuple(self.screen_contents.homophones.get(target, (target,)))
+            self._homophone_groups[target] = group
+        key = (text, group)
+        score = self._scores.get(key)
+        if score is None:
+            candidate = self.lines[position[0]][position[1]]
+            score = self.screen_contents._score_word(candidate, target)
+            self._scores[key] = score
+        return score
+
+    def _within_search_radius(
+        self, matches: list[Sequence[WordLocation]]
+    ) -> list[Sequence[WordLocation]]:
+        screen_coordinates = self.screen_contents.screen_coordinates
+        search_radius = self.screen_contents.search_radius
+        if not search_radius or not screen_coordinates:
+            return matches
+        return [
+            words
+            for words in matches
+            if ScreenContents._distance_squared(
+                (words[0].left + words[-1].right) / 2.0,
+                (words[0].top + words[-1].bottom) / 2.0,
+                *screen_coordinates,
+            )
+            <= search_radius * search_radius
+        ]
+
+
+_indexes: "weakref.WeakKeyDictionary[ScreenContents, TokenIndex]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def token_index(screen_contents: ScreenContents) -> TokenIndex:
+    """Return the index of the screen contents, building it on first use."""
+    index = _indexes.get(screen_contents)
+    if index is None:
+        index = TokenIndex(screen_contents)
+        _indexes[screen_contents] = index
+    return index
+
+
+def share_scores(source: ScreenContents, derived: ScreenContents) -> None:
+    """Share the scores computed for source with derived, which must have the same
+    homophones and confidence threshold (e.g. a crop of source)."""
+    if derived not in _indexes:
+        _indexes[derived] = TokenIndex(derived, scores=token_index(source)._scores)
+
+
+def match_phrases(
+    screen_contents: ScreenContents, phrases: Iterable[Phrase]
+) -> list[PhraseMatch]:
+    """Return the matches of each phrase in the screen contents, ordered by
+    descending weighted score. See TokenIndex."""
+    return token_index(screen_contents).match_phrases(phrases)
+
+
+def normalized_subwords(text: str) -> list[str]:
+    """Split text into normalized subwords, as matched against OCR words."""
+    return [
+        ScreenContents._normalize(subword)
+        for subword in re.findall(ScreenContents._SUBWORD_REGEX, text)
+    ]
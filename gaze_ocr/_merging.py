@@ -0,0 +1,300 @@
+"""Helpers for combining OCR results of separately read screen areas."""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Optional
+
+from screen_ocr import ScreenContents, _base
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Represented as (left, top, right, bottom) pixel coordinates.
+BoundingBox = tuple[int, int, int, int]
+
+# Words read twice whose boxes overlap by at least this fraction of the smaller box
+# are considered duplicates.
+_DUPLICATE_OVERLAP_FRACTION = 0.5
+
+
+def contains(outer: BoundingBox, inner: BoundingBox) -> bool:
+    return (
+        outer[0] <= inner[0]
+        and outer[1] <= inner[1]
+        and outer[2] >= inner[2]
+        and outer[3] >= inner[3]
+    )
+
+
+def intersection(box1: BoundingBox, box2: BoundingBox) -> Optional[BoundingBox]:
+    """Return the intersection of the boxes, or None if they don't overlap."""
+    left = max(box1[0], box2[0])
+    top = max(box1[1], box2[1])
+    right = min(box1[2], box2[2])
+    bottom = min(box1[3], box2[3])
+    if left >= right or top >= bottom:
+        return None
+    return (left, top, right, bottom)
+
+
+def area(box: Optional[BoundingBox]) -> int:
+    if not box:
+        return 0
+    return max(0, box[2] - box[0]) * max(0, box[3] - box[1])
+
+
+def union(box1: BoundingBox, box2: BoundingBox) -> BoundingBox:
+    return (
+        min(box1[0], box2[0]),
+        min(box1[1], box2[1]),
+        max(box1[2], box2[2]),
+        max(box1[3], box2[3]),
+    )
+
+
+def subtract(box: BoundingBox, covered: BoundingBox) -> list[BoundingBox]:
+    """Return up to four disjoint strips covering the part of box outside covered.
+
+    Top and bottom strips span the full width of the box; left and right strips span
+    the rows shared with covered.
+    """
+    overlap = intersection(box, covered)
+    if not overlap:
+        return [box]
+    left, top, right, bottom = box
+    strips = [
+        (left, top, right, overlap[1]),
+        (left, overlap[3], right, bottom),
+        (left, overlap[1], overlap[0], overlap[3]),
+        (overlap[2], overlap[1], right, overlap[3]),
+    ]
+    return [strip for strip in strips if area(strip)]
+
+
+def cropped(
+    screen_contents: ScreenContents, bounding_box: BoundingBox
+) -> ScreenContents:
+    """Return the contents cropped to the bounding box, including the screenshot.
+
+    ScreenContents.cropped() keeps the whole screenshot, whose origin would then no
+    longer be the top-left of the bounding box. Pillow screenshots are cropped to the
+    bounding box instead (at the screenshot's resolution, and padded with black
+    outside the original). Other screenshots (e.g. Talon's) are kept whole, so check
+    screenshot_matches() before positioning them by the bounding box.
+    """
+    result = screen_contents.cropped(bounding_box)
+    if tuple(bounding_box) != tuple(screen_contents.bounding_box):
+        result.screenshot = _crop_screenshot(
+            screen_contents.screenshot, screen_contents.bounding_box, bounding_box
+        )
+    return result
+
+
+def screenshot_matches(screen_contents: ScreenContents) -> bool:
+    """Return whether the screenshot covers exactly the bounding box, pixel for
+    pixel, so that it can be positioned by the bounding box."""
+    screenshot = screen_contents.screenshot
+    left, top, right, bottom = screen_contents.bounding_box
+    return (
+        screenshot is not None
+        and getattr(screenshot, "width", None) == right - left
+        and getattr(screenshot, "height", None) == bottom - top
+    )
+
+
+@dataclass
+class _Line:
+    words: list[_base.OcrWord]
+    # Indices of the pieces that contributed words.
+    piece_indices: set[int]
+    # (left, top, right, bottom) of the words as originally read.
+    extent: tuple[float, float, float, float]
+
+
+def word_box(word: _base.OcrWord) -> tuple[float, float, float, float]:
+    return (word.left, word.top, word.left + word.width, word.top + word.height)
+
+
+def merge_screen_contents(
+    pieces: Sequence[ScreenContents],
+    bounding_box: BoundingBox,
+    screen_coordinates: Optional[tuple[float, float]] = None,
+    search_radius: Optional[int] = None,
+) -> ScreenContents:
+    """Merge OCR results of overlapping screen areas into a single ScreenContents.
+
+    Words outside the bounding box are dropped. Where pieces overlap, words that were
+    read more than once are de-duplicated, keeping the larger box (the reading least
+    likely to be truncated at a piece boundary). Lines that continue across a piece
+    boundary are joined so that phrases can be matched across seams.
+    """
+    assert pieces
+    lines: list[_Line] = []
+    kept: list[tuple[int, tuple[float, float, float, float], _base.OcrWord]] = []
+    for piece_index, piece in enumerate(pieces):
+        overlaps = [
+            intersection(piece.bounding_box, other.bounding_box)
+            for other in pieces[:piece_index]
+        ]
+        for line in piece.result.lines:
+            words = []
+            for word in line.words:
+                box = word_box(word)
+                if not _intersects(box, bounding_box):
+                    continue
+                if any(
+                    overlap and _intersects(box, overlap) for overlap in overlaps
+                ) and not _keep_word(piece_index, box, word, kept):
+                    continue
+                kept.append((piece_index, box, word))
+                words.append(word)
+            if words:
+                # Measure the extent before words are replaced by later pieces, so
+                # that the line is still joined with the replacements.
+                lines.append(_Line(words, {piece_index}, _line_extent(words)))
+    # Words replaced by a later duplicate are removed after the fact.
+    kept_ids = {id(word) for _, _, word in kept}
+    for line in lines:
+        line.words = [word for word in line.words if id(word) in kept_ids]
+    first = pieces[0]
+    return ScreenContents(
+        screen_coordinates=screen_coordinates,
+        bounding_box=bounding_box,
+        screenshot=_merge_screenshots(pieces, bounding_box),
+        result=_base.OcrResult(_join_lines([line for line in lines if line.words])),
+        confidence_threshold=first.confidence_threshold,
+        homophones=first.homophones,
+        search_radius=search_radius,
+    )
+
+
+def _intersects(
+    box1: tuple[float, float, float, float], box2: tuple[float, float, float, float]
+) -> bool:
+    return not (
+        box1[0] > box2[2] or box1[2] < box2[0] or box1[1] > box2[3] or box1[3] < box2[1]
+    )
+
+
+def _overlap_fraction(
+    box1: tuple[float, float, float, float], box2: tuple[float, float, float, float]
+) -> float:
+    width = min(box1[2], box2[2]) - max(box1[0], box2[0])
+    height = min(box1[3], box2[3]) - max(box1[1], box2[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    smaller_area = min(
+        (box1[2] - box1[0]) * (box1[3] - box1[1]),
+        (box2[2] - box2[0]) * (box2[3] - box2[1]),
+    )
+    return width * height / smaller_area if smaller_area > 0 else 0.0
+
+
+def _keep_word(
+    piece_index: int,
+    box: tuple[float, float, float, float],
+    word: _base.OcrWord,
+    kept: list[tuple[int, tuple[float, float, float, float], _base.OcrWord]],
+) -> bool:
+    """Return whether the word should be kept, removing any smaller duplicates from
+    earlier pieces."""
+    word_area = word.width * word.height
+    for i, (other_piece_index, other_box, other_word) in enumerate(kept):
+        if other_piece_index == piece_index:
+            continue
+        if _overlap_fraction(box, other_box) < _DUPLICATE_OVERLAP_FRACTION:
+            continue
+        if other_word.width * other_word.height >= word_area:
+            return False
+        del kept[i]
+        return True
+    return True
+
+
+def _join_lines(lines: list[_Line]) -> list[_base.OcrLine]:
+    """Join lines from different pieces that are vertically aligned and
+    horizontally adjacent."""
+    joined: list[_Line] = []
+    for line in sorted(lines, key=lambda line: line.extent[0]):
+        left, top, right, bottom = line.extent
+        for joined_line in joined:
+            if joined_line.piece_indices & line.piece_indices:
+                continue
+            joined_left, joined_top, joined_right, joined_bottom = joined_line.extent
+            height = min(bottom - top, joined_bottom - joined_top)
+            if (
+                abs((top + bottom) - (joined_top + joined_bottom)) / 2 <= height / 2
+                and left - joined_right <= 2 * height
+            ):
+                joined_line.words.extend(line.words)
+                joined_line.words.sort(key=lambda word: word.left)
+                joined_line.piece_indices.update(line.piece_indices)
+                joined_line.extent = (
+                    joined_left,
+                    min(top, joined_top),
+                    max(right, joined_right),
+                    max(bottom, joined_bottom),
+                )
+                break
+        else:
+            joined.append(_Line(list(line.words), set(line.piece_indices), line.extent))
+    joined.sort(key=lambda line: (line.extent[1], line.extent[0]))
+    return [_base.OcrLine(line.words) for line in joined]
+
+
+def _line_extent(words: list[_base.OcrWord]) -> tuple[float, float, float, float]:
+    return (
+        min(word.left for word in words),
+        min(word.top for word in words),
+        max(word.left + word.width for word in words),
+        max(word.top + word.height for word in words),
+    )
+
+
+def _crop_screenshot(screenshot, source_box: BoundingBox, box: BoundingBox):
+    """Crop a screenshot of source_box to box, or return it unchanged if it isn't a
+    Pillow image."""
+    if not Image or not isinstance(screenshot, Image.Image):
+        return screenshot
+    # Screenshots of high-DPI displays have more pixels than the box.
+    scale_x = screenshot.width / max(1, source_box[2] - source_box[0])
+    scale_y = screenshot.height / max(1, source_box[3] - source_box[1])
+    return screenshot.crop(
+        (
+            round((box[0] - source_box[0]) * scale_x),
+            round((box[1] - source_box[1]) * scale_y),
+            round((box[2] - source_box[0]) * scale_x),
+            round((box[3] - source_box[1]) * scale_y),
+        )
+    )
+
+
+def _merge_screenshots(pieces: Sequence[ScreenContents], bounding_box: BoundingBox):
+    """Paste the piece screenshots into a single image, if they are Pillow images.
+    Otherwise, returns the screenshot of the first piece.
+
+    Screenshots are positioned by the bounding boxes of their pieces, so pieces whose
+    screenshot doesn't cover exactly their bounding box (e.g. high-DPI captures) are
+    left blank.
+    """
+    screenshots = [piece.screenshot for piece in pieces]
+    if not Image or not all(
+        isinstance(screenshot, Image.Image) for screenshot in screenshots
+    ):
+        return screenshots[0]
+    if (
+        len(pieces) == 1
+        and tuple(pieces[0].bounding_box) == tuple(bounding_box)
+        and screenshot_matches(pieces[0])
+    ):
+        return screenshots[0]
+    left, top, right, bottom = bounding_box
+    merged = Image.new(screenshots[0].mode, (right - left, bottom - top), "white")
+    for piece, screenshot in zip(pieces, screenshots, strict=True):
+        if screenshot_matches(piece):
+            merged.paste(
+                screenshot, (piece.bounding_box[0] - left, piece.bounding_box[1] - top)
+            )
+    return merged
@@ -0,0 +1,556 @@
+"""Recording of Controller commands and offline replay."""
+
+import base64
+import io
+import json
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from screen_ocr import ScreenContents, _base
+
+from . import _gaze_history, _merging
+from ._fixations import Fixation, find_fixations
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Arguments holding time ranges, whose gaze is recorded.
+_TIME_RANGE_ARGUMENTS = ("time_range", "start_time_range", "end_time_range")
+# Extra gaze recorded around time ranges, which covers the padding that Controller
+# adds and eye tracker range tolerance.
+GAZE_TRACE_PADDING_SECONDS = 1.0
+
+
+@dataclass
+class CommandRecord:
+    """A command run by Controller, with everything needed to replay it."""
+
+    name: str
+    # Arguments by name. Arguments which can't be serialized (e.g. functions) are
+    # listed in omitted_arguments instead and take their defaults during replay.
+    arguments: dict[str, Any]
+    omitted_arguments: list[str] = field(default_factory=list)
+    start_time: float = 0.0
+    duration_seconds: float = 0.0
+    eye_tracker_connected: bool = False
+    gaze_point: Optional[tuple[float, float]] = None
+    # Timestamps, xs and ys of gaze around the command's time ranges, in pixels.
+    gaze_trace: tuple[list[float], list[float], list[float]] = ([], [], [])
+    # Results of each read_nearby() during the command.
+    reads: list[ScreenContents] = field(default_factory=list)
+    # Cursor locations that the command moved to, as dicts of CursorLocation
+    # fields.
+    locations: list[dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class ReaderSettings:
+    """Reader attributes needed to rebuild ScreenContents during replay."""
+
+    radius: int = 200
+    search_radius: Optional[int] = 125
+    confidence_threshold: float = 0.75
+    homophones: dict[str, Any] = field(default_factory=dict)
+
+
+class SessionRecorder:
+    """Records Controller commands to a JSON Lines file for offline replay.
+
+    Pass to Controller(recorder=...). Each command is written as a line when it
+    completes, with its arguments, the OCR results (and Pillow screenshots, as PNG)
+    it read, the gaze around its time ranges and the cursor locations it chose.
+    Lines are appended, so a file can hold several sessions; each session starts
+    with a line of reader settings. If path is None, records are only kept in
+    records.
+
+    Commands are written synchronously after they complete, so screenshot encoding
+    delays the next command. Recording is intended for diagnosis, not for
+    continuous use.
+    """
+
+    def __init__(self, path: Optional[str] = None, include_screenshots: bool = True):
+        self.path = path
+        self.include_screenshots = include_screenshots
+        self.records: list[CommandRecord] = []
+        self._current: Optional[CommandRecord] = None
+        self._lock = threading.Lock()
+
+    def record_session(self, ocr_reader: Any) -> None:
+        settings = ReaderSettings(
+            radius=getattr(ocr_reader, "radius", ReaderSettings.radius),
+            search_radius=getattr(
+                ocr_reader, "search_radius", ReaderSettings.search_radius
+            ),
+            confidence_threshold=getattr(
+                ocr_reader,
+                "confidence_threshold",
+                ReaderSettings.confidence_threshold,
+            ),
+            homophones={
+                key: list(values)
+                for key, values in (
+                    getattr(ocr_reader, "homophones", None) or {}
+                ).items()
+            },
+        )
+        self._write_line({"type": "session", **settings.__dict__})
+
+    def start_command(
+        self,
+        name: str,
+        arguments: dict[str, Any],
+        eye_tracker_connected: bool,
+        gaze_point: Optional[tuple[float, float]],
+    ) -> CommandRecord:
+        record = CommandRecord(
+            name=name,
+            arguments={},
+            start_time=time.time(),
+            eye_tracker_connected=eye_tracker_connected,
+            gaze_point=tuple(gaze_point) if gaze_point else None,
+        )
+        for key, value in arguments.items():
+            if _is_serializable(value):
+                record.arguments[key] = value
+            else:
+                record.omitted_arguments.append(key)
+        self._current = record
+        return record
+
+    @property
+    def current_record(self) -> Optional[CommandRecord]:
+        """The record of the command in progress, if any."""
+        return self._current
+
+    def record_read(self, screen_contents: ScreenContents) -> None:
+        if self._current:
+            self._current.reads.append(screen_contents)
+
+    def record_location(self, location: Any) -> None:
+        if self._current:
+            self._current.locations.append(
+                {
+                    "base_coordinates": list(location.base_coordinates),
+                    "visual_coordinates": list(location.visual_coordinates),
+                    "move_cursor_right": location.move_cursor_right,
+                    "move_distance": location.move_distance,
+                    "move_past_whitespace_left": location.move_past_whitespace_left,
+                    "move_past_whitespace_right": location.move_past_whitespace_right,
+                    "text_height": location.text_height,
+                }
+            )
+
+    def finish_command(self, record: CommandRecord, eye_tracker: Any) -> None:
+        record.duration_seconds = time.time() - record.start_time
+        if self._current is record:
+            self._current = None
+        get_points = getattr(eye_tracker, "get_gaze_points_during_time_range", None)
+        window = _gaze_window(record.arguments)
+        if record.eye_tracker_connected and get_points and window:
+            timestamps, xs, ys = get_points(*window)
+            record.gaze_trace = (list(timestamps), list(xs), list(ys))
+        self.records.append(record)
+        self._write_line(
+            {"type": "command", **_encode_record(record, self.include_screenshots)}
+        )
+
+    def _write_line(self, value: dict[str, Any]) -> None:
+        if not self.path:
+            return
+        line = json.dumps(value, separators=(",", ":"))
+        with self._lock, open(self.path, "a") as file:
+            file.write(line + "\n")
+
+
+def load_session(path: str) -> Iterator[tuple[ReaderSettings, CommandRecord]]:
+    """Yield the commands in a recording, with the reader settings of their
+    session."""
+    settings = ReaderSettings()
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            value = json.loads(line)
+            kind = value.pop("type")
+            if kind == "session":
+                settings = ReaderSettings(**value)
+            elif kind == "command":
+                yield settings, _decode_record(value, settings)
+
+
+class ReplayReader:
+    """Reader which serves reads from the OCR results recorded for a command.
+
+    Reads of any area are answered by cropping the recorded results, so that cache
+    and read policies which read different areas can be compared.
+    """
+
+    def __init__(self, settings: ReaderSettings):
+        self.radius = settings.radius
+        self.search_radius = settings.search_radius
+        self.confidence_threshold = settings.confidence_threshold
+        self.homophones = settings.homophones
+        self.reads: list[ScreenContents] = []
+        self.read_count = 0
+
+    def read_screen(
+        self, bounding_box: Optional[_merging.BoundingBox] = None
+    ) -> ScreenContents:
+        return self._read(bounding_box)
+
+    def read_current_window(self) -> ScreenContents:
+        return self._read(None)
+
+    def read_nearby(
+        self,
+        screen_coordinates: tuple[float, float],
+        search_radius: Optional[int] = None,
+        crop_radius: Optional[int] = None,
+    ) -> ScreenContents:
+        radius = crop_radius or self.radius
+        x, y = int(screen_coordinates[0]), int(screen_coordinates[1])
+        return self._read(
+            (x - radius, y - radius, x + radius, y + radius),
+            screen_coordinates=screen_coordinates,
+            search_radius=search_radius or self.search_radius,
+        )
+
+    def _read(
+        self,
+        bounding_box: Optional[_merging.BoundingBox],
+        screen_coordinates: Optional[tuple[float, float]] = None,
+        search_radius: Optional[int] = None,
+    ) -> ScreenContents:
+        self.read_count += 1
+        if not self.reads:
+            return ScreenContents(
+                screen_coordinates=screen_coordinates,
+                bounding_box=bounding_box or (0, 0, 0, 0),
+                screenshot=None,
+                result=_base.OcrResult([]),
+                confidence_threshold=self.confidence_threshold,
+                homophones=self.homophones,
+                search_radius=search_radius,
+            )
+        if not bounding_box:
+            bounding_box = self.reads[0].bounding_box
+            for read in self.reads[1:]:
+                bounding_box = _merging.union(bounding_box, read.bounding_box)
+        return _merging.merge_screen_contents(
+            self.reads,
+            bounding_box,
+            screen_coordinates=screen_coordinates,
+            search_radius=search_radius,
+        )
+
+
+class ReplayEyeTracker:
+    """Eye tracker which serves the gaze recorded for a command."""
+
+    RANGE_TOLERANCE_SECONDS = 0.1
+
+    def __init__(self):
+        self.is_connected = False
+        self._gaze_point: Optional[tuple[float, float]] = None
+        self._history = _gaze_history.GazeHistory(1)
+
+    def load(self, record: CommandRecord) -> None:
+        self.is_connected = record.eye_tracker_connected
+        self._gaze_point = record.gaze_point
+        timestamps, xs, ys = record.gaze_trace
+        self._history = _gaze_history.GazeHistory(max(len(timestamps), 1))
+        for timestamp, x, y in zip(timestamps, xs, ys, strict=True):
+            self._history.append(timestamp, x, y)
+
+    def has_gaze_point(self) -> bool:
+        return self._gaze_point is not None
+
+    def get_gaze_point(self) -> Optional[tuple[float, float]]:
+        return self._gaze_point
+
+    def get_gaze_bounds_during_time_range(
+        self, start_timestamp: float, end_timestamp: float
+    ) -> Optional[_gaze_history.BoundingBox]:
+        bounds = self._history.bounds(
+            start_timestamp,
+            end_timestamp,
+            tolerance_seconds=self.RANGE_TOLERANCE_SECONDS,
+        )
+        if not bounds:
+            return None
+        left, top, right, bottom = bounds
+        return _gaze_history.BoundingBox(
+            left=int(left), right=int(right), top=int(top), bottom=int(bottom)
+        )
+
+    def get_gaze_points_during_time_range(self, start_timestamp, end_timestamp):
+        return self._history.points(
+            start_timestamp,
+            end_timestamp,
+            tolerance_seconds=self.RANGE_TOLERANCE_SECONDS,
+        )
+
+    def get_fixations_during_time_range(
+        self, start_timestamp: float, end_timestamp: float
+    ) -> list[Fixation]:
+        timestamps, xs, ys = self.get_gaze_points_during_time_range(
+            start_timestamp, end_timestamp
+        )
+        return find_fixations(timestamps.tolist(), xs.tolist(), ys.tolist())
+
+
+class ReplayMouse:
+    """Mouse that does nothing, for running commands offline."""
+
+    def move(self, coordinates):
+        pass
+
+    def click(self):
+        pass
+
+
+class ReplayKeyboard:
+    """Keyboard that only tracks whether shift is held, for running commands
+    offline."""
+
+    def __init__(self):
+        self._shift = False
+
+    def shift_down(self):
+        self._shift = True
+
+    def shift_up(self):
+        self._shift = False
+
+    def is_shift_down(self):
+        return self._shift
+
+    def left(self, n=1):
+        pass
+
+    def right(self, n=1):
+        pass
+
+    def word_left(self, n=1):
+        pass
+
+    def word_right(self, n=1):
+        pass
+
+
+@dataclass
+class ReplayedCommand:
+    record: CommandRecord
+    # Cursor locations chosen during replay, in the same form as record.locations.
+    locations: list[dict[str, Any]]
+    duration_seconds: float
+    # Number of reads made through the replay reader, i.e. OCR cache misses.
+    read_count: int
+
+    @property
+    def matches_recording(self) -> bool:
+        return self.locations == self.record.locations
+
+
+def replay_session(
+    path: str, controller_factory: Optional[Callable[..., Any]] = None
+) -> list[ReplayedCommand]:
+    """Replay the commands in a recording through a Controller with fake OCR, input
+    and eye tracking.
+
+    controller_factory is called with the reader, eye tracker, mouse, keyboard and
+    recorder keyword arguments and must return a Controller; use it to vary
+    Controller options (e.g. functools.partial(Controller, partial_reads=True)). A
+    new Controller is created for each session in the file. Disambiguation is
+    resolved by choosing the recorded location when it is among the candidates.
+    """
+    from ._gaze_ocr import Controller
+
+    factory = controller_factory or Controller
+    replayed = []
+    controller = None
+    current_settings = None
+    try:
+        for settings, record in load_session(path):
+            if settings is not current_settings:
+                if controller:
+                    controller.shutdown()
+                current_settings = settings
+                reader = ReplayReader(settings)
+                eye_tracker = ReplayEyeTracker()
+                recorder = SessionRecorder()
+                controller = factory(
+                    ocr_reader=reader,
+                    eye_tracker=eye_tracker,
+                    mouse=ReplayMouse(),
+                    keyboard=ReplayKeyboard(),
+                    recorder=recorder,
+                )
+            reader.reads = record.reads
+            reader.read_count = 0
+            eye_tracker.load(record)
+            start = time.perf_counter()
+            _run_command(controller, record, recorder)
+            duration = time.perf_counter() - start
+            replayed.append(
+                ReplayedCommand(
+                    record=record,
+                    locations=recorder.records[-1].locations
+                    if recorder.records
+                    else [],
+                    duration_seconds=duration,
+                    read_count=reader.read_count,
+                )
+            )
+    finally:
+        if controller:
+            controller.shutdown()
+    return replayed
+
+
+def _run_command(
+    controller: Any, record: CommandRecord, recorder: SessionRecorder
+) -> Any:
+    """Run the recorded command, choosing the recorded location whenever it asks
+    for disambiguation."""
+    generator = getattr(controller, record.name)(**record.arguments)
+    try:
+        candidates = next(generator)
+        while True:
+            # Each choice is the next location moved to, so compare with the
+            # recorded location after those moved to so far.
+            current = recorder.current_record
+            moved = len(current.locations) if current else 0
+            recorded = (
+                record.locations[moved] if moved < len(record.locations) else None
+            )
+            choice = next(
+                (
+                    candidate
+                    for candidate in candidates
+                    if recorded
+                    and list(candidate.base_coordinates) == recorded["base_coordinates"]
+                ),
+                candidates[0],
+            )
+            candidates = generator.send(choice)
+    except StopIteration as e:
+        return e.value
+
+
+def _gaze_window(arguments: dict[str, Any]) -> Optional[tuple[float, float]]:
+    timestamps = [
+        timestamp
+        for key in _TIME_RANGE_ARGUMENTS
+        if arguments.get(key)
+        for timestamp in arguments[key]
+        if timestamp
+    ]
+    if not timestamps:
+        return None
+    return (
+        min(timestamps) - GAZE_TRACE_PADDING_SECONDS,
+        max(timestamps) + GAZE_TRACE_PADDING_SECONDS,
+    )
+
+
+def _is_serializable(value: Any) -> bool:
+    if value is None or isinstance(value, str | int | float | bool):
+        return True
+    if isinstance(value, list | tuple):
+        return all(_is_serializable(item) for item in value)
+    return False
+
+
+def _encode_record(record: CommandRecord, include_screenshots: bool) -> dict[str, Any]:
+    return {
+        "name": record.name,
+        "arguments": record.arguments,
+        "omitted_arguments": record.omitted_arguments,
+        "start_time": record.start_time,
+        "duration_seconds": record.duration_seconds,
+        "eye_tracker_connected": record.eye_tracker_connected,
+        "gaze_point": record.gaze_point,
+        "gaze_trace": [
+            [float(value) for value in values] for values in record.gaze_trace
+        ],
+        "reads": [
+            _encode_screen_contents(read, include_screenshots) for read in record.reads
+        ],
+        "locations": record.locations,
+    }
+
+
+def _decode_record(value: dict[str, Any], settings: ReaderSettings) -> CommandRecord:
+    return CommandRecord(
+        name=value["name"],
+        arguments={
+            key: tuple(argument) if isinstance(argument, list) else argument
+            for key, argument in value["arguments"].items()
+        },
+        omitted_arguments=value["omitted_arguments"],
+        start_time=value["start_time"],
+        duration_seconds=value["duration_seconds"],
+        eye_tracker_connected=value["eye_tracker_connected"],
+        gaze_point=tuple(value["gaze_point"]) if value["gaze_point"] else None,
+        gaze_trace=tuple(value["gaze_trace"]),
+        reads=[_decode_screen_contents(read, settings) for read in value["reads"]],
+        locations=value["locations"],
+    )
+
+
+def _encode_screen_contents(
+    screen_contents: ScreenContents, include_screenshot: bool
+) -> dict[str, Any]:
+    screenshot = None
+    if (
+        include_screenshot
+        and Image
+        and isinstance(screen_contents.screenshot, Image.Image)
+    ):
+        buffer = io.BytesIO()
+        screen_contents.screenshot.save(buffer, "PNG", compress_level=1)
+        screenshot = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return {
+        "screen_coordinates": screen_contents.screen_coordinates,
+        "bounding_box": screen_contents.bounding_box,
+        "search_radius": screen_contents.search_radius,
+        # Each word is [text, left, top, width, height].
+        "lines": [
+            [
+                [word.text, word.left, word.top, word.width, word.height]
+                for word in line.words
+            ]
+            for line in screen_contents.result.lines
+        ],
+        "screenshot": screenshot,
+    }
+
+
+def _decode_screen_contents(
+    value: dict[str, Any], settings: ReaderSettings
+) -> ScreenContents:
+    screenshot = None
+    if value["screenshot"] and Image:
+        screenshot = Image.open(io.BytesIO(base64.b64decode(value["screenshot"])))
+    return ScreenContents(
+        screen_coordinates=tuple(value["screen_coordinates"])
+        if value["screen_coordinates"]
+        else None,
+        bounding_box=tuple(value["bounding_box"]),
+        screenshot=screenshot,
+        result=_base.OcrResult(
+            [
+                _base.OcrLine([_base.OcrWord(*word) for word in line])
+                for line in value["lines"]
+            ]
+        ),
+        confidence_threshold=settings.confidence_threshold,
+        homophones=settings.homophones,
+        search_radius=value["search_radius"],
+    )
@@ -0,0 +1,219 @@
+"""Speculative OCR of the areas the user fixates on while idle."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+from typing import Optional
+
+from screen_ocr import ScreenContents
+
+from . import _merging
+
+
+@dataclass
+class SpeculativeRead:
+    # Start of the fixation (or of idleness, if later) that the area was read for.
+    start_timestamp: float
+    bounding_box: _merging.BoundingBox
+    screen_contents: ScreenContents
+    # When the screenshot was requested, in time.perf_counter() seconds.
+    capture_time: float
+
+
+class SpeculativeReader:
+    """Reads the area the user fixates on in the background while they are idle, so
+    that the next command about it can be served from the OCR cache.
+
+    A thread polls the eye tracker's fixations every poll_interval_seconds. Once the
+    latest fixation has lasted dwell_seconds, no command is running, and there has
+    been no speech, command or read for idle_seconds, the fixated area padded by
+    padding pixels is read with read() on the executor. At most one speculative read
+    is in flight, and an area is not read again within half of max_age_seconds while
+    the gaze stays within it, so that reads requested by commands wait for at most
+    one speculative read. read() must not run concurrently with other reads (e.g.
+    by holding OcrCache.reader_lock).
+
+    Completed reads are collected with take_results(). A read is only valid for the
+    first utterance after it was captured, since later commands may have changed
+    the screen, so call note_speech() whenever speech begins, and command_started()
+    and command_finished() around each command. Reads older than max_age_seconds
+    are discarded.
+    """
+
+    # Fixations that ended longer ago than this are no longer being dwelled on.
+    MAX_FIXATION_LAG_SECONDS = 0.2
+
+    def __init__(
+        self,
+        eye_tracker,
+        read: Callable[[_merging.BoundingBox], ScreenContents],
+        executor: Executor,
+        dwell_seconds: float = 0.5,
+        padding: int = 300,
+        idle_seconds: float = 1.0,
+        max_age_seconds: float = 10.0,
+        poll_interval_seconds: float = 0.1,
+    ):
+        self.eye_tracker = eye_tracker
+        self.read = read
+        self.executor = executor
+        self.dwell_seconds = dwell_seconds
+        self.padding = padding
+        self.idle_seconds = idle_seconds
+        self.max_age_seconds = max_age_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        # Guards all of the following, which are shared with the polling thread and
+        # the executor.
+        self._lock = threading.Lock()
+        self._last_activity_time = -float("inf")
+        self._last_speech_time = -float("inf")
+        self._previous_speech_time = -float("inf")
+        self._last_command_time = -float("inf")
+        self._running_commands = 0
+        self._in_flight: Optional[Future[None]] = None
+        # Bounds and capture time of the latest speculative read.
+        self._last_read: Optional[tuple[_merging.BoundingBox, float]] = None
+        self._results: list[SpeculativeRead] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start polling in a daemon thread."""
+        self._thread = threading.Thread(
+            target=self._run, name="gaze_ocr_speculation", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop polling. A read in flight is left to the executor."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def note_speech(self) -> None:
+        """Record that speech began. Reads captured before the previous speech are
+        discarded, since the command it triggered may have changed the screen."""
+        with self._lock:
+            self._note_speech(time.perf_counter())
+
+    def command_started(self) -> None:
+        """Record that a command started. Speculative reads don't start until it
+        finishes. If note_speech() wasn't called since the previous command, the
+        command's speech is assumed to have begun now."""
+        now = time.perf_counter()
+        with self._lock:
+            if self._running_commands == 0 and (
+                self._last_speech_time <= self._last_command_time
+            ):
+                self._note_speech(now)
+            self._running_commands += 1
+            self._last_command_time = now
+            self._last_activity_time = now
+
+    def command_finished(self) -> None:
+        with self._lock:
+            self._running_commands -= 1
+            self._last_activity_time = time.perf_counter()
+
+    def take_results(self) -> list[SpeculativeRead]:
+        """Wait for the speculative read in flight, if any, and return the reads
+        completed since the last call that are still valid."""
+        with self._lock:
+            self._last_activity_time = time.perf_counter()
+            in_flight = self._in_flight
+        if in_flight and not in_flight.cancelled():
+            # Exceptions are logged by the read itself.
+            in_flight.exception()
+        with self._lock:
+            results, self._results = self._results, []
+            min_capture_time = max(
+                time.perf_counter() - self.max_age_seconds, self._previous_speech_time
+            )
+        return [result for result in results if result.capture_time >= min_capture_time]
+
+    def poll(self) -> None:
+        """Start a speculative read if the user has dwelled on an area while idle."""
+        if not self.eye_tracker.is_connected:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            if self._running_commands or (
+                self._in_flight and not self._in_flight.done()
+            ):
+                return
+            idle_since = max(self._last_activity_time, self._last_speech_time)
+            if now - idle_since < self.idle_seconds:
+                return
+            # Only recent gaze is needed to measure the dwell time.
+            fixations = self.eye_tracker.get_fixations_during_time_range(
+                now - 2 * self.dwell_seconds, now
+            )
+            if not fixations:
+                return
+            fixation = fixations[-1]
+            if (
+                fixation.duration < self.dwell_seconds
+                or now - fixation.end_timestamp > self.MAX_FIXATION_LAG_SECONDS
+            ):
+                return
+            extent = (
+                int(fixation.left),
+                int(fixation.top),
+                int(fixation.right),
+                int(fixation.bottom),
+            )
+            if (
+                self._last_read
+                and now - self._last_read[1] < self.max_age_seconds / 2
+                and _merging.contains(self._last_read[0], extent)
+            ):
+                return
+            bounding_box = (
+                extent[0] - self.padding,
+                extent[1] - self.padding,
+                extent[2] + self.padding,
+                extent[3] + self.padding,
+            )
+            start_timestamp = max(fixation.start_timestamp, idle_since)
+            try:
+                self._in_flight = self.executor.submit(
+                    self._read, start_timestamp, bounding_box
+                )
+            except RuntimeError:
+                # The executor was shut down.
+                return
+            self._last_read = (bounding_box, now)
+
+    def _note_speech(self, now: float) -> None:
+        self._previous_speech_time = self._last_speech_time
+        self._last_speech_time = now
+        self._last_activity_time = now
+        self._last_read = None
+
+    def _read(self, start_timestamp: float, bounding_box: _merging.BoundingBox) -> None:
+        capture_time = time.perf_counter()
+        try:
+            screen_contents = self.read(bounding_box)
+        except Exception:
+            logging.exception("Speculative OCR failed.")
+            return
+        with self._lock:
+            self._results.append(
+                SpeculativeRead(
+                    start_timestamp=start_timestamp,
+                    bounding_box=bounding_box,
+                    screen_contents=screen_contents,
+                    capture_time=capture_time,
+                )
+            )
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_interval_seconds):
+            try:
+                self.poll()
+            except Exception:
+                logging.exception("Failed to poll for speculative OCR.")
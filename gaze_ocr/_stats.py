@@ -0,0 +1,161 @@
+"""Statistics about OCR caching and command latency."""
+
+import contextlib
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+
+from screen_ocr import ScreenContents
+
+
+class LatencyHistogram:
+    """Histogram of latencies with roughly exponential bucket bounds."""
+
+    BUCKET_BOUNDS_SECONDS = (
+        0.001,
+        0.002,
+        0.005,
+        0.01,
+        0.02,
+        0.05,
+        0.1,
+        0.2,
+        0.5,
+        1.0,
+        2.0,
+        5.0,
+    )
+
+    def __init__(self):
+        self.reset()
+
+    def record(self, seconds: float) -> None:
+        for i, bound in enumerate(self.BUCKET_BOUNDS_SECONDS):
+            if seconds <= bound:
+                self._bucket_counts[i] += 1
+                break
+        else:
+            self._bucket_counts[-1] += 1
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def reset(self) -> None:
+        # Includes a final bucket for latencies above the largest bound.
+        self._bucket_counts = [0] * (len(self.BUCKET_BOUNDS_SECONDS) + 1)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a JSON-serializable summary. Buckets are keyed by their upper bound
+        in seconds, non-cumulative."""
+        buckets = {
+            str(bound): count
+            for bound, count in zip(
+                self.BUCKET_BOUNDS_SECONDS, self._bucket_counts, strict=False
+            )
+        }
+        buckets["+Inf"] = self._bucket_counts[-1]
+        return {
+            "count": self.count,
+            "total_seconds": self.total_seconds,
+            "max_seconds": self.max_seconds,
+            "buckets": buckets,
+        }
+
+
+class OcrStats:
+    """Counters and latency histograms for an OcrCache and Controller.
+
+    Cache misses are broken down by reason: "empty" (nothing cached), "time_range"
+    (no entry covers the time range) and "bounds" (entries cover the time range but
+    not the bounding box). Latencies are tracked per stage: "capture" (only measured
+    by readers that capture separately from OCR), "ocr", "matching" and
+    "cursor_movement".
+
+    Safe to update from multiple threads.
+    """
+
+    MISS_REASONS = ("empty", "time_range", "bounds")
+    STAGES = ("capture", "ocr", "matching", "cursor_movement")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {stage: LatencyHistogram() for stage in self.STAGES}
+        self.reset()
+
+    def record_hit(self) -> None:
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self, reason: str) -> None:
+        with self._lock:
+            self.misses[reason] += 1
+
+    def record_ocr(self, bounding_box: tuple[int, int, int, int]) -> None:
+        """Record an OCR read of the provided area, counted as 4 bytes per pixel."""
+        left, top, right, bottom = bounding_box
+        with self._lock:
+            self.ocr_reads += 1
+            self.ocr_bytes += max(0, right - left) * max(0, bottom - top) * 4
+
+    def record_latency(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.latencies[stage].record(seconds)
+
+    @contextlib.contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Context manager which records the latency of its body."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_latency(stage, time.perf_counter() - start)
+
+    @property
+    def populated_cache_calls(self) -> int:
+        """Number of cache reads made when the cache was not empty."""
+        return self.hits + self.misses["time_range"] + self.misses["bounds"]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._reset_locked()
+
+    def snapshot(self, reset: bool = False) -> dict[str, Any]:
+        """Return a JSON-serializable copy of the statistics, optionally resetting
+        them atomically."""
+        with self._lock:
+            snapshot = {
+                "cache": {"hits": self.hits, "misses": dict(self.misses)},
+                "ocr_reads": self.ocr_reads,
+                "ocr_bytes": self.ocr_bytes,
+                "latency": {
+                    stage: histogram.snapshot()
+                    for stage, histogram in self.latencies.items()
+                },
+            }
+            if reset:
+                self._reset_locked()
+        return snapshot
+
+    def _reset_locked(self) -> None:
+        self.hits = 0
+        self.misses = dict.fromkeys(self.MISS_REASONS, 0)
+        self.ocr_reads = 0
+        self.ocr_bytes = 0
+        for histogram in self.latencies.values():
+            histogram.reset()
+
+
+def estimate_size_bytes(screen_contents: ScreenContents) -> int:
+    """Estimate memory used by the contents, dominated by the screenshot."""
+    screenshot = screen_contents.screenshot
+    if screenshot is not None and hasattr(screenshot, "width"):
+        width, height = screenshot.width, screenshot.height
+    else:
+        left, top, right, bottom = screen_contents.bounding_box
+        width, height = right - left, bottom - top
+    # Assume 4 bytes per pixel (RGBA).
+    return max(0, width * height * 4)
@@ -0,0 +1,547 @@
+"""Tile-based readers that limit OCR to parts of the screen."""
+
+import functools
+import hashlib
+import math
+import os
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from screen_ocr import Reader, ScreenContents, _base
+
+from . import _matching, _merging
+from ._stats import OcrStats
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+BoundingBox = _merging.BoundingBox
+
+
+@dataclass
+class _Tile:
+    digest: bytes
+    # Part of the tile that was read. Only valid for requests within this area.
+    coverage: BoundingBox
+    # Words whose center lies within the coverage.
+    lines: list[list[_base.OcrWord]]
+
+
+class DirtyTileReader:
+    """Reader wrapper which only OCRs tiles whose pixels changed since they were last
+    read.
+
+    The screen is divided into a fixed grid of square tiles. Each read captures the
+    tiles overlapping the requested area and fingerprints them with a hash of a
+    downsampled, quantized grayscale thumbnail, which ignores noise that doesn't
+    affect text. Tiles with an unchanged fingerprint reuse their previously read
+    words if the earlier read covered the requested part of the tile. Changed
+    ("dirty") tiles are OCR'd with a margin so that words crossing tile boundaries
+    are read whole.
+
+    Requires screenshots to be Pillow images. Once a capture turns out not to be
+    one, reads are delegated to the wrapped reader. If stats are provided, capture
+    and OCR latency and the OCR'd area are recorded.
+    """
+
+    # If at least this fraction of tiles is dirty, OCR the whole area in one pass.
+    FULL_READ_DIRTY_FRACTION = 0.5
+
+    def __init__(
+        self,
+        ocr_reader: Reader,
+        tile_size: int = 256,
+        thumbnail_size: int = 32,
+        margin: int = 32,
+        max_tiles: int = 4096,
+        stats: Optional[OcrStats] = None,
+    ):
+        self.ocr_reader = ocr_reader
+        self.stats = stats or OcrStats()
+        self.tile_size = tile_size
+        self.thumbnail_size = thumbnail_size
+        self.margin = margin
+        self.max_tiles = max_tiles
+        self._tiles: dict[tuple[int, int], _Tile] = {}
+        # Whether captures are Pillow images, which tiles require.
+        self._supports_tiles = bool(Image)
+        # Maps grayscale values to 16 levels, to ignore antialiasing noise.
+        self._quantize_table = [value & 0xF0 for value in range(256)]
+
+    def read_screen(self, bounding_box: Optional[BoundingBox] = None) -> ScreenContents:
+        """Return ScreenContents for the bounding box, or the entire screen."""
+        if not self._supports_tiles:
+            return self._read_directly(bounding_box)
+        capture_box = self._align_to_grid(bounding_box) if bounding_box else None
+        with self.stats.timer("capture"):
+            # !!! Using private screen_ocr API to capture without OCR !!!
+            screenshot, capture_box = self.ocr_reader._clean_screenshot(capture_box)
+        if not Image or not isinstance(screenshot, Image.Image):
+            # The capture was enlarged to the grid, so capture just the requested
+            # area instead.
+            self._supports_tiles = False
+            return self._read_directly(bounding_box)
+        bounding_box = (
+            _merging.intersection(bounding_box, capture_box) or capture_box
+            if bounding_box
+            else capture_box
+        )
+
+        tile_boxes = {}
+        needed_boxes = {}
+        for key, box in self._tile_boxes(capture_box):
+            needed_box = _merging.intersection(box, bounding_box)
+            if needed_box:
+                tile_boxes[key] = box
+                needed_boxes[key] = needed_box
+        digests = {
+            key: self._digest(screenshot, capture_box, box)
+            for key, box in tile_boxes.items()
+        }
+        dirty_keys = [
+            key
+            for key, digest in digests.items()
+            if key not in self._tiles
+            or self._tiles[key].digest != digest
+            or not _merging.contains(self._tiles[key].coverage, needed_boxes[key])
+        ]
+        if len(dirty_keys) >= self.FULL_READ_DIRTY_FRACTION * len(tile_boxes):
+            read_boxes = [
+                functools.reduce(
+                    _merging.union, (needed_boxes[key] for key in dirty_keys)
+                )
+            ]
+        else:
+            read_boxes = [needed_boxes[key] for key in dirty_keys]
+        for read_box in read_boxes:
+            expanded_box = _merging.intersection(
+                _expand(read_box, self.margin), capture_box
+            )
+            assert expanded_box
+            with self.stats.timer("ocr"):
+                contents = self.ocr_reader.read_image(
+                    _crop(screenshot, capture_box, expanded_box),
+                    bounding_box=expanded_box,
+                )
+            self.stats.record_ocr(expanded_box)
+            for key in dirty_keys:
+                coverage = _merging.intersection(needed_boxes[key], read_box)
+                if coverage == needed_boxes[key]:
+                    self._store_tile(key, digests[key], coverage, contents)
+        pieces = [
+            _tile_contents(self._tiles[key], needed_boxes[key], self.ocr_reader)
+            for key in tile_boxes
+        ]
+        merged = _merging.merge_screen_contents(pieces, bounding_box)
+        merged.screenshot = _crop(screenshot, capture_box, bounding_box)
+        return merged
+
+    def clear(self) -> None:
+        self._tiles.clear()
+
+    def _read_directly(self, bounding_box: Optional[BoundingBox]) -> ScreenContents:
+        with self.stats.timer("ocr"):
+            contents = self.ocr_reader.read_screen(bounding_box)
+        self.stats.record_ocr(contents.bounding_box)
+        return contents
+
+    def _align_to_grid(self, bounding_box: BoundingBox) -> BoundingBox:
+        size = self.tile_size
+        return (
+            bounding_box[0] // size * size,
+            bounding_box[1] // size * size,
+            -(-bounding_box[2] // size) * size,
+            -(-bounding_box[3] // size) * size,
+        )
+
+    def _tile_boxes(self, capture_box: BoundingBox):
+        size = self.tile_size
+        left, top, right, bottom = capture_box
+        for row in range(top // size, -(-bottom // size)):
+            for column in range(left // size, -(-right // size)):
+                box = _merging.intersection(
+                    (column * size, row * size, (column + 1) * size, (row + 1) * size),
+                    capture_box,
+                )
+                if box:
+                    yield (column, row), box
+
+    def _digest(self, screenshot, capture_box: BoundingBox, box: BoundingBox) -> bytes:
+        assert Image
+        thumbnail = (
+            _crop(screenshot, capture_box, box)
+            .convert("L")
+            .resize((self.thumbnail_size, self.thumbnail_size), Image.Resampling.BOX)
+            .point(self._quantize_table)
+        )
+        # Include the box, since tiles at the screen edge may be partial.
+        return hashlib.blake2b(
+            repr(box).encode() + thumbnail.tobytes(), digest_size=16
+        ).digest()
+
+    def _store_tile(
+        self,
+        key: tuple[int, int],
+        digest: bytes,
+        coverage: BoundingBox,
+        contents: ScreenContents,
+    ) -> None:
+        lines = []
+        for line in contents.result.lines:
+            words = [word for word in line.words if _center_within(word, coverage)]
+            if words:
+                lines.append(words)
+        if key not in self._tiles and len(self._tiles) >= self.max_tiles:
+            del self._tiles[next(iter(self._tiles))]
+        self._tiles[key] = _Tile(digest=digest, coverage=coverage, lines=lines)
+
+
+class CoarseToFineReader:
+    """Reader wrapper which reads large areas in two stages, given the words being
+    searched for.
+
+    A downscaled copy of the capture is OCR'd first, to locate words resembling any
+    of the target words with a lenient confidence threshold. Only padded windows
+    around these candidates are then OCR'd at full resolution. If there are no
+    candidates, the window around the center of the requested area (for gaze
+    bounds, roughly the gaze point) is read instead. If the candidates are too many
+    or cover too much of the area, or the entire screen was requested and there are
+    no candidates, the whole area is read at full resolution.
+
+    Results only contain words within the windows that were read, so they shouldn't
+    be cached as a reading of the whole area. read_screen_windows() also returns the
+    contents of each window, which can be cached with the window as their bounds.
+
+    Requires screenshots to be Pillow images; otherwise the whole area is read. If
+    stats are provided, capture and OCR latency and the OCR'd area are recorded.
+    """
+
+    # Target subwords shorter than this match too widely to locate candidates,
+    # unless all of them are this short.
+    MIN_CANDIDATE_LENGTH = 3
+    # If the windows cover at least this fraction of the area, read it all.
+    FULL_READ_WINDOW_FRACTION = 0.5
+
+    def __init__(
+        self,
+        ocr_reader: Reader,
+        scale: float = 0.5,
+        window_padding: tuple[int, int] = (300, 50),
+        coarse_confidence_threshold: float = 0.5,
+        max_windows: int = 8,
+        stats: Optional[OcrStats] = None,
+    ):
+        self.ocr_reader = ocr_reader
+        self.stats = stats or OcrStats()
+        self.scale = scale
+        # Horizontal and vertical padding around candidates, to read the rest of the
+        # phrase and its line.
+        self.window_padding = window_padding
+        self.coarse_confidence_threshold = coarse_confidence_threshold
+        self.max_windows = max_windows
+
+    def __getattr__(self, name: str):
+        return getattr(self.ocr_reader, name)
+
+    def read_screen(
+        self, bounding_box: Optional[BoundingBox], words: str
+    ) -> ScreenContents:
+        """Return ScreenContents of the areas around the words within the bounding
+        box, or the entire screen."""
+        return self.read_screen_windows(bounding_box, words)[0]
+
+    def read_screen_windows(
+        self, bounding_box: Optional[BoundingBox], words: str
+    ) -> tuple[ScreenContents, list[ScreenContents]]:
+        """Like read_screen(), but also return the contents of each window read at
+        full resolution, bounded by the window and with its screenshot cropped to it.
+        If the whole area was read, the only window is the returned contents."""
+        with self.stats.timer("capture"):
+            # !!! Using private screen_ocr API to capture without OCR !!!
+            screenshot, capture_box = self.ocr_reader._clean_screenshot(bounding_box)
+        windows = None
+        if Image and isinstance(screenshot, Image.Image):
+            windows = self._candidate_windows(screenshot, capture_box, words)
+            if not windows and bounding_box:
+                center_x = (capture_box[0] + capture_box[2]) // 2
+                center_y = (capture_box[1] + capture_box[3]) // 2
+                radius = self.ocr_reader.radius
+                windows = [
+                    _merging.intersection(
+                        (
+                            center_x - radius,
+                            center_y - radius,
+                            center_x + radius,
+                            center_y + radius,
+                        ),
+                        capture_box,
+                    )
+                    or capture_box
+                ]
+        if not windows or sum(map(_merging.area, windows)) >= (
+            self.FULL_READ_WINDOW_FRACTION * _merging.area(capture_box)
+        ):
+            windows = [capture_box]
+        pieces = []
+        for window in windows:
+            image = (
+                screenshot
+                if window == capture_box
+                else _crop(screenshot, capture_box, window)
+            )
+            with self.stats.timer("ocr"):
+                pieces.append(self.ocr_reader.read_image(image, bounding_box=window))
+            self.stats.record_ocr(window)
+        if len(pieces) == 1 and windows[0] == capture_box:
+            return pieces[0], pieces
+        merged = _merging.merge_screen_contents(pieces, capture_box)
+        merged.screenshot = screenshot
+        return merged, pieces
+
+    def _candidate_windows(
+        self, screenshot, capture_box: BoundingBox, words: str
+    ) -> Optional[list[BoundingBox]]:
+        """Return the windows around candidates for the words, found by OCR of a
+        downscaled screenshot. Returns None if there are too many windows."""
+        assert Image
+        width = max(1, round(screenshot.width * self.scale))
+        height = max(1, round(screenshot.height * self.scale))
+        scale_x = width / screenshot.width
+        scale_y = height / screenshot.height
+        with self.stats.timer("ocr"):
+            coarse = self.ocr_reader.read_image(
+                screenshot.resize((width, height), Image.Resampling.LANCZOS),
+                bounding_box=(0, 0, width, height),
+            )
+        self.stats.record_ocr((0, 0, width, height))
+        contents = ScreenContents(
+            screen_coordinates=None,
+            bounding_box=capture_box,
+            screenshot=None,
+            result=_base.OcrResult(
+                [
+                    _base.OcrLine(
+                        [
+                            _base.OcrWord(
+                                word.text,
+                                left=capture_box[0] + word.left / scale_x,
+                                top=capture_box[1] + word.top / scale_y,
+                                width=word.width / scale_x,
+                                height=word.height / scale_y,
+                            )
+                            for word in line.words
+                        ]
+                    )
+                    for line in coarse.result.lines
+                ]
+            ),
+            confidence_threshold=self.coarse_confidence_threshold,
+            homophones=self.ocr_reader.homophones,
+            search_radius=None,
+        )
+        index = _matching.token_index(contents)
+        targets = list(dict.fromkeys(_matching.normalized_subwords(words)))
+        targets = [
+            target for target in targets if len(target) >= self.MIN_CANDIDATE_LENGTH
+        ] or targets
+        windows: list[BoundingBox] = []
+        padding_x, padding_y = self.window_padding
+        for target in targets:
+            for match in index.find_matching_words(target):
+                window = _merging.intersection(
+                    (
+                        math.floor(match[0].left) - padding_x,
+                        math.floor(match[0].top) - padding_y,
+                        math.ceil(match[-1].right) + padding_x,
+                        math.ceil(match[-1].bottom) + padding_y,
+                    ),
+                    capture_box,
+                )
+                if not window:
+                    continue
+                # Merge overlapping windows, so that each area is read once.
+                while overlapping := [
+                    other for other in windows if _merging.intersection(window, other)
+                ]:
+                    for other in overlapping:
+                        windows.remove(other)
+                        window = _merging.union(window, other)
+                windows.append(window)
+                if len(windows) > self.max_windows:
+                    return None
+        return windows
+
+
+def _expand(box: BoundingBox, margin: int) -> BoundingBox:
+    return (box[0] - margin, box[1] - margin, box[2] + margin, box[3] + margin)
+
+
+def _crop(screenshot, capture_box: BoundingBox, box: BoundingBox):
+    return screenshot.crop(
+        (
+            box[0] - capture_box[0],
+            box[1] - capture_box[1],
+            box[2] - capture_box[0],
+            box[3] - capture_box[1],
+        )
+    )
+
+
+def _center_within(word: _base.OcrWord, box: BoundingBox) -> bool:
+    center_x = word.left + word.width / 2
+    center_y = word.top + word.height / 2
+    return box[0] <= center_x < box[2] and box[1] <= center_y < box[3]
+
+
+def _tile_contents(tile: _Tile, box: BoundingBox, ocr_reader: Any) -> ScreenContents:
+    return ScreenContents(
+        screen_coordinates=None,
+        bounding_box=box,
+        screenshot=None,
+        result=_base.OcrResult([_base.OcrLine(words) for words in tile.lines]),
+        confidence_threshold=ocr_reader.confidence_threshold,
+        homophones=ocr_reader.homophones,
+        search_radius=None,
+    )
+
+
+# Reader used by tiles OCR'd in worker processes.
+_worker_reader: Optional[Reader] = None
+
+
+def _initialize_worker(reader_factory: Callable[[], Reader]) -> None:
+    global _worker_reader
+    _worker_reader = reader_factory()
+
+
+def _read_in_worker(image, bounding_box: BoundingBox) -> _base.OcrResult:
+    assert _worker_reader
+    return _worker_reader.read_image(image, bounding_box=bounding_box).result
+
+
+class ParallelTileReader:
+    """Reader wrapper which splits large captures into overlapping horizontal bands
+    and OCRs them in parallel.
+
+    Bands span the full width so that only lines crossing a band boundary can be
+    cut, and overlap so that every line is read whole by some band. Words read twice
+    in the overlap are de-duplicated when the results are stitched together.
+
+    Bands are OCR'd in a pool of worker processes, each of which creates its own
+    reader with the (picklable) reader_factory. Readers aren't thread-safe, so
+    without reader_factory the whole capture is read serially by the wrapped reader.
+
+    Implements the Reader methods used by Controller and OcrCache, and delegates
+    other attributes to the wrapped reader.
+    """
+
+    def __init__(
+        self,
+        ocr_reader: Reader,
+        reader_factory: Optional[Callable[[], Reader]] = None,
+        max_workers: Optional[int] = None,
+        min_band_height: int = 200,
+        overlap: int = 48,
+    ):
+        self.ocr_reader = ocr_reader
+        self.reader_factory = reader_factory
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_band_height = min_band_height
+        self.overlap = overlap
+        self._executor: Optional[Executor] = None
+
+    def __getattr__(self, name: str):
+        return getattr(self.ocr_reader, name)
+
+    def read_screen(self, bounding_box: Optional[BoundingBox] = None) -> ScreenContents:
+        """Return ScreenContents for the bounding box, or the entire screen."""
+        # !!! Using private screen_ocr API to capture without OCR !!!
+        screenshot, bounding_box = self.ocr_reader._clean_screenshot(bounding_box)
+        return self.read_image(screenshot, bounding_box=bounding_box)
+
+    def read_current_window(self) -> ScreenContents:
+        # Window captures are only supported by the Talon backend, which can't be
+        # used from worker processes.
+        return self.ocr_reader.read_current_window()
+
+    def read_image(
+        self,
+        image,
+        bounding_box: Optional[BoundingBox] = None,
+        screen_coordinates: Optional[tuple[int, int]] = None,
+        search_radius: Optional[int] = None,
+    ) -> ScreenContents:
+        """Return ScreenContents of the provided image."""
+        bounding_box = bounding_box or (0, 0, image.width, image.height)
+        bands = self._bands(bounding_box)
+        if (
+            len(bands) <= 1
+            or not self.reader_factory
+            or not Image
+            or not isinstance(image, Image.Image)
+        ):
+            return self.ocr_reader.read_image(
+                image,
+                bounding_box=bounding_box,
+                screen_coordinates=screen_coordinates,
+                search_radius=search_radius,
+            )
+        executor = self._get_executor()
+        futures = [
+            executor.submit(_read_in_worker, _crop(image, bounding_box, band), band)
+            for band in bands
+        ]
+        pieces = [
+            ScreenContents(
+                screen_coordinates=None,
+                bounding_box=band,
+                screenshot=None,
+                result=future.result(),
+                confidence_threshold=self.ocr_reader.confidence_threshold,
+                homophones=self.ocr_reader.homophones,
+                search_radius=None,
+            )
+            for band, future in zip(bands, futures, strict=True)
+        ]
+        merged = _merging.merge_screen_contents(
+            pieces,
+            bounding_box,
+            screen_coordinates=screen_coordinates,
+            search_radius=search_radius or self.ocr_reader.search_radius,
+        )
+        merged.screenshot = image
+        return merged
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+
+    def _get_executor(self) -> Executor:
+        if not self._executor:
+            assert self.reader_factory
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_initialize_worker,
+                initargs=(self.reader_factory,),
+            )
+        return self._executor
+
+    def _bands(self, bounding_box: BoundingBox) -> list[BoundingBox]:
+        left, top, right, bottom = bounding_box
+        height = bottom - top
+        count = max(1, min(self.max_workers, height // self.min_band_height))
+        band_height = -(-height // count)
+        return [
+            (
+                left,
+                max(top, top + i * band_height - self.overlap // 2),
+                right,
+                min(bottom, top + (i + 1) * band_height + self.overlap // 2),
+            )
+            for i in range(count)
+        ]
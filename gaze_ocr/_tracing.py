@@ -0,0 +1,108 @@
+"""Lightweight span tracing, exportable as Chrome trace JSON."""
+
+import collections
+import contextlib
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, Optional
+
+# Shared by all disabled tracers, so that disabled spans don't allocate.
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class _Span:
+    __slots__ = ("_args", "_name", "_start_ns", "_tracer")
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        args: Optional[Callable[[], dict[str, Any]]],
+    ):
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+        self._start_ns = 0
+
+    def __enter__(self) -> None:
+        self._start_ns = time.perf_counter_ns()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        end_ns = time.perf_counter_ns()
+        # deque.append is atomic, so spans can be recorded from any thread.
+        self._tracer._spans.append(
+            (
+                self._name,
+                self._start_ns,
+                end_ns - self._start_ns,
+                threading.get_ident(),
+                self._args() if self._args else None,
+            )
+        )
+        return False
+
+
+class Tracer:
+    """Records nestable timing spans in a fixed-size ring buffer.
+
+    Spans are context managers created with span(). Nesting is implied by timing:
+    Chrome and Perfetto nest complete events on the same thread that contain each
+    other. Once capacity spans have been recorded, the oldest are dropped.
+
+    When disabled (the default), span() returns a shared no-op context manager and
+    span arguments are never built.
+    """
+
+    def __init__(self, capacity: int = 10000, enabled: bool = False):
+        self.enabled = enabled
+        self._spans: collections.deque[
+            tuple[str, int, int, int, Optional[dict[str, Any]]]
+        ] = collections.deque(maxlen=capacity)
+
+    def span(
+        self, name: str, args: Optional[Callable[[], dict[str, Any]]] = None
+    ) -> contextlib.AbstractContextManager:
+        """Return a context manager which records its body as a span.
+
+        Arguments:
+        args: Returns arguments to show alongside the span in trace viewers. Only
+              called if the span is recorded, so that building them costs nothing
+              when tracing is disabled.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """Return recorded spans in Chrome trace event format, which can be loaded
+        in chrome://tracing or ui.perfetto.dev."""
+        pid = os.getpid()
+        events = []
+        for name, start_ns, duration_ns, thread_id, args in list(self._spans):
+            event: dict[str, Any] = {
+                "name": name,
+                "ph": "X",
+                "ts": start_ns / 1000,
+                "dur": duration_ns / 1000,
+                "pid": pid,
+                "tid": thread_id,
+            }
+            if args:
+                event["args"] = {
+                    key: value
+                    if isinstance(value, str | int | float | bool)
+                    else repr(value)
+                    for key, value in args.items()
+                }
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str) -> None:
+        with open(path, "w") as file:
+            json.dump(self.chrome_trace(), file)
@@ -13,8 +13,10 @@ class Mouse:
 
 
 class Keyboard:
-    def __init__(self):
+    def __init__(self, word_jump_modifier="c"):
         self._shift = False
+        # Dragonfly modifier held with left/right to move by word, e.g. "a" on Mac.
+        self.word_jump_modifier = word_jump_modifier
 
     def shift_down(self):
         dragonfly.Key("shift:down").execute()
@@ -33,6 +35,12 @@ class Keyboard:
     def right(self, n=1):
         dragonfly.Key(f"right:{n}").execute()
 
+    def word_left(self, n=1):
+        dragonfly.Key(f"{self.word_jump_modifier}-left:{n}").execute()
+
+    def word_right(self, n=1):
+        dragonfly.Key(f"{self.word_jump_modifier}-right:{n}").execute()
+
 
 class Windows:
     def get_monitor_size(self):
@@ -58,7 +66,10 @@ class MoveCursorToWordAction(dragonfly.ActionBase):
         # On Windows, works best if cursor is slightly offset to the right.
         return (
             self.controller.move_cursor_to_word(
-                dynamic_word, self.cursor_position, click_offset_right=1
+                dynamic_word,
+                self.cursor_position,
+                time_range=self.controller.current_utterance_time_range(),
+                click_offset_right=1,
             )
             or False
         )
@@ -78,7 +89,10 @@ class MoveTextCursorAction(dragonfly.ActionBase):
         # On Windows, works best if cursor is slightly offset to the right.
         return (
             self.controller.move_text_cursor_to_word(
-                dynamic_word, self.cursor_position, click_offset_right=1
+                dynamic_word,
+                self.cursor_position,
+                time_range=self.controller.current_utterance_time_range(),
+                click_offset_right=1,
             )
             or False
         )
@@ -104,12 +118,17 @@ class SelectTextAction(dragonfly.ActionBase):
                     dynamic_end_word = self.end_word % data
                 except KeyError:
                     dynamic_end_word = None
+        # Without word timestamps, both words are looked up in the gaze area of the
+        # whole utterance.
+        time_range = self.controller.current_utterance_time_range()
         # On Windows, works best if cursor is slightly offset to the right.
         return (
             self.controller.select_text(
                 dynamic_start_word,
                 dynamic_end_word,
                 for_deletion=self.for_deletion,
+                start_time_range=time_range,
+                end_time_range=time_range if dynamic_end_word else None,
                 click_offset_right=1,
             )
             or False
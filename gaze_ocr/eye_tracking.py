@@ -1,11 +1,23 @@
 """Tobii eye tracker wrapper."""
 
+import math
 import sys
+import time
+
+import numpy as np
+
+from ._fixations import Fixation, find_fixations
+from ._gaze_history import BoundingBox, GazeHistory
 
 
 class EyeTracker:
     _instance = None
 
+    # Gaze up to this long after a time range is included if there is none during it.
+    RANGE_TOLERANCE_SECONDS = 0.1
+    # Keep approximately 5 minutes of gaze points at 90 Hz.
+    HISTORY_CAPACITY = 30000
+
     @classmethod
     def get_connected_instance(cls, *args, **kwargs):
         if not cls._instance:
@@ -51,6 +63,8 @@ class EyeTracker:
         self._screen_scale = (1.0, 1.0)
         self._monitor_size = windows.get_monitor_size()
         self._head_rotation = None
+        # Gaze points in pixels, timestamped with time.perf_counter() on arrival.
+        self._history = GazeHistory(self.HISTORY_CAPACITY)
         self.is_connected = False
 
     def connect(self):
@@ -79,6 +93,7 @@ class EyeTracker:
         self._host = None
         self._gaze_point = None
         self._gaze_state = None
+        self._history.clear()
         self.is_connected = False
         print("Eye tracker disconnected.")
 
@@ -102,6 +117,16 @@ class EyeTracker:
 
     def _handle_gaze_point(self, x, y, timestamp):
         self._gaze_point = (x, y, timestamp)
+        if not self._is_gaze_tracked() or not (math.isfinite(x) and math.isfinite(y)):
+            # Otherwise stale or invalid coordinates would widen the gaze bounds.
+            return
+        # Tobii timestamps use a different clock than the time ranges passed to
+        # get_gaze_bounds_during_time_range().
+        self._history.append(
+            time.perf_counter(),
+            x * self._screen_scale[0],
+            y * self._screen_scale[1],
+        )
 
     def _handle_head_pose(self, sender, stream_data):
         pose = stream_data.Data
@@ -117,11 +142,10 @@ class EyeTracker:
         )
 
     def has_gaze_point(self):
-        return (
-            not self.is_mock
-            and self._gaze_state == GazeTracking.GazeTracked
-            and self._gaze_point
-        )
+        return self._is_gaze_tracked() and self._gaze_point
+
+    def _is_gaze_tracked(self):
+        return not self.is_mock and self._gaze_state == GazeTracking.GazeTracked
 
     def get_gaze_point(self):
         if self.has_gaze_point():
@@ -134,5 +158,40 @@ class EyeTracker:
         else:
             return None
 
+    def get_gaze_bounds_during_time_range(self, start_timestamp, end_timestamp):
+        """Return the bounds of gaze during the time range, in pixels. Timestamps
+        are in time.perf_counter() seconds."""
+        bounds = self._history.bounds(
+            start_timestamp,
+            end_timestamp,
+            tolerance_seconds=self.RANGE_TOLERANCE_SECONDS,
+        )
+        if not bounds:
+            return None
+        left, top, right, bottom = bounds
+        return BoundingBox(
+            left=int(left), top=int(top), right=int(right), bottom=int(bottom)
+        )
+
+    def get_gaze_points_during_time_range(
+        self, start_timestamp, end_timestamp
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the timestamps, xs and ys of gaze during the time range, in pixel
+        coordinates."""
+        return self._history.points(
+            start_timestamp,
+            end_timestamp,
+            tolerance_seconds=self.RANGE_TOLERANCE_SECONDS,
+        )
+
+    def get_fixations_during_time_range(
+        self, start_timestamp, end_timestamp
+    ) -> list[Fixation]:
+        """Return fixations during the time range, in pixel coordinates."""
+        timestamps, xs, ys = self.get_gaze_points_during_time_range(
+            start_timestamp, end_timestamp
+        )
+        return find_fixations(timestamps.tolist(), xs.tolist(), ys.tolist())
+
     def get_monitor_size(self):
         return self._monitor_size
@@ -1,14 +1,16 @@
-import bisect
 import logging
 import time
-from collections import deque
-from dataclasses import dataclass
+from collections.abc import Callable
 from typing import Optional
 
-from talon import actions, tracking_system, ui
+import numpy as np
+from talon import actions, app, tracking_system, ui
 from talon.track import tobii
 from talon.types import Point2d
 
+from ._fixations import Fixation, find_fixations
+from ._gaze_history import BoundingBox, GazeHistory
+
 
 class Mouse:
     def move(self, coordinates):
@@ -19,9 +21,12 @@ class Mouse:
 
 
 class Keyboard:
-    def __init__(self):
+    def __init__(self, word_jump_modifier: Optional[Callable[[], str] | str] = None):
         # shift:down won't affect future keystrokes on Mac, so we track it ourselves.
         self._shift = False
+        # Modifier held with left/right to move by word, or a callable to get it (e.g.
+        # depending on the focused app). Defaults to alt on Mac and ctrl elsewhere.
+        self.word_jump_modifier = word_jump_modifier
 
     def shift_down(self):
         actions.key("shift:down")
@@ -35,18 +40,30 @@ class Keyboard:
         return self._shift
 
     def left(self, n=1):
-        for _ in range(n):
-            if self._shift:
-                actions.key("shift-left")
-            else:
-                actions.key("left")
+        self._press("left", n)
 
     def right(self, n=1):
-        for _ in range(n):
-            if self._shift:
-                actions.key("shift-right")
-            else:
-                actions.key("right")
+        self._press("right", n)
+
+    def word_left(self, n=1):
+        self._press(f"{self._word_jump_modifier()}-left", n)
+
+    def word_right(self, n=1):
+        self._press(f"{self._word_jump_modifier()}-right", n)
+
+    def _press(self, key: str, n: int):
+        if n <= 0:
+            return
+        if self._shift:
+            key = f"shift-{key}"
+        # Repeat in a single action to avoid the overhead of one action per press.
+        actions.key(f"{key}:{n}" if n > 1 else key)
+
+    def _word_jump_modifier(self) -> str:
+        modifier = self.word_jump_modifier
+        if modifier is None:
+            return "alt" if app.platform == "mac" else "ctrl"
+        return modifier() if callable(modifier) else modifier
 
 
 class AppActions:
@@ -77,27 +94,22 @@ class AppActions:
                 return None
 
 
-@dataclass
-class BoundingBox:
-    left: int
-    right: int
-    top: int
-    bottom: int
-
-
 class TalonEyeTracker:
     STALE_GAZE_THRESHOLD_SECONDS = 0.1
+    # Gaze up to this long after a time range is included if there is none during it.
+    RANGE_TOLERANCE_SECONDS = 0.1
+    # Keep approximately 5 minutes of frames on Tobii 5.
+    HISTORY_CAPACITY = 30000
 
     def __init__(self):
-        # Keep approximately 10 seconds of frames on Tobii 5
-        self._queue = deque(maxlen=1000)
+        self._history = GazeHistory(self.HISTORY_CAPACITY)
         self.is_connected = False
         self.connect()
 
     def _on_gaze(self, frame: tobii.GazeFrame):
         if not frame or not frame.gaze:
             return
-        self._queue.append(frame)
+        self._history.append(frame.ts, frame.gaze.x, frame.gaze.y)
 
     def connect(self):
         if self.is_connected:
@@ -114,44 +126,27 @@ class TalonEyeTracker:
         self.is_connected = False
 
     def has_gaze_point(self):
-        if not self._queue:
-            return False
-        return (
-            self._queue[-1].ts > time.perf_counter() - self.STALE_GAZE_THRESHOLD_SECONDS
-        )
+        return self._latest_fresh_gaze() is not None
 
     def get_gaze_point(self):
-        if not self.has_gaze_point():
+        latest = self._latest_fresh_gaze()
+        if not latest:
             return None
-        return self._gaze_to_pixels(self._queue[-1].gaze)
+        _, x, y = latest
+        return self._gaze_to_pixels(Point2d(x=x, y=y))
 
     def get_gaze_bounds_during_time_range(self, start_timestamp, end_timestamp):
-        if not self._queue:
+        if not len(self._history):
             print("No gaze history available")
             return None
-        start_index = bisect.bisect_left(
-            self._queue, start_timestamp, key=lambda f: f.ts
+        bounds = self._history.bounds(
+            start_timestamp,
+            end_timestamp,
+            tolerance_seconds=self.RANGE_TOLERANCE_SECONDS,
         )
-        if start_index == len(self._queue):
-            start_index -= 1
-        end_index = bisect.bisect_left(self._queue, end_timestamp, key=lambda f: f.ts)
-        if end_index == len(self._queue):
-            end_index -= 1
-        left = right = top = bottom = None
-        for i in range(start_index, end_index + 1):
-            frame = self._queue[i]
-            if frame.ts < start_timestamp - 0.1 or frame.ts > end_timestamp + 0.1:
-                continue
-            left = min(frame.gaze.x, left) if left is not None else frame.gaze.x
-            top = min(frame.gaze.y, top) if top is not None else frame.gaze.y
-            right = max(frame.gaze.x, right) if right is not None else frame.gaze.x
-            bottom = max(frame.gaze.y, bottom) if bottom is not None else frame.gaze.y
-        if left is None or right is None or top is None or bottom is None:
-            assert left is None
-            assert right is None
-            assert top is None
-            assert bottom is None
+        if not bounds:
             return None
+        left, top, right, bottom = bounds
         top_left = self._gaze_to_pixels(Point2d(x=left, y=top))
         bottom_right = self._gaze_to_pixels(Point2d(x=right, y=bottom))
         return BoundingBox(
@@ -161,6 +156,39 @@ class TalonEyeTracker:
             bottom=bottom_right[1],
         )
 
+    def get_gaze_points_during_time_range(
+        self, start_timestamp, end_timestamp
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the timestamps, xs and ys of gaze during the time range, in pixel
+        coordinates."""
+        timestamps, xs, ys = self._history.points(
+            start_timestamp,
+            end_timestamp,
+            tolerance_seconds=self.RANGE_TOLERANCE_SECONDS,
+        )
+        rect = ui.main_screen().rect
+        xs = np.clip(rect.x + xs * rect.width, rect.x, rect.x + rect.width)
+        ys = np.clip(rect.y + ys * rect.height, rect.y, rect.y + rect.height)
+        return timestamps, xs, ys
+
+    def get_fixations_during_time_range(
+        self, start_timestamp, end_timestamp
+    ) -> list[Fixation]:
+        """Return fixations during the time range, in pixel coordinates."""
+        timestamps, xs, ys = self.get_gaze_points_during_time_range(
+            start_timestamp, end_timestamp
+        )
+        return find_fixations(timestamps.tolist(), xs.tolist(), ys.tolist())
+
+    def _latest_fresh_gaze(self) -> Optional[tuple[float, float, float]]:
+        latest = self._history.latest()
+        if (
+            not latest
+            or latest[0] <= time.perf_counter() - self.STALE_GAZE_THRESHOLD_SECONDS
+        ):
+            return None
+        return latest
+
     @staticmethod
     def _gaze_to_pixels(gaze):
         rect = ui.main_screen().rect
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+
+from fakes import FakeKeyboard, FakeMouse
+from screen_ocr import ScreenContents, _base
+
+from gaze_ocr._async import AsyncController
+from gaze_ocr._gaze_ocr import Controller
+
+
+class FakeReader:
+    radius = 200
+    search_radius = 125
+    confidence_threshold = 0.5
+    homophones: dict[str, list[str]] = {}
+
+    def __init__(self):
+        self.threads = []
+
+    def read_nearby(self, screen_coordinates, search_radius=None, crop_radius=None):
+        self.threads.append(threading.current_thread())
+        words = [
+            _base.OcrWord("foo", 0, 0, 30, 20),
+            _base.OcrWord("bar", 40, 0, 30, 20),
+            _base.OcrWord("foo", 80, 0, 30, 20),
+        ]
+        return ScreenContents(
+            screen_coordinates=screen_coordinates,
+            bounding_box=(0, 0, 200, 100),
+            screenshot=None,
+            result=_base.OcrResult([_base.OcrLine(words)]),
+            confidence_threshold=self.confidence_threshold,
+            homophones=self.homophones,
+            search_radius=search_radius,
+        )
+
+
+class FakeEyeTracker:
+    is_connected = True
+
+    def get_gaze_point(self):
+        return (45, 10)
+
+
+def _controller(reader):
+    return Controller(
+        reader, FakeEyeTracker(), mouse=FakeMouse(), keyboard=FakeKeyboard()
+    )
+
+
+def test_runs_reads_off_event_loop():
+    reader = FakeReader()
+    controller = AsyncController(_controller(reader))
+
+    async def run():
+        contents = await controller.read_nearby()
+        location = await controller.move_text_cursor_to_words("bar", "after")
+        return contents, location
+
+    contents, location = asyncio.run(run())
+    controller.shutdown()
+    assert contents.screen_coordinates == (45, 10)
+    assert location.visual_coordinates == (70, 10)
+    assert threading.main_thread() not in reader.threads
+
+
+def test_awaits_disambiguation():
+    candidates = []
+
+    async def disambiguate(locations):
+        candidates.append(locations)
+        await asyncio.sleep(0)
+        return locations[-1]
+
+    controller = AsyncController(_controller(FakeReader()), disambiguate=disambiguate)
+
+    async def run():
+        return (
+            await controller.move_text_cursor_to_words("foo", "before"),
+            await controller.move_text_cursor_to_words("bar", "before"),
+        )
+
+    foo, bar = asyncio.run(run())
+    controller.shutdown()
+    # Only ambiguous matches are passed to disambiguate.
+    assert len(candidates) == 1
+    assert [location.visual_coordinates for location in candidates[0]] == [
+        (0, 10),
+        (80, 10),
+    ]
+    assert foo.visual_coordinates == (80, 10)
+    assert bar.visual_coordinates == (40, 10)
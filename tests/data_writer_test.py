@@ -0,0 +1,225 @@
+import os
+import threading
+from types import SimpleNamespace
+from typing import cast
+
+import screen_ocr
+from PIL import Image
+from screen_ocr import ScreenContents, _base
+
+from gaze_ocr._data_writer import DataWriter, ImageFormat
+from gaze_ocr._gaze_ocr import Controller, OcrCache, _recentered
+
+
+class FakeImage:
+    size = (1000, 800)
+
+    def __init__(self, release: threading.Event | None = None):
+        self.release = release
+        self.saves = []
+        self.crops = []
+
+    def save(self, path, **kwargs):
+        if self.release:
+            self.release.wait()
+        self.saves.append((os.path.basename(path), kwargs))
+        with open(path, "wb") as file:
+            file.write(b"x" * 100)
+
+    def crop(self, box):
+        self.crops.append(box)
+        return self
+
+
+def _screen_contents(screenshot, screen_coordinates=None, search_radius=None):
+    return SimpleNamespace(
+        screenshot=screenshot,
+        screen_coordinates=screen_coordinates,
+        search_radius=search_radius,
+        bounding_box=(100, 100, 1100, 900),
+    )
+
+
+def test_writes_capture_in_format(tmp_path):
+    writer = DataWriter(str(tmp_path), image_format=ImageFormat.FAST_PNG)
+    image = FakeImage()
+    assert writer.submit(_screen_contents(image), "hello", "success")
+    writer.close()
+
+    ((name, kwargs),) = image.saves
+    assert name.startswith("success_") and name.endswith(".png")
+    assert kwargs == {"compress_level": 1}
+    (text_file,) = tmp_path.glob("success_*.txt")
+    assert text_file.read_text() == "hello"
+
+
+def test_raw_format_and_crop(tmp_path):
+    writer = DataWriter(
+        str(tmp_path), image_format=ImageFormat.RAW, crop_to_search_area=True
+    )
+    image = FakeImage()
+    writer.submit(
+        _screen_contents(image, screen_coordinates=(150, 500), search_radius=100),
+        "hello",
+        "failure",
+    )
+    writer.close()
+
+    assert image.crops == [(0, 300, 150, 500)]
+    assert image.saves[0][0].endswith(".bmp")
+
+
+def test_drops_when_queue_is_full(tmp_path):
+    release = threading.Event()
+    writer = DataWriter(str(tmp_path), max_queue_size=1)
+    image = FakeImage(release)
+    results = [
+        writer.submit(_screen_contents(image), "hello", "success") for _ in range(5)
+    ]
+    release.set()
+    writer.close()
+
+    # The worker may or may not have taken the first capture off the queue.
+    assert results[0] and not results[-1]
+    assert writer.dropped == results.count(False)
+    assert len(image.saves) == results.count(True)
+
+
+def test_retention_deletes_oldest_captures(tmp_path):
+    for i in range(3):
+        (tmp_path / f"success_{i}.00.png").write_bytes(b"x" * 100)
+        (tmp_path / f"success_{i}.00.txt").write_text("old")
+    (tmp_path / "unrelated.txt").write_text("keep")
+    writer = DataWriter(str(tmp_path), max_captures=2)
+    writer.submit(_screen_contents(FakeImage()), "new", "multiple")
+    writer.close()
+
+    names = sorted(path.name for path in tmp_path.iterdir())
+    assert [name.split("_")[0] for name in names[:2]] == ["multiple", "multiple"]
+    assert names[2:] == ["success_2.00.png", "success_2.00.txt", "unrelated.txt"]
+
+    writer = DataWriter(str(tmp_path), max_bytes=150)
+    writer.submit(_screen_contents(FakeImage()), "new", "failure")
+    writer.close()
+    names = sorted(path.name for path in tmp_path.iterdir())
+    assert [name.split("_")[0] for name in names] == [
+        "failure",
+        "failure",
+        "unrelated.txt",
+    ]
+
+
+def test_controller_writes_in_background(tmp_path):
+    controller = Controller(
+        None, None, mouse=None, keyboard=None, save_data_directory=str(tmp_path)
+    )
+    image = FakeImage()
+    controller._write_data(_screen_contents(image), "hello", [])
+    controller.shutdown()
+
+    assert image.saves[0][0].startswith("failure_")
+    assert controller._data_writer is None
+
+
+class ImageReader:
+    radius = 20
+    search_radius = 10
+
+    def __init__(self):
+        self.screen = Image.new("RGB", (200, 200), "white")
+        self.screen.putpixel((55, 60), (255, 0, 0))
+
+    def read_screen(self, bounding_box=None):
+        bounding_box = bounding_box or (0, 0, 200, 200)
+        return ScreenContents(
+            screen_coordinates=None,
+            bounding_box=bounding_box,
+            screenshot=self.screen.crop(bounding_box),
+            result=_base.OcrResult([]),
+            confidence_threshold=0.5,
+            homophones={},
+            search_radius=None,
+        )
+
+
+def _red_pixels(path):
+    with Image.open(path) as image:
+        return [
+            (x, y)
+            for x in range(image.width)
+            for y in range(image.height)
+            if image.getpixel((x, y))[:3] == (255, 0, 0)
+        ], image.size
+
+
+def test_cache_hit_captures_are_cut_from_their_area(tmp_path):
+    cache = OcrCache(cast(screen_ocr.Reader, ImageReader()))
+    cache.read((1, 4), (20, 20, 120, 120))
+    hit = cache.read((2, 3), (50, 50, 90, 90))
+    recentered = _recentered(hit, (50, 50, 70, 70), (60, 60), search_radius=8)
+
+    writer = DataWriter(str(tmp_path), crop_to_search_area=True)
+    writer.submit(hit, "hit", "success")
+    writer.flush()
+    (hit_path,) = tmp_path.glob("success_*.png")
+    assert _red_pixels(hit_path) == ([(5, 10)], (40, 40))
+
+    for path in tmp_path.iterdir():
+        path.unlink()
+    writer.submit(recentered, "recentered", "success")
+    writer.close()
+    (recentered_path,) = tmp_path.glob("success_*.png")
+    # Cropped to within 8 pixels of (60, 60).
+    assert _red_pixels(recentered_path) == ([(3, 8)], (16, 16))
+
+
+class TalonImage:
+    """Screenshot without Pillow's API, like Talon's."""
+
+    width = 200
+    height = 200
+
+    def __init__(self):
+        self.writes = []
+
+    def write_file(self, path):
+        self.writes.append(os.path.basename(path))
+        with open(path, "wb") as file:
+            file.write(b"x" * 100)
+
+
+class TalonImageReader:
+    radius = 20
+    search_radius = 10
+
+    def __init__(self):
+        self.screen = TalonImage()
+
+    def read_screen(self, bounding_box=None):
+        return ScreenContents(
+            screen_coordinates=None,
+            bounding_box=(0, 0, 200, 200),
+            screenshot=self.screen,
+            result=_base.OcrResult([]),
+            confidence_threshold=0.5,
+            homophones={},
+            search_radius=None,
+        )
+
+
+def test_cache_hit_captures_keep_screenshots_that_cannot_be_cut(tmp_path):
+    reader = TalonImageReader()
+    cache = OcrCache(cast(screen_ocr.Reader, reader))
+    cache.read((1, 4), (0, 0, 200, 200))
+    hit = cache.read((2, 3), (50, 50, 90, 90))
+    recentered = _recentered(hit, (50, 50, 70, 70), (60, 60), search_radius=8)
+    assert hit.screenshot is reader.screen
+    assert recentered.screenshot is reader.screen
+
+    writer = DataWriter(str(tmp_path))
+    writer.submit(hit, "hit", "success")
+    writer.submit(recentered, "recentered", "failure")
+    writer.close()
+
+    assert len(reader.screen.writes) == 2
+    assert len(list(tmp_path.glob("*.png"))) == 2
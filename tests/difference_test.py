@@ -3,34 +3,10 @@
 from typing import cast
 
 import screen_ocr
+from fakes import FakeKeyboard, FakeMouse
 from screen_ocr import _base
 
-from gaze_ocr._gaze_ocr import Controller
-
-
-class FakeMouse:
-    def move(self, coordinates):
-        pass
-
-    def click(self):
-        pass
-
-
-class FakeKeyboard:
-    def shift_down(self):
-        pass
-
-    def shift_up(self):
-        pass
-
-    def is_shift_down(self):
-        return False
-
-    def left(self, n=1):
-        pass
-
-    def right(self, n=1):
-        pass
+from gaze_ocr._gaze_ocr import Controller, _adjacent_pairs
 
 
 class FakeReader:
@@ -95,3 +71,38 @@ def test_difference_with_overlapping_prefix_and_suffix_does_not_crash():
         "hello", disambiguate=False
     )
     assert _run_to_completion(generator) == (0, 0)
+
+
+def _location(line, word, left_offset, right_offset, text):
+    return screen_ocr.WordLocation(
+        left=word * 100 + left_offset * 10,
+        top=line * 20,
+        width=len(text) * 10,
+        height=20,
+        left_char_offset=left_offset,
+        right_char_offset=right_offset,
+        text=text,
+        ocr_word_index=word,
+        ocr_line_index=line,
+    )
+
+
+def test_adjacent_pairs_match_pairwise_check():
+    locations = [
+        _location(line, word, left_offset, right_offset, "ab")
+        for line in range(3)
+        for word in range(4)
+        for left_offset, right_offset in [(0, 0), (0, 2), (2, 0)]
+    ]
+    left_matches = [[location] for location in locations]
+    right_matches = [[location] for location in reversed(locations)]
+
+    expected = [
+        (left_match, not left_match[-1].is_adjacent_left_of(right_match[0], False))
+        for left_match in left_matches
+        for right_match in right_matches
+        if left_match[-1].is_adjacent_left_of(right_match[0], True)
+    ]
+
+    assert expected
+    assert _adjacent_pairs(left_matches, right_matches) == expected
@@ -0,0 +1,122 @@
+import os
+
+import pytest
+from screen_ocr import ScreenContents, _base
+
+Image = pytest.importorskip("PIL.Image")
+
+from gaze_ocr._disk_cache import PersistentOcrReader  # noqa: E402
+
+
+class FakeReader:
+    radius = 200
+    search_radius = 125
+    confidence_threshold = 0.5
+    homophones: dict[str, list[str]] = {}
+
+    def __init__(self):
+        self.images = {}
+        self.ocr_count = 0
+
+    def _clean_screenshot(self, bounding_box):
+        return self.images[bounding_box], bounding_box
+
+    def read_image(
+        self, image, bounding_box=None, screen_coordinates=None, search_radius=None
+    ):
+        self.ocr_count += 1
+        left, top = bounding_box[:2]
+        color = image.getpixel((0, 0))[0]
+        return ScreenContents(
+            screen_coordinates=screen_coordinates,
+            bounding_box=bounding_box,
+            screenshot=image,
+            result=_base.OcrResult(
+                [
+                    _base.OcrLine(
+                        [_base.OcrWord(f"word{color}", left + 5, top + 6, 7, 8)]
+                    )
+                ]
+            ),
+            confidence_threshold=self.confidence_threshold,
+            homophones=self.homophones,
+            search_radius=search_radius,
+        )
+
+
+def _word(screen_contents):
+    (line,) = screen_contents.result.lines
+    (word,) = line.words
+    return (word.text, word.left, word.top, word.width, word.height)
+
+
+def test_serves_identical_pixels_from_disk(tmp_path):
+    path = str(tmp_path / "ocr_cache")
+    fake = FakeReader()
+    fake.images[(0, 0, 100, 100)] = Image.new("RGB", (100, 100), (1, 0, 0))
+    fake.images[(50, 60, 150, 160)] = Image.new("RGB", (100, 100), (1, 0, 0))
+    fake.images[(0, 0, 100, 50)] = Image.new("RGB", (100, 50), (2, 0, 0))
+    reader = PersistentOcrReader(fake, path)
+
+    assert _word(reader.read_screen((0, 0, 100, 100))) == ("word1", 5, 6, 7, 8)
+    # Same pixels elsewhere on screen are served with translated positions.
+    moved = reader.read_screen((50, 60, 150, 160))
+    assert _word(moved) == ("word1", 55, 66, 7, 8)
+    assert moved.bounding_box == (50, 60, 150, 160)
+    assert _word(reader.read_screen((0, 0, 100, 50))) == ("word2", 5, 6, 7, 8)
+    assert (fake.ocr_count, reader.hits, reader.misses) == (2, 1, 2)
+    reader.close()
+
+    # Results persist across restarts.
+    reader = PersistentOcrReader(fake, path)
+    assert _word(reader.read_screen((0, 0, 100, 50))) == ("word2", 5, 6, 7, 8)
+    assert fake.ocr_count == 2
+    reader.close()
+
+    # Readers with different configuration don't share results.
+    reader = PersistentOcrReader(fake, path, config_key="other")
+    reader.read_screen((0, 0, 100, 50))
+    assert fake.ocr_count == 3
+    reader.close()
+
+
+def test_recovers_from_truncated_file(tmp_path):
+    path = str(tmp_path / "ocr_cache")
+    fake = FakeReader()
+    for i in range(3):
+        fake.images[(0, 0, 10, i + 1)] = Image.new("RGB", (10, i + 1), (i, 0, 0))
+    reader = PersistentOcrReader(fake, path)
+    for i in range(3):
+        reader.read_screen((0, 0, 10, i + 1))
+    reader.close()
+    with open(path, "r+b") as file:
+        file.truncate(os.path.getsize(path) - 3)
+
+    reader = PersistentOcrReader(fake, path)
+    for i in range(3):
+        reader.read_screen((0, 0, 10, i + 1))
+    # Only the truncated record was read again.
+    assert fake.ocr_count == 4
+    reader.close()
+
+
+def test_evicts_least_recently_used(tmp_path):
+    path = str(tmp_path / "ocr_cache")
+    fake = FakeReader()
+    for i in range(50):
+        fake.images[(0, 0, 10, i + 1)] = Image.new("RGB", (10, i + 1), (i, 0, 0))
+    reader = PersistentOcrReader(fake, path, max_bytes=1000)
+    for i in range(50):
+        reader.read_screen((0, 0, 10, 1))
+        reader.read_screen((0, 0, 10, i + 1))
+    assert os.path.getsize(path) <= 1000
+    assert not os.path.exists(path + ".tmp")
+
+    count = fake.ocr_count
+    # The most recently used results were kept.
+    reader.read_screen((0, 0, 10, 1))
+    reader.read_screen((0, 0, 10, 50))
+    assert fake.ocr_count == count
+    reader.read_screen((0, 0, 10, 2))
+    assert fake.ocr_count == count + 1
+    reader.close()
@@ -0,0 +1,65 @@
+import time
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from gaze_ocr._gaze_history import BoundingBox  # noqa: E402
+from gaze_ocr.eye_tracking import EyeTracker  # noqa: E402
+
+
+class FakeWindows:
+    def get_monitor_size(self):
+        return (1920, 1080)
+
+
+def _tracker(gaze_tracked: bool = True) -> EyeTracker:
+    # Tobii libraries are unavailable, so the tracker is a mock.
+    tracker = EyeTracker(
+        "unused", mouse=object(), keyboard=object(), windows=FakeWindows()
+    )
+    tracker._is_gaze_tracked = lambda: gaze_tracked  # type: ignore[method-assign]
+    return tracker
+
+
+def test_gaze_bounds_during_time_range():
+    tracker = _tracker()
+    tracker._screen_scale = (2.0, 2.0)
+    with mock.patch.object(time, "perf_counter", side_effect=[1.0, 1.1, 1.2, 5.0]):
+        tracker._handle_gaze_point(100, 100, 0)
+        tracker._handle_gaze_point(150, 120, 0)
+        tracker._handle_gaze_point(120, 90, 0)
+        tracker._handle_gaze_point(800, 500, 0)
+
+    assert tracker.get_gaze_bounds_during_time_range(0.9, 1.25) == BoundingBox(
+        left=200, right=300, top=180, bottom=240
+    )
+    assert tracker.get_gaze_bounds_during_time_range(2.0, 3.0) is None
+
+
+def test_fixations_during_time_range():
+    tracker = _tracker()
+    timestamps = [1.0 + i * 0.01 for i in range(20)]
+    with mock.patch.object(time, "perf_counter", side_effect=timestamps):
+        for _ in timestamps:
+            tracker._handle_gaze_point(400, 300, 0)
+
+    fixations = tracker.get_fixations_during_time_range(0.5, 2.0)
+
+    assert [(fixation.left, fixation.top) for fixation in fixations] == [(400, 300)]
+
+
+def test_ignores_gaze_points_without_tracked_gaze():
+    tracker = _tracker(gaze_tracked=False)
+    with mock.patch.object(time, "perf_counter", side_effect=[1.0]):
+        tracker._handle_gaze_point(100, 100, 0)
+    assert tracker.get_gaze_bounds_during_time_range(0.5, 1.5) is None
+
+    tracker = _tracker()
+    with mock.patch.object(time, "perf_counter", side_effect=[1.0, 1.1]):
+        tracker._handle_gaze_point(float("nan"), 100, 0)
+        tracker._handle_gaze_point(100, 100, 0)
+    assert tracker.get_gaze_bounds_during_time_range(0.5, 1.5) == BoundingBox(
+        left=100, right=100, top=100, bottom=100
+    )
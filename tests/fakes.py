@@ -0,0 +1,37 @@
+"""Input devices shared by tests that run Controller commands."""
+
+
+class FakeMouse:
+    def move(self, coordinates):
+        pass
+
+    def click(self):
+        pass
+
+
+class FakeKeyboard:
+    """Keyboard that tracks whether shift is held."""
+
+    def __init__(self):
+        self._shift = False
+
+    def shift_down(self):
+        self._shift = True
+
+    def shift_up(self):
+        self._shift = False
+
+    def is_shift_down(self):
+        return self._shift
+
+    def left(self, n=1):
+        pass
+
+    def right(self, n=1):
+        pass
+
+    def word_left(self, n=1):
+        pass
+
+    def word_right(self, n=1):
+        pass
@@ -0,0 +1,84 @@
+from gaze_ocr._fixations import Fixation, find_fixations, fixation_regions
+
+
+def _samples(points, start=0.0, interval=0.01):
+    return (
+        [start + i * interval for i in range(len(points))],
+        [x for x, _ in points],
+        [y for _, y in points],
+    )
+
+
+def test_finds_fixations_and_discards_saccades():
+    points = (
+        [(100, 100), (102, 101), (101, 99)] * 5
+        # Saccade across the screen.
+        + [(300, 200), (500, 300), (700, 400)]
+        + [(800, 500), (801, 502), (799, 501)] * 5
+    )
+
+    fixations = find_fixations(*_samples(points), min_duration_seconds=0.1)
+
+    assert [
+        (fixation.left, fixation.top, fixation.right, fixation.bottom)
+        for fixation in fixations
+    ] == [(100, 99, 102, 101), (799, 500, 801, 502)]
+    assert fixations[0].start_timestamp == 0.0
+    assert round(fixations[0].duration, 6) == 0.14
+
+
+def test_rejects_short_glances():
+    points = [(100, 100)] * 20 + [(800, 800)] * 3 + [(100, 100)] * 20
+
+    fixations = find_fixations(*_samples(points), min_duration_seconds=0.1)
+
+    assert [(fixation.left, fixation.top) for fixation in fixations] == [
+        (100, 100),
+        (100, 100),
+    ]
+
+
+def test_gap_ends_fixation():
+    timestamps = [0.0, 0.05, 0.1, 0.5, 0.55, 0.6]
+    xs = [100] * 6
+    ys = [100] * 6
+
+    fixations = find_fixations(timestamps, xs, ys, min_duration_seconds=0.09)
+
+    assert [
+        (fixation.start_timestamp, fixation.end_timestamp) for fixation in fixations
+    ] == [
+        (0.0, 0.1),
+        (0.5, 0.6),
+    ]
+
+
+def _fixation(left, top, right, bottom, duration):
+    return Fixation(0.0, duration, left, top, right, bottom)
+
+
+def test_regions_are_padded_and_overlaps_merged():
+    fixations = [
+        _fixation(100, 100, 110, 110, 0.2),
+        _fixation(500, 500, 510, 510, 0.2),
+        # Overlaps the first after padding.
+        _fixation(150, 100, 160, 110, 0.2),
+    ]
+
+    assert fixation_regions(fixations, padding=50, max_regions=4) == [
+        (50, 50, 210, 160),
+        (450, 450, 560, 560),
+    ]
+
+
+def test_regions_keep_longest_dwell():
+    fixations = [
+        _fixation(100, 100, 110, 110, 0.1),
+        _fixation(500, 500, 510, 510, 0.5),
+        _fixation(900, 900, 910, 910, 0.3),
+    ]
+
+    assert fixation_regions(fixations, padding=10, max_regions=2) == [
+        (490, 490, 520, 520),
+        (890, 890, 920, 920),
+    ]
@@ -0,0 +1,100 @@
+import bisect
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from gaze_ocr._gaze_history import GazeHistory  # noqa: E402
+
+
+def _reference_bounds(points, start_timestamp, end_timestamp, tolerance_seconds):
+    """Bounds computed by scanning a list, as TalonEyeTracker used to."""
+    timestamps = [point[0] for point in points]
+    start_index = min(bisect.bisect_left(timestamps, start_timestamp), len(points) - 1)
+    end_index = min(bisect.bisect_left(timestamps, end_timestamp), len(points) - 1)
+    selected = [
+        point
+        for point in points[start_index : end_index + 1]
+        if start_timestamp - tolerance_seconds
+        <= point[0]
+        <= end_timestamp + tolerance_seconds
+    ]
+    if not selected:
+        return None
+    return (
+        min(point[1] for point in selected),
+        min(point[2] for point in selected),
+        max(point[1] for point in selected),
+        max(point[2] for point in selected),
+    )
+
+
+def test_empty_history():
+    history = GazeHistory(4)
+
+    assert len(history) == 0
+    assert history.latest() is None
+    assert history.bounds(0, 1) is None
+
+
+def test_wraps_around_and_keeps_latest_points():
+    history = GazeHistory(3)
+    for i in range(5):
+        history.append(float(i), i * 10, i * 100)
+
+    assert len(history) == 3
+    assert history.latest() == (4.0, 40.0, 400.0)
+    assert history.bounds(0, 10) == (20.0, 200.0, 40.0, 400.0)
+    assert history.bounds(3, 3) == (30.0, 300.0, 30.0, 300.0)
+
+
+def test_drops_out_of_order_points():
+    history = GazeHistory(3)
+    history.append(2.0, 1, 1)
+    history.append(1.0, 5, 5)
+
+    assert len(history) == 1
+    assert history.latest() == (2.0, 1.0, 1.0)
+
+
+def test_tolerance_includes_nearest_following_point():
+    history = GazeHistory(10)
+    history.append(1.0, 1, 1)
+    history.append(2.0, 2, 2)
+
+    assert history.bounds(1.2, 1.5) is None
+    assert history.bounds(1.2, 1.5, tolerance_seconds=0.6) == (2.0, 2.0, 2.0, 2.0)
+    assert history.bounds(2.05, 3, tolerance_seconds=0.1) == (2.0, 2.0, 2.0, 2.0)
+
+
+def test_bounds_match_reference_scan():
+    rng = random.Random(0)
+    history = GazeHistory(50)
+    points = []
+    timestamp = 0.0
+    for _ in range(200):
+        timestamp += rng.choice([0.0, 0.01, 0.05, 0.3])
+        point = (timestamp, rng.random(), rng.random())
+        history.append(*point)
+        points.append(point)
+        retained = points[-50:]
+        start = rng.uniform(retained[0][0] - 1, timestamp + 1)
+        end = start + rng.uniform(0, 1)
+        assert history.bounds(start, end, 0.1) == _reference_bounds(
+            retained, start, end, 0.1
+        )
+
+
+def test_points_returns_copies_of_selection():
+    history = GazeHistory(3)
+    for i in range(5):
+        history.append(float(i), i * 10, i * 100)
+
+    timestamps, xs, ys = history.points(2.5, 3.5, tolerance_seconds=0.5)
+    history.append(5.0, 50, 500)
+
+    assert timestamps.tolist() == [3.0, 4.0]
+    assert xs.tolist() == [30.0, 40.0]
+    assert ys.tolist() == [300.0, 400.0]
+    assert [array.tolist() for array in history.points(10, 11)] == [[], [], []]
@@ -1,4 +1,10 @@
-from gaze_ocr._gaze_ocr import _distance_squared
+from types import SimpleNamespace
+
+import pytest
+import screen_ocr
+from screen_ocr import _base
+
+from gaze_ocr._gaze_ocr import Controller, CursorLocation, _distance_squared
 
 
 def test_distance_squared():
@@ -23,3 +29,171 @@ def test_distance_squared():
 
     # Test with floating point coordinates
     assert abs(_distance_squared((1.5, 2.5), (4.5, 6.5)) - 25.0) < 1e-10
+
+
+def _choose(controller, disambiguate, coordinates, screen_contents):
+    planned = []
+
+    def plan(i):
+        planned.append(i)
+        return SimpleNamespace(base_coordinates=coordinates[i])
+
+    generator = controller._choose_cursor_location(
+        disambiguate=disambiguate,
+        count=len(coordinates),
+        base_coordinates=lambda i: coordinates[i],
+        plan=plan,
+        screen_contents=screen_contents,
+    )
+    return generator, planned
+
+
+def test_choose_cursor_location_plans_only_nearest():
+    controller = Controller(None, None, mouse=None, keyboard=None)
+    screen_contents = SimpleNamespace(screen_coordinates=(50, 50), bounding_box=None)
+
+    generator, planned = _choose(
+        controller, False, [(0, 0), (45, 52), (100, 100)], screen_contents
+    )
+    try:
+        next(generator)
+        raise AssertionError()
+    except StopIteration as e:
+        index, location = e.value
+
+    assert index == 1
+    assert location.base_coordinates == (45, 52)
+    assert planned == [1]
+    controller.shutdown()
+
+
+def test_choose_cursor_location_plans_all_to_disambiguate():
+    controller = Controller(None, None, mouse=None, keyboard=None)
+    screen_contents = SimpleNamespace(screen_coordinates=(50, 50), bounding_box=None)
+
+    generator, planned = _choose(
+        controller, True, [(0, 0), (45, 52), (100, 100)], screen_contents
+    )
+    locations = next(generator)
+    try:
+        generator.send(locations[2])
+        raise AssertionError()
+    except StopIteration as e:
+        index, location = e.value
+
+    assert planned == [0, 1, 2]
+    assert index == 2
+    assert location is locations[2]
+    controller.shutdown()
+
+
+def test_planned_locations_share_input_context():
+    mouse = SimpleNamespace()
+    controller = Controller(None, None, mouse=mouse, keyboard=None)
+    context = controller._input_context(lambda: 3)
+    words = [
+        screen_ocr.WordLocation(
+            left=i * 100,
+            top=0,
+            width=50,
+            height=20,
+            left_char_offset=0,
+            right_char_offset=0,
+            text="hello",
+            ocr_word_index=i,
+            ocr_line_index=0,
+        )
+        for i in range(3)
+    ]
+    locations = [
+        controller._plan_cursor_location(
+            [word],
+            cursor_position=cursor_position,
+            include_whitespace=False,
+            context=context,
+            selection_position=Controller.SelectionPosition.NONE,
+        )
+        for word in words
+        for cursor_position in ("before", "middle", "after")
+    ]
+
+    assert all(location.context is context for location in locations)
+    assert not hasattr(locations[0], "__dict__")
+    assert locations[0].mouse is mouse
+    assert locations[0].click_offset_right() == 3
+    assert controller._input_context(5).resolve_click_offset_right() == 5
+    controller.shutdown()
+
+
+def test_cursor_location_accepts_input_devices():
+    mouse = SimpleNamespace()
+    location = CursorLocation(
+        base_coordinates=(10, 20),
+        visual_coordinates=(10, 20),
+        move_cursor_right=False,
+        move_distance=0,
+        move_past_whitespace_left=False,
+        move_past_whitespace_right=False,
+        text_height=20,
+        click_offset_right=lambda: 2,
+        mouse=mouse,
+        keyboard=None,
+        app_actions=None,
+    )
+
+    assert location.mouse is mouse
+    assert location.click_offset_right() == 2
+    assert location._focus_and_get_final_coordinates() == (12, 20)
+    assert location == CursorLocation(
+        (10, 20), (10, 20), False, 0, False, False, 20, None, None, None, None
+    )
+    with pytest.raises(TypeError):
+        CursorLocation(
+            (10, 20),
+            (10, 20),
+            False,
+            0,
+            False,
+            False,
+            20,
+            mouse=mouse,
+            context=location.context,
+        )
+
+
+def test_planned_location_uses_word_jumps():
+    controller = Controller(None, None, mouse=None, keyboard=None, use_word_jumps=True)
+    line = _base.OcrLine([_base.OcrWord("foo-bar-baz", 0, 0, 110, 20)])
+    screen_contents = SimpleNamespace(result=_base.OcrResult([line]))
+    location = screen_ocr.WordLocation(
+        left=0,
+        top=0,
+        width=110,
+        height=20,
+        left_char_offset=4,
+        right_char_offset=4,
+        text="bar",
+        ocr_word_index=0,
+        ocr_line_index=0,
+    )
+
+    def plan(context, cursor_position):
+        return controller._plan_cursor_location(
+            [location],
+            cursor_position=cursor_position,
+            include_whitespace=False,
+            context=context,
+            selection_position=Controller.SelectionPosition.NONE,
+            screen_contents=screen_contents,
+        )
+
+    after = plan(controller._input_context(0), "after")
+    assert not after.move_cursor_right
+    assert after.keyboard_moves() == [(True, 1), (False, 1)]
+    before = plan(controller._input_context(0), "before")
+    assert before.move_cursor_right
+    assert before.keyboard_moves() == [(True, 1), (False, 1)]
+
+    controller.use_word_jumps = False
+    assert plan(controller._input_context(0), "after").keyboard_moves() == [(False, 4)]
+    controller.shutdown()
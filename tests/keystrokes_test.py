@@ -0,0 +1,37 @@
+from gaze_ocr._keystrokes import plan_moves
+
+
+def test_plan_moves_without_separators_uses_characters():
+    assert plan_moves("helloworld", 0, 5) == [(False, 5)]
+    assert plan_moves("helloworld", 10, 5) == [(False, 5)]
+    assert plan_moves("hello", 0, 0) == []
+
+
+def test_plan_moves_jumps_runs_bounded_by_separators():
+    # foo|-|bar|-|baz
+    assert plan_moves("foo-bar-baz", 0, 8) == [
+        (True, 1),
+        (False, 1),
+        (True, 1),
+        (False, 1),
+    ]
+    assert plan_moves("foo-bar-baz", 11, 4) == [
+        (True, 1),
+        (False, 1),
+        (True, 1),
+    ]
+    assert plan_moves("a(bb((cc", 8, 2) == [(True, 1), (False, 2), (True, 1)]
+
+
+def test_plan_moves_avoids_ambiguous_stops():
+    # Runs ending in the middle of the target distance would overshoot.
+    assert plan_moves("foobar-baz", 0, 3) == [(False, 3)]
+    # Some widgets treat "_" and "." as part of a word.
+    assert plan_moves("foo_bar", 0, 4) == [(False, 4)]
+    assert plan_moves("foo.bar", 7, 4) == [(False, 3)]
+    # Rightward jumps to the end of the word may skip the following whitespace.
+    assert plan_moves("(foobar", 0, 7) == [(False, 7)]
+    # Leftward jumps to the start of the word are safe.
+    assert plan_moves("foobar)", 6, 0) == [(True, 1)]
+    # Single characters are never jumped.
+    assert plan_moves("a-b", 0, 2) == [(False, 2)]
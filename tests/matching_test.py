@@ -0,0 +1,138 @@
+import screen_ocr
+from fakes import FakeKeyboard, FakeMouse
+from screen_ocr import ScreenContents, _base
+
+from gaze_ocr._gaze_ocr import Controller
+from gaze_ocr._matching import match_phrases, share_scores, token_index
+
+
+class CountingScreenContents(ScreenContents):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.score_calls = 0
+
+    def _score_word(self, candidate, normalized_target):
+        self.score_calls += 1
+        return super()._score_word(candidate, normalized_target)
+
+
+def _screen_contents(screen_coordinates=None, search_radius=None):
+    lines = []
+    for top, text in enumerate(
+        ["the quick brown fox", "jumped over to the", "HTTPServer two foxes"]
+    ):
+        words = []
+        left = 0
+        for word in text.split():
+            words.append(_base.OcrWord(word, left, top * 20, len(word) * 7, 15))
+            left += len(word) * 7 + 5
+        lines.append(_base.OcrLine(words))
+    return CountingScreenContents(
+        screen_coordinates=screen_coordinates,
+        bounding_box=(0, 0, 200, 60),
+        screenshot=None,
+        result=_base.OcrResult(lines),
+        confidence_threshold=0.5,
+        homophones=screen_ocr.default_homophones(),
+        search_radius=search_radius,
+    )
+
+
+def _locations(matches):
+    return [list(match) for match in matches]
+
+
+def test_matches_are_consistent_with_screen_contents():
+    phrases = ["quick brown", "to", "too", "fox", "HTTP server", "jumpedover", "zebra"]
+    for screen_coordinates, search_radius in [(None, None), ((20, 30), 40)]:
+        screen_contents = _screen_contents(screen_coordinates, search_radius)
+        index = token_index(screen_contents)
+        for phrase in phrases:
+            assert _locations(index.find_matching_words(phrase)) == _locations(
+                screen_contents.find_matching_words(phrase)
+            ), phrase
+        for target in ["the quick brown cat", "two foxes", "over two the"]:
+            for name in [
+                "find_longest_matching_prefix",
+                "find_longest_matching_suffix",
+            ]:
+                matches, length = getattr(index, name)(target)
+                expected_matches, expected_length = getattr(screen_contents, name)(
+                    target
+                )
+                assert length == expected_length, (name, target)
+                assert _locations(matches) == _locations(expected_matches)
+
+
+def test_scores_shared_words_once():
+    screen_contents = _screen_contents()
+    match_phrases(screen_contents, ["the quick brown fox"])
+    single_calls = screen_contents.score_calls
+    # The index is reused, and homophones share scores.
+    match_phrases(screen_contents, ["the quick brown fox", ("the quick brown fox", 2)])
+    assert screen_contents.score_calls == single_calls
+    token_index(screen_contents).find_matching_words("too")
+    calls = screen_contents.score_calls
+    token_index(screen_contents).find_matching_words("two")
+    assert screen_contents.score_calls == calls
+
+    screen_contents = _screen_contents()
+    match_phrases(screen_contents, ["the quick brown fox", "the quick brown fax"])
+    matcher_calls = screen_contents.score_calls
+    screen_contents = _screen_contents()
+    screen_contents.find_matching_words("the quick brown fox")
+    screen_contents.find_matching_words("the quick brown fax")
+    assert matcher_calls < screen_contents.score_calls
+
+
+def test_crops_share_scores():
+    screen_contents = _screen_contents()
+    token_index(screen_contents).find_longest_matching_prefix("quick brown")
+    cropped = screen_contents.cropped((0, 0, 200, 30))
+    share_scores(screen_contents, cropped)
+
+    def fail(candidate, normalized_target):
+        raise AssertionError("Scored again")
+
+    cropped._score_word = fail  # type: ignore[method-assign]
+    assert token_index(cropped).find_longest_matching_prefix("quick brown")[0]
+
+
+def test_ranks_by_weighted_score():
+    phrase_matches = match_phrases(
+        _screen_contents(), [("quick brawn", 1.0), ("zebra", 1.0), "quick brown"]
+    )
+    assert [match.phrase for match in phrase_matches] == ["quick brown", "quick brawn"]
+    assert phrase_matches[0].score == 1.0
+
+    phrase_matches = match_phrases(
+        _screen_contents(), [("quick brawn", 1.0), ("quick brown", 0.5)]
+    )
+    assert [match.phrase for match in phrase_matches] == ["quick brawn", "quick brown"]
+
+
+class FakeReader:
+    radius = 200
+    search_radius = 125
+    confidence_threshold = 0.5
+    homophones = screen_ocr.default_homophones()
+
+    def read_screen(self, bounding_box=None):
+        return _screen_contents()
+
+
+def test_controller_moves_to_best_phrase():
+    controller = Controller(
+        FakeReader(), None, mouse=FakeMouse(), keyboard=FakeKeyboard()
+    )
+    try:
+        location, phrase = controller.move_text_cursor_to_phrases(
+            ["zebra", ("brown fax", 0.9), ("brown fox", 0.8)], cursor_position="after"
+        )
+        assert phrase == "brown fox"
+        assert location
+        assert location.visual_coordinates[0] == 127
+
+        assert controller.move_text_cursor_to_phrases(["zebra"]) == (None, None)
+    finally:
+        controller.shutdown()
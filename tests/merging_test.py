@@ -0,0 +1,96 @@
+"""Tests for merging OCR results of separately read screen areas."""
+
+import screen_ocr
+from PIL import Image
+from screen_ocr import _base
+
+from gaze_ocr import _merging
+
+
+def _contents(
+    bounding_box: tuple[int, int, int, int], lines: list[list[_base.OcrWord]]
+) -> screen_ocr.ScreenContents:
+    return screen_ocr.ScreenContents(
+        screen_coordinates=None,
+        bounding_box=bounding_box,
+        screenshot=None,
+        result=_base.OcrResult(lines=[_base.OcrLine(words) for words in lines]),
+        confidence_threshold=0.75,
+        homophones={},
+        search_radius=None,
+    )
+
+
+def _word(text: str, left: float, top: float = 10, width: float = 40):
+    return _base.OcrWord(text, left=left, top=top, width=width, height=10)
+
+
+def test_subtract_returns_uncovered_strips():
+    assert _merging.subtract((0, 0, 100, 100), (50, 0, 150, 100)) == [(0, 0, 50, 100)]
+    assert _merging.subtract((0, 0, 100, 100), (25, 25, 75, 75)) == [
+        (0, 0, 100, 25),
+        (0, 75, 100, 100),
+        (0, 25, 25, 75),
+        (75, 25, 100, 75),
+    ]
+    assert _merging.subtract((0, 0, 10, 10), (20, 20, 30, 30)) == [(0, 0, 10, 10)]
+    assert _merging.subtract((0, 0, 10, 10), (0, 0, 10, 10)) == []
+
+
+def test_merge_keeps_whole_word_at_seam_and_joins_line():
+    # The cached read ends at x=100, truncating "gamma".
+    cached = _contents(
+        (0, 0, 100, 50), [[_word("alpha", 0), _word("gam", 80, width=20)]]
+    )
+    # The strip extends into the cached area and reads "gamma" whole.
+    strip = _contents((70, 0, 200, 50), [[_word("gamma", 80), _word("delta", 130)]])
+
+    merged = _merging.merge_screen_contents([cached, strip], (0, 0, 200, 50))
+
+    assert merged.bounding_box == (0, 0, 200, 50)
+    assert merged.as_string() == "alpha gamma delta\n"
+    assert merged.find_matching_words("alpha gamma delta")
+
+
+def test_merge_keeps_separate_lines_from_same_read():
+    contents = _contents(
+        (0, 0, 200, 50), [[_word("alpha", 0)], [_word("beta", 60, top=11)]]
+    )
+
+    merged = _merging.merge_screen_contents([contents], (0, 0, 200, 50))
+
+    assert merged.as_string() == "alpha\nbeta\n"
+
+
+def test_merge_drops_words_outside_bounding_box():
+    contents = _contents((0, 0, 200, 50), [[_word("alpha", 0), _word("beta", 150)]])
+
+    merged = _merging.merge_screen_contents([contents], (0, 0, 100, 50))
+
+    assert merged.as_string() == "alpha\n"
+
+
+def test_merged_screenshot_positions_pieces_by_their_area():
+    screen = Image.new("RGB", (200, 100), "white")
+    screen.putpixel((30, 40), (255, 0, 0))
+    screen.putpixel((150, 40), (0, 0, 255))
+
+    def read(bounding_box):
+        contents = _contents(bounding_box, [])
+        contents.screenshot = screen.crop(bounding_box)
+        return contents
+
+    previous = _merging.cropped(read((0, 0, 120, 100)), (20, 20, 120, 80))
+    merged = _merging.merge_screen_contents(
+        [previous, read((100, 20, 180, 80))], (20, 20, 180, 80)
+    )
+    assert merged.screenshot.getpixel((10, 20)) == (255, 0, 0)
+    assert merged.screenshot.getpixel((130, 20)) == (0, 0, 255)
+
+    # Cropped without its screenshot, so it can't be positioned.
+    misaligned = read((0, 0, 120, 100)).cropped((20, 20, 120, 80))
+    merged = _merging.merge_screen_contents(
+        [misaligned, read((100, 20, 180, 80))], (20, 20, 180, 80)
+    )
+    assert merged.screenshot.getpixel((10, 20)) == (255, 255, 255)
+    assert merged.screenshot.getpixel((130, 20)) == (0, 0, 255)
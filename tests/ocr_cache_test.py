@@ -1,12 +1,17 @@
 """Tests for OCR cache behavior."""
 
 import logging
+import threading
+import time
+from types import SimpleNamespace
 from typing import cast
 
 import screen_ocr
+from fakes import FakeKeyboard, FakeMouse
+from PIL import Image
 from screen_ocr import _base
 
-from gaze_ocr import _gaze_ocr
+from gaze_ocr._fixations import Fixation
 from gaze_ocr._gaze_ocr import Controller, EyeTrackerFallback, OcrCache
 
 
@@ -65,6 +70,67 @@ def test_non_subset_time_range_misses_cache():
     assert reader.read_screen_calls == [None, None]
 
 
+def test_subset_time_range_outside_cached_bounds_misses_cache():
+    reader = FakeReader()
+    cache = _cache(reader)
+
+    cache.read((1, 4), (0, 0, 50, 50))
+    cache.read((2, 3), (40, 40, 90, 90))
+
+    assert reader.read_screen_calls == [(0, 0, 50, 50), (40, 40, 90, 90)]
+
+
+def test_entries_for_different_bounds_are_both_retained():
+    reader = FakeReader()
+    cache = _cache(reader)
+
+    cache.read((1, 4), (0, 0, 50, 50))
+    cache.read((1, 4), (50, 50, 100, 100))
+    first = cache.read((2, 3), (10, 10, 40, 40))
+    second = cache.read((2, 3), (60, 60, 90, 90))
+
+    assert first.bounding_box == (10, 10, 40, 40)
+    assert second.bounding_box == (60, 60, 90, 90)
+    assert reader.read_screen_calls == [(0, 0, 50, 50), (50, 50, 100, 100)]
+
+
+def test_least_recently_used_entry_is_evicted():
+    reader = FakeReader()
+    cache = OcrCache(cast(screen_ocr.Reader, reader), max_entries=2)
+
+    cache.read((1, 2), (0, 0, 10, 10))
+    cache.read((3, 4), (0, 0, 10, 10))
+    # Refresh the first entry so that the second is least recently used.
+    cache.read((1, 2), (0, 0, 10, 10))
+    cache.read((5, 6), (0, 0, 10, 10))
+    cache.read((1, 2), (0, 0, 10, 10))
+    cache.read((3, 4), (0, 0, 10, 10))
+
+    assert len(reader.read_screen_calls) == 4
+
+
+def test_entries_over_byte_budget_are_evicted():
+    reader = FakeReader()
+    # Each 10x10 entry is estimated at 400 bytes.
+    cache = OcrCache(cast(screen_ocr.Reader, reader), max_bytes=500)
+
+    cache.read((1, 2), (0, 0, 10, 10))
+    cache.read((3, 4), (0, 0, 10, 10))
+    cache.read((1, 2), (0, 0, 10, 10))
+
+    assert len(reader.read_screen_calls) == 3
+
+
+def test_expired_entries_miss_cache():
+    reader = FakeReader()
+    cache = OcrCache(cast(screen_ocr.Reader, reader), max_age_seconds=-1)
+
+    cache.read((1, 4), None)
+    cache.read((2, 3), None)
+
+    assert reader.read_screen_calls == [None, None]
+
+
 def test_active_window_fallback():
     reader = FakeReader()
     cache = OcrCache(
@@ -99,17 +165,12 @@ def test_cache_hit_does_not_warn(caplog):
     assert not caplog.records
 
 
-def test_populated_cache_miss_warns_with_process_lifetime_rate(caplog, monkeypatch):
-    monkeypatch.setattr(_gaze_ocr, "_populated_cache_call_count", 0)
-    monkeypatch.setattr(_gaze_ocr, "_populated_cache_miss_count", 0)
-
-    first_reader = FakeReader()
-    first_cache = _cache(first_reader)
+def test_populated_cache_miss_warns_with_per_instance_rate(caplog):
+    first_cache = _cache(FakeReader())
     first_cache.read((1, 4), None)
     first_cache.read((2, 3), None)
 
-    second_reader = FakeReader()
-    second_cache = _cache(second_reader)
+    second_cache = _cache(FakeReader())
     second_cache.read((10, 11), None)
 
     with caplog.at_level(logging.WARNING):
@@ -118,29 +179,85 @@ def test_populated_cache_miss_warns_with_process_lifetime_rate(caplog, monkeypat
 
     assert len(caplog.records) == 2
     assert caplog.records[0].message == (
-        "OCR cache miss with populated cache: requested_time_range=(5, 6), "
-        "cached_time_range=(1, 4), requested_bounds=None; "
-        "misses=50.0% of 2 calls"
+        "OCR cache miss with populated cache (time_range): "
+        "requested_time_range=(5, 6), cached_time_range=(1, 4), "
+        "requested_bounds=None; misses=50.0% of 2 calls; "
+        "0 similar warnings suppressed"
     )
     assert caplog.records[1].message == (
-        "OCR cache miss with populated cache: requested_time_range=(12, 13), "
-        "cached_time_range=(10, 11), requested_bounds=(0, 0, 10, 10); "
-        "misses=66.7% of 3 calls"
+        "OCR cache miss with populated cache (time_range): "
+        "requested_time_range=(12, 13), cached_time_range=(10, 11), "
+        "requested_bounds=(0, 0, 10, 10); misses=100.0% of 1 calls; "
+        "0 similar warnings suppressed"
     )
 
 
-def test_controller_start_reading_is_noop_and_reads_reuse_ocr_cache():
+def test_populated_cache_miss_warnings_are_rate_limited(caplog):
+    cache = _cache(FakeReader())
+    cache.read((1, 2), None)
+
+    with caplog.at_level(logging.WARNING):
+        cache.read((3, 4), None)
+        cache.read((5, 6), None)
+        cache.read((7, 8), None)
+        cache._last_miss_warning_time -= cache.MISS_WARNING_INTERVAL_SECONDS
+        cache.read((9, 10), None)
+
+    assert len(caplog.records) == 2
+    assert caplog.records[1].message.endswith("2 similar warnings suppressed")
+
+
+def test_stats_record_hits_misses_and_ocr():
     reader = FakeReader()
-    controller = Controller(
+    cache = _cache(reader)
+
+    cache.read((1, 4), (0, 0, 10, 10))
+    cache.read((2, 3), (0, 0, 10, 10))
+    cache.read((2, 3), (100, 100, 110, 120))
+    cache.read((5, 6), (0, 0, 10, 10))
+    snapshot = cache.stats.snapshot(reset=True)
+
+    assert snapshot["cache"] == {
+        "hits": 1,
+        "misses": {"empty": 1, "time_range": 1, "bounds": 1},
+    }
+    assert snapshot["ocr_reads"] == 3
+    assert snapshot["ocr_bytes"] == (100 + 200 + 100) * 4
+    assert snapshot["latency"]["ocr"]["count"] == 3
+    assert sum(snapshot["latency"]["ocr"]["buckets"].values()) == 3
+    assert cache.stats.snapshot()["cache"]["hits"] == 0
+    assert cache.stats.snapshot()["latency"]["ocr"]["count"] == 0
+
+
+class FakeEyeTracker:
+    is_connected = True
+
+    def __init__(self, gaze_point=(50, 50), gaze_bounds=None):
+        self.gaze_point = gaze_point
+        self.gaze_bounds = gaze_bounds
+
+    def get_gaze_point(self):
+        return self.gaze_point
+
+    def get_gaze_bounds_during_time_range(self, start_timestamp, end_timestamp):
+        return self.gaze_bounds
+
+
+def _controller(reader: FakeReader, eye_tracker=None, **kwargs) -> Controller:
+    return Controller(
         ocr_reader=cast(screen_ocr.Reader, reader),
-        eye_tracker=None,
+        eye_tracker=eye_tracker,
         mouse=None,
         keyboard=None,
+        **kwargs,
     )
+
+
+def test_controller_reads_join_background_read():
+    reader = FakeReader()
+    controller = _controller(reader)
     try:
         controller.start_reading_nearby()
-        assert reader.read_screen_calls == []
-
         first = controller.read_nearby((1, 4))
         second = controller.read_nearby((2, 3))
 
@@ -149,3 +266,515 @@ def test_controller_start_reading_is_noop_and_reads_reuse_ocr_cache():
         assert reader.read_screen_calls == [None]
     finally:
         controller.shutdown()
+
+
+def test_controller_background_read_is_cropped_to_gaze_bounds():
+    reader = FakeReader()
+    eye_tracker = FakeEyeTracker(
+        gaze_point=(50, 50),
+        gaze_bounds=SimpleNamespace(left=40, top=40, right=60, bottom=60),
+    )
+    controller = _controller(
+        reader, eye_tracker, gaze_box_padding=10, prefetch_radius=30
+    )
+    try:
+        controller.start_reading_nearby()
+        contents = controller.read_nearby((1, 4))
+
+        assert reader.read_screen_calls == [(20, 20, 80, 80)]
+        assert contents.bounding_box == (30, 30, 70, 70)
+    finally:
+        controller.shutdown()
+
+
+def test_controller_background_read_not_covering_gaze_bounds_is_discarded():
+    reader = FakeReader()
+    eye_tracker = FakeEyeTracker(
+        gaze_point=(50, 50),
+        gaze_bounds=SimpleNamespace(left=0, top=40, right=60, bottom=60),
+    )
+    controller = _controller(
+        reader, eye_tracker, gaze_box_padding=10, prefetch_radius=30
+    )
+    try:
+        controller.start_reading_nearby()
+        controller.read_nearby((1, 4))
+
+        assert reader.read_screen_calls == [(20, 20, 80, 80), (-10, 30, 70, 70)]
+    finally:
+        controller.shutdown()
+
+
+def test_controller_shutdown_without_wait_cancels_background_read():
+    reader = FakeReader()
+    controller = _controller(reader)
+    controller.shutdown(wait=False)
+    controller.start_reading_nearby()
+
+    controller.read_nearby((1, 4))
+
+    assert reader.read_screen_calls == [None]
+
+
+class LayoutReader(FakeReader):
+    """Reader for a screen with fixed words, which are truncated at the edge of
+    the read area."""
+
+    def __init__(self, words: list[_base.OcrWord]):
+        super().__init__()
+        self._words = words
+
+    def read_screen(self, bounding_box: tuple[int, int, int, int] | None = None):
+        self.read_screen_calls.append(bounding_box)
+        left, top, right, bottom = bounding_box or self.SCREEN
+        words = []
+        for word in self._words:
+            if word.top < top or word.top + word.height > bottom:
+                continue
+            visible_left = max(left, word.left)
+            visible_right = min(right, word.left + word.width)
+            if visible_right <= visible_left:
+                continue
+            char_width = word.width / len(word.text)
+            start = round((visible_left - word.left) / char_width)
+            end = round((visible_right - word.left) / char_width)
+            words.append(
+                _base.OcrWord(
+                    word.text[start:end],
+                    left=word.left + start * char_width,
+                    top=word.top,
+                    width=(end - start) * char_width,
+                    height=word.height,
+                )
+            )
+        return _contents(bounding_box or self.SCREEN, words)
+
+
+def test_partial_read_only_reads_uncovered_strip():
+    reader = LayoutReader(
+        [
+            _base.OcrWord("alpha", left=0, top=40, width=25, height=10),
+            _base.OcrWord("gamma", left=40, top=40, width=25, height=10),
+            _base.OcrWord("delta", left=70, top=40, width=25, height=10),
+        ]
+    )
+    cache = OcrCache(
+        cast(screen_ocr.Reader, reader), partial_reads=True, seam_margin=10
+    )
+
+    cache.read((1, 4), (0, 0, 50, 100))
+    contents = cache.read((2, 3), (0, 0, 100, 100))
+
+    assert reader.read_screen_calls == [(0, 0, 50, 100), (40, 0, 100, 100)]
+    assert contents.as_string() == "alpha gamma delta\n"
+    assert contents.find_matching_words("gamma delta")
+
+
+def test_partial_read_requires_enough_overlap():
+    reader = FakeReader()
+    cache = OcrCache(cast(screen_ocr.Reader, reader), partial_reads=True)
+
+    cache.read((1, 4), (0, 0, 10, 100))
+    cache.read((2, 3), (0, 0, 100, 100))
+
+    assert reader.read_screen_calls == [(0, 0, 10, 100), (0, 0, 100, 100)]
+
+
+def test_controller_shares_stats_with_cache():
+    reader = FakeReader()
+    controller = _controller(reader)
+    try:
+        controller.read_nearby((1, 4))
+        controller.read_nearby((2, 3))
+
+        snapshot = controller.stats.snapshot()
+        assert snapshot["cache"]["hits"] == 1
+        assert snapshot["cache"]["misses"]["empty"] == 1
+        assert snapshot["ocr_reads"] == 1
+    finally:
+        controller.shutdown()
+
+
+def test_controller_traces_read_nearby():
+    reader = FakeReader()
+    controller = _controller(reader)
+    controller.tracer.enabled = True
+    try:
+        controller.read_nearby((1, 4))
+
+        names = [
+            event["name"] for event in controller.tracer.chrome_trace()["traceEvents"]
+        ]
+        assert names == ["read_screen", "OcrCache.read", "read_nearby"]
+    finally:
+        controller.shutdown()
+
+
+class FixatingEyeTracker(FakeEyeTracker):
+    def __init__(self, fixations, **kwargs):
+        super().__init__(**kwargs)
+        self.fixations = fixations
+
+    def get_fixations_during_time_range(self, start_timestamp, end_timestamp):
+        return self.fixations
+
+
+def test_controller_reads_only_fixation_regions():
+    reader = FakeReader()
+    eye_tracker = FixatingEyeTracker(
+        [
+            Fixation(0.0, 0.3, left=10, top=10, right=12, bottom=12),
+            Fixation(0.5, 0.9, left=80, top=80, right=82, bottom=82),
+        ],
+        gaze_bounds=SimpleNamespace(left=10, top=10, right=82, bottom=82),
+    )
+    controller = _controller(
+        reader, eye_tracker, gaze_box_padding=5, use_fixations=True
+    )
+    try:
+        contents = controller.read_nearby((1, 4))
+
+        assert reader.read_screen_calls == [(75, 75, 87, 87), (5, 5, 17, 17)]
+        assert contents.bounding_box == (5, 5, 87, 87)
+    finally:
+        controller.shutdown()
+
+
+def test_controller_falls_back_to_gaze_bounds_without_fixations():
+    reader = FakeReader()
+    eye_tracker = FixatingEyeTracker(
+        [], gaze_bounds=SimpleNamespace(left=10, top=10, right=82, bottom=82)
+    )
+    controller = _controller(
+        reader, eye_tracker, gaze_box_padding=5, use_fixations=True
+    )
+    try:
+        controller.read_nearby((1, 4))
+
+        assert reader.read_screen_calls == [(5, 5, 87, 87)]
+    finally:
+        controller.shutdown()
+
+
+class RangeEyeTracker(FakeEyeTracker):
+    """Eye tracker whose gaze bounds depend on the start of the time range."""
+
+    def __init__(self, bounds_by_time):
+        super().__init__()
+        self.bounds_by_time = bounds_by_time
+
+    def get_gaze_bounds_during_time_range(self, start_timestamp, end_timestamp):
+        return self.bounds_by_time[start_timestamp + 0.5]
+
+
+def _selection_controller(reader, **kwargs) -> Controller:
+    return Controller(
+        ocr_reader=cast(screen_ocr.Reader, reader),
+        eye_tracker=RangeEyeTracker(
+            {
+                1: SimpleNamespace(left=10, top=10, right=20, bottom=20),
+                3: SimpleNamespace(left=60, top=50, right=70, bottom=60),
+            }
+        ),
+        mouse=FakeMouse(),
+        keyboard=FakeKeyboard(),
+        gaze_box_padding=5,
+        **kwargs,
+    )
+
+
+def test_controller_selects_text_with_single_union_read():
+    reader = LayoutReader(
+        [
+            _base.OcrWord("alpha", left=10, top=10, width=10, height=10),
+            _base.OcrWord("omega", left=60, top=50, width=10, height=10),
+        ]
+    )
+    controller = _selection_controller(reader, union_selection_reads=True)
+    try:
+        location = controller.select_text(
+            "alpha", "omega", start_time_range=(1, 2), end_time_range=(3, 4)
+        )
+
+        assert location
+        assert reader.read_screen_calls == [(5, 5, 75, 65)]
+        snapshot = controller.stats.snapshot()
+        assert snapshot["cache"]["hits"] == 2
+        assert snapshot["ocr_reads"] == 1
+    finally:
+        controller.shutdown()
+
+
+def test_controller_union_read_joins_background_read():
+    reader = FakeReader()
+    controller = _selection_controller(reader, union_selection_reads=True)
+    try:
+        controller.start_reading_nearby([(1, 2), (3, 4)])
+        controller.select_text(
+            "alpha", "omega", start_time_range=(1, 2), end_time_range=(3, 4)
+        )
+
+        assert reader.read_screen_calls == [(5, 5, 75, 65)]
+    finally:
+        controller.shutdown()
+
+
+class NearbyLayoutReader(LayoutReader):
+    radius = 100
+    search_radius = 60
+
+    def read_nearby(self, screen_coordinates, search_radius=None, crop_radius=None):
+        x, y = screen_coordinates
+        contents = self.read_screen(
+            (x - self.radius, y - self.radius, x + self.radius, y + self.radius)
+        )
+        return screen_ocr.ScreenContents(
+            screen_coordinates=screen_coordinates,
+            bounding_box=contents.bounding_box,
+            screenshot=None,
+            result=contents.result,
+            confidence_threshold=1,
+            homophones={},
+            search_radius=self.search_radius,
+        )
+
+
+class MovingEyeTracker(FakeEyeTracker):
+    def __init__(self, gaze_points):
+        super().__init__()
+        self.gaze_points = gaze_points
+
+    def get_gaze_point(self):
+        return (
+            self.gaze_points.pop(0)
+            if len(self.gaze_points) > 1
+            else self.gaze_points[0]
+        )
+
+
+def test_controller_rereads_only_uncovered_area_when_gaze_moves():
+    reader = NearbyLayoutReader(
+        [
+            _base.OcrWord("hello", left=100, top=100, width=25, height=10),
+            _base.OcrWord("world", left=100, top=210, width=25, height=10),
+        ]
+    )
+    controller = Controller(
+        ocr_reader=cast(screen_ocr.Reader, reader),
+        eye_tracker=MovingEyeTracker([(100, 100), (100, 180)]),
+        mouse=FakeMouse(),
+        keyboard=FakeKeyboard(),
+    )
+    try:
+        # The prefix is found in the first read and the suffix in the merged read.
+        assert controller.select_matching_text("hello world") == (5, 6)
+
+        assert reader.read_screen_calls == [(0, 0, 200, 200), (0, 150, 200, 280)]
+        contents = controller.latest_screen_contents()
+        assert contents.bounding_box == (0, 0, 200, 280)
+        assert contents.screen_coordinates == (100, 180)
+    finally:
+        controller.shutdown()
+
+
+class DwellingEyeTracker(FakeEyeTracker):
+    """Eye tracker whose gaze has rested on gaze_bounds for a second."""
+
+    def get_fixations_during_time_range(self, start_timestamp, end_timestamp):
+        now = time.perf_counter()
+        bounds = self.gaze_bounds
+        return [
+            Fixation(
+                max(start_timestamp, now - 1),
+                now,
+                left=bounds.left,
+                top=bounds.top,
+                right=bounds.right,
+                bottom=bounds.bottom,
+            )
+        ]
+
+
+def test_controller_serves_reads_from_speculative_ocr():
+    reader = FakeReader()
+    eye_tracker = DwellingEyeTracker(
+        gaze_bounds=SimpleNamespace(left=400, top=400, right=410, bottom=410)
+    )
+    controller = _controller(reader, eye_tracker, speculative_dwell_seconds=0.2)
+    try:
+        deadline = time.perf_counter() + 5
+        while not reader.read_screen_calls and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        assert reader.read_screen_calls == [(100, 100, 710, 710)]
+
+        now = time.perf_counter()
+        contents = controller.read_nearby((now - 0.1, now))
+
+        assert contents.bounding_box == (300, 300, 510, 510)
+        assert reader.read_screen_calls == [(100, 100, 710, 710)]
+        assert controller.stats.hits == 1
+    finally:
+        controller.shutdown()
+
+
+class RepeatedWordReader(FakeReader):
+    def read_screen(self, bounding_box: tuple[int, int, int, int] | None = None):
+        self.read_screen_calls.append(bounding_box)
+        return _contents(
+            bounding_box or self.SCREEN,
+            [
+                _base.OcrWord("foo", 400, 400, 30, 20),
+                _base.OcrWord("foo", 450, 400, 30, 20),
+            ],
+        )
+
+
+def test_speculation_resumes_while_command_awaits_disambiguation():
+    eye_tracker = DwellingEyeTracker(
+        gaze_bounds=SimpleNamespace(left=400, top=400, right=410, bottom=410)
+    )
+    # Too long to dwell during the test.
+    controller = _controller(
+        RepeatedWordReader(), eye_tracker, speculative_dwell_seconds=60
+    )
+    controller.mouse = FakeMouse()
+    speculative_reader = controller._speculative_reader
+    assert speculative_reader
+    try:
+        generator = controller.move_cursor_to_words_generator(
+            "foo", True, time_range=(1, 4)
+        )
+        assert len(next(generator)) == 2
+        # Dropped halfway, but still referenced.
+        assert speculative_reader._running_commands == 0
+
+        generator = controller.move_cursor_to_words_generator(
+            "foo", True, time_range=(1, 4)
+        )
+        locations = next(generator)
+        try:
+            generator.send(locations[1])
+        except StopIteration:
+            pass
+        assert speculative_reader._running_commands == 0
+
+        generator = controller.move_cursor_to_words_generator(
+            "foo", True, time_range=(1, 4)
+        )
+        next(generator)
+        generator.close()
+        assert speculative_reader._running_commands == 0
+    finally:
+        controller.shutdown()
+
+
+class ImageReader:
+    """Reader of a white screen with a red pixel, that tracks concurrent reads."""
+
+    radius = 20
+    search_radius = 10
+    RED_PIXEL = (55, 60)
+
+    def __init__(self, release: threading.Event | None = None):
+        self.screen = Image.new("RGB", (200, 200), "white")
+        self.screen.putpixel(self.RED_PIXEL, (255, 0, 0))
+        self.release = release
+        self.started = threading.Event()
+        self.active = 0
+        self.max_active = 0
+
+    def read_screen(self, bounding_box: tuple[int, int, int, int] | None = None):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        self.started.set()
+        if self.release:
+            self.release.wait()
+        bounding_box = bounding_box or (0, 0, 200, 200)
+        contents = _contents(bounding_box)
+        contents.screenshot = self.screen.crop(bounding_box)
+        self.active -= 1
+        return contents
+
+
+def _assert_red_pixel(contents):
+    left, top, right, bottom = contents.bounding_box
+    assert contents.screenshot.size == (right - left, bottom - top)
+    x, y = ImageReader.RED_PIXEL
+    assert contents.screenshot.getpixel((x - left, y - top)) == (255, 0, 0)
+
+
+def test_recentered_background_read_crops_screenshot():
+    reader = ImageReader()
+    controller = _controller(reader, FakeEyeTracker(gaze_point=(50, 50)))
+    try:
+        controller.start_reading_nearby()
+        contents = controller.read_nearby()
+
+        assert contents.bounding_box == (30, 30, 70, 70)
+        _assert_red_pixel(contents)
+    finally:
+        controller.shutdown()
+
+
+def test_cache_hit_crops_screenshot():
+    reader = ImageReader()
+    cache = OcrCache(cast(screen_ocr.Reader, reader))
+
+    cache.read((1, 4), (20, 20, 120, 120))
+    contents = cache.read((2, 3), (50, 50, 90, 90))
+
+    assert contents.bounding_box == (50, 50, 90, 90)
+    _assert_red_pixel(contents)
+
+
+def test_stale_running_background_read_is_waited_for():
+    release = threading.Event()
+    reader = ImageReader(release)
+    controller = _controller(reader)
+    try:
+        controller.start_reading_nearby()
+        assert reader.started.wait(5)
+        assert controller._pending_read
+        controller._pending_read.start_time -= Controller.PREFETCH_MAX_AGE_SECONDS + 1
+        threading.Timer(0.1, release.set).start()
+        controller.read_nearby((1, 4))
+
+        assert reader.max_active == 1
+    finally:
+        release.set()
+        controller.shutdown()
+
+
+def test_reads_on_different_threads_are_serialized():
+    release = threading.Event()
+    reader = ImageReader(release)
+    cache = OcrCache(cast(screen_ocr.Reader, reader))
+    background = threading.Thread(target=cache.read_uncached, args=((0, 0, 50, 50),))
+    foreground = threading.Thread(target=cache.read, args=((1, 2), (50, 50, 90, 90)))
+    try:
+        background.start()
+        assert reader.started.wait(5)
+        foreground.start()
+        time.sleep(0.05)
+    finally:
+        release.set()
+        background.join()
+        foreground.join()
+
+    assert reader.max_active == 1
+
+
+def test_current_utterance_time_range_starts_with_speech():
+    controller = _controller(FakeReader())
+    try:
+        assert controller.current_utterance_time_range() is None
+        controller.start_reading_nearby()
+        time_range = controller.current_utterance_time_range()
+        assert time_range
+        assert time_range[0] <= time_range[1] <= time.perf_counter()
+
+        assert controller._speech_start_time
+        controller._speech_start_time -= Controller.PREFETCH_MAX_AGE_SECONDS + 1
+        assert controller.current_utterance_time_range() is None
+    finally:
+        controller.shutdown()
@@ -0,0 +1,166 @@
+import json
+
+import pytest
+from screen_ocr import ScreenContents, _base
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from fakes import FakeKeyboard, FakeMouse  # noqa: E402
+
+from gaze_ocr._gaze_history import BoundingBox  # noqa: E402
+from gaze_ocr._gaze_ocr import Controller  # noqa: E402
+from gaze_ocr._recording import (  # noqa: E402
+    SessionRecorder,
+    load_session,
+    replay_session,
+)
+
+
+def _screen_contents(screen_coordinates=None, search_radius=None):
+    words = [
+        _base.OcrWord("hello", 0, 0, 50, 20),
+        _base.OcrWord("world", 60, 0, 50, 20),
+        _base.OcrWord("foo", 120, 0, 30, 20),
+    ]
+    return ScreenContents(
+        screen_coordinates=screen_coordinates,
+        bounding_box=(0, 0, 200, 100),
+        screenshot=Image.new("RGB", (200, 100), "white"),
+        result=_base.OcrResult([_base.OcrLine(words)]),
+        confidence_threshold=0.5,
+        homophones={},
+        search_radius=search_radius,
+    )
+
+
+class FakeReader:
+    radius = 200
+    search_radius = 125
+    confidence_threshold = 0.5
+    homophones = {"to": ["two", "too"]}
+
+    def read_screen(self, bounding_box=None):
+        return _screen_contents()
+
+    def read_nearby(self, screen_coordinates, search_radius=None, crop_radius=None):
+        return _screen_contents(screen_coordinates, self.search_radius)
+
+
+class FakeEyeTracker:
+    is_connected = True
+
+    def get_gaze_point(self):
+        return (80, 10)
+
+    def get_gaze_bounds_during_time_range(self, start_timestamp, end_timestamp):
+        return BoundingBox(left=50, right=110, top=5, bottom=15)
+
+    def get_gaze_points_during_time_range(self, start_timestamp, end_timestamp):
+        return (np.array([10.0, 10.5]), np.array([50.0, 110.0]), np.array([5.0, 15.0]))
+
+
+def _record(path):
+    controller = Controller(
+        FakeReader(),
+        FakeEyeTracker(),
+        mouse=FakeMouse(),
+        keyboard=FakeKeyboard(),
+        recorder=SessionRecorder(str(path)),
+    )
+    controller.move_text_cursor_to_words("world", "after")
+    controller.select_text(
+        "hello",
+        end_words="foo",
+        start_time_range=(10.0, 10.5),
+        end_time_range=(10.0, 10.5),
+    )
+    controller.shutdown()
+
+
+def test_records_commands(tmp_path):
+    path = tmp_path / "session.jsonl"
+    _record(path)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["type"] for line in lines] == ["session", "command", "command"]
+    assert lines[0]["homophones"] == {"to": ["two", "too"]}
+    # The end words of select_text are part of its record.
+    assert [line["name"] for line in lines[1:]] == [
+        "move_text_cursor_to_words_generator",
+        "select_text_generator",
+    ]
+
+    (_, move), (_, select) = list(load_session(str(path)))
+    assert move.arguments["words"] == "world"
+    assert move.gaze_point == (80, 10)
+    assert move.gaze_trace == ([], [], [])
+    assert len(move.locations) == 1
+    assert move.reads[0].screenshot.size == (200, 100)
+    assert select.arguments["start_time_range"] == (10.0, 10.5)
+    assert select.gaze_trace == ([10.0, 10.5], [50.0, 110.0], [5.0, 15.0])
+    assert len(select.reads) == 2
+    assert len(select.locations) == 2
+
+
+def test_replay_matches_recording(tmp_path):
+    path = tmp_path / "session.jsonl"
+    _record(path)
+    # Appending a second session replays with a new Controller.
+    _record(path)
+
+    replayed = replay_session(str(path))
+
+    assert len(replayed) == 4
+    assert all(command.matches_recording for command in replayed)
+    assert [command.read_count for command in replayed] == [1, 1, 1, 1]
+
+
+class RepeatedWordsReader(FakeReader):
+    def read_nearby(self, screen_coordinates, search_radius=None, crop_radius=None):
+        words = [
+            _base.OcrWord(text, left, 0, 30, 20)
+            for text, left in [("foo", 0), ("x", 40), ("foo", 60), ("bar", 120)]
+            + [("bar", 180)]
+        ]
+        return ScreenContents(
+            screen_coordinates=screen_coordinates,
+            bounding_box=(0, 0, 250, 100),
+            screenshot=None,
+            result=_base.OcrResult([_base.OcrLine(words)]),
+            confidence_threshold=0.5,
+            homophones={},
+            search_radius=None,
+        )
+
+
+def test_replay_chooses_each_recorded_disambiguation(tmp_path):
+    path = tmp_path / "session.jsonl"
+    controller = Controller(
+        RepeatedWordsReader(),
+        FakeEyeTracker(),
+        mouse=FakeMouse(),
+        keyboard=FakeKeyboard(),
+        recorder=SessionRecorder(str(path)),
+    )
+    generator = controller.select_text_generator(
+        "foo", True, end_words="bar", select_pause_seconds=0
+    )
+    rounds = []
+    try:
+        candidates = next(generator)
+        while True:
+            rounds.append(candidates)
+            candidates = generator.send(candidates[-1])
+    except StopIteration:
+        pass
+    controller.shutdown()
+    assert len(rounds) == 2
+
+    (replayed,) = replay_session(str(path))
+
+    assert [location["base_coordinates"] for location in replayed.locations] == [
+        [60, 10],
+        [210, 10],
+    ]
+    assert replayed.matches_recording
@@ -0,0 +1,133 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from screen_ocr import ScreenContents, _base
+
+from gaze_ocr._fixations import Fixation
+from gaze_ocr._speculation import SpeculativeReader
+
+
+class DwellingEyeTracker:
+    """Eye tracker whose gaze has rested at the given extent for duration seconds."""
+
+    is_connected = True
+
+    def __init__(self, extent=(100, 100, 110, 110), duration=1.0):
+        self.extent = extent
+        self.duration = duration
+
+    def get_fixations_during_time_range(self, start_timestamp, end_timestamp):
+        now = time.perf_counter()
+        left, top, right, bottom = self.extent
+        return [
+            Fixation(
+                start_timestamp=max(start_timestamp, now - self.duration),
+                end_timestamp=now,
+                left=left,
+                top=top,
+                right=right,
+                bottom=bottom,
+            )
+        ]
+
+
+def _contents(bounding_box):
+    return ScreenContents(
+        screen_coordinates=None,
+        bounding_box=bounding_box,
+        screenshot=None,
+        result=_base.OcrResult([]),
+        confidence_threshold=0.5,
+        homophones={},
+        search_radius=None,
+    )
+
+
+def _speculative_reader(eye_tracker, reads, executor):
+    def read(bounding_box):
+        reads.append(bounding_box)
+        return _contents(bounding_box)
+
+    return SpeculativeReader(
+        eye_tracker, read, executor, dwell_seconds=0.5, padding=50, idle_seconds=0
+    )
+
+
+def test_reads_dwelled_area_once():
+    reads = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        reader = _speculative_reader(DwellingEyeTracker(), reads, executor)
+        reader.poll()
+        results = reader.take_results()
+        reader.poll()
+
+        assert reads == [(50, 50, 160, 160)]
+        assert [result.bounding_box for result in results] == [(50, 50, 160, 160)]
+        assert results[0].screen_contents.bounding_box == (50, 50, 160, 160)
+        assert reader.take_results() == []
+
+
+def test_waits_for_dwell_time_and_idleness():
+    reads = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        eye_tracker = DwellingEyeTracker(duration=0.2)
+        reader = _speculative_reader(eye_tracker, reads, executor)
+        reader.poll()
+        assert reader.take_results() == []
+
+        eye_tracker.duration = 1.0
+        reader.idle_seconds = 60
+        reader.note_speech()
+        reader.poll()
+        assert reader.take_results() == []
+        assert reads == []
+
+
+def test_discards_reads_captured_before_previous_speech():
+    reads = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        reader = _speculative_reader(DwellingEyeTracker(), reads, executor)
+        reader.poll()
+        reader.note_speech()
+        # Still valid for the command spoken next.
+        assert len(reader.take_results()) == 1
+
+        reader.poll()
+        # Capture before the next speech.
+        assert reader._in_flight
+        reader._in_flight.result()
+        reader.note_speech()
+        # The previous command may have changed the screen.
+        reader.note_speech()
+        assert reader.take_results() == []
+        assert len(reads) == 2
+
+
+def test_pauses_while_commands_run():
+    reads = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        reader = _speculative_reader(DwellingEyeTracker(), reads, executor)
+        reader.command_started()
+        reader.poll()
+        assert reads == []
+
+        reader.command_finished()
+        reader.poll()
+        assert reader._in_flight
+        reader._in_flight.result()
+        assert len(reads) == 1
+
+
+def test_commands_mark_speech_if_not_noted():
+    reads = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        reader = _speculative_reader(DwellingEyeTracker(), reads, executor)
+        reader.poll()
+        assert reader._in_flight
+        reader._in_flight.result()
+        reader.command_started()
+        reader.command_finished()
+        # The first command may have changed the screen.
+        reader.command_started()
+        assert reader.take_results() == []
+        reader.command_finished()
@@ -0,0 +1,352 @@
+"""Tests for tile-based readers."""
+
+import functools
+from typing import cast
+
+from PIL import Image, ImageDraw
+from screen_ocr import Reader, ScreenContents, _base
+
+from gaze_ocr import _merging
+from gaze_ocr._gaze_ocr import OcrCache
+from gaze_ocr._tiles import CoarseToFineReader, DirtyTileReader, ParallelTileReader
+
+
+class FakeBackend(_base.OcrBackend):
+    """Backend that reads each band of rows containing dark pixels as a line with a
+    single word."""
+
+    def __init__(self):
+        self.image_sizes: list[tuple[int, int]] = []
+
+    def run_ocr(self, image) -> _base.OcrResult:
+        self.image_sizes.append(image.size)
+        inverted = Image.eval(image.convert("L"), lambda value: 255 - value)
+        dark_rows = [
+            y
+            for y in range(image.height)
+            if inverted.crop((0, y, image.width, y + 1)).getbbox()
+        ]
+        lines = []
+        while dark_rows:
+            top = bottom = dark_rows.pop(0)
+            while dark_rows and dark_rows[0] == bottom + 1:
+                bottom = dark_rows.pop(0)
+            box = inverted.crop((0, top, image.width, bottom + 1)).getbbox()
+            assert box
+            word = _base.OcrWord(
+                f"word{box[0]}",
+                left=box[0],
+                top=top,
+                width=box[2] - box[0],
+                height=bottom + 1 - top,
+            )
+            lines.append(_base.OcrLine([word]))
+        return _base.OcrResult(lines=lines)
+
+
+class FakeScreenReader(Reader):
+    def __init__(self, backend: FakeBackend, screen: Image.Image):
+        super().__init__(backend)
+        self.screen = screen
+
+    def _clean_screenshot(self, bounding_box, clamp_to_main_screen=True):
+        if bounding_box:
+            bounding_box = (
+                max(0, bounding_box[0]),
+                max(0, bounding_box[1]),
+                min(self.screen.width, bounding_box[2]),
+                min(self.screen.height, bounding_box[3]),
+            )
+        else:
+            bounding_box = (0, 0, self.screen.width, self.screen.height)
+        return self.screen.crop(bounding_box), bounding_box
+
+
+def _setup():
+    screen = Image.new("RGB", (400, 200), "white")
+    ImageDraw.Draw(screen).rectangle((20, 20, 40, 30), fill="black")
+    backend = FakeBackend()
+    reader = DirtyTileReader(
+        FakeScreenReader(backend, screen), tile_size=100, margin=10
+    )
+    return screen, backend, reader
+
+
+def test_unchanged_screen_is_not_read_again():
+    _, backend, reader = _setup()
+
+    first = reader.read_screen()
+    second = reader.read_screen()
+
+    assert backend.image_sizes == [(400, 200)]
+    assert first.as_string() == second.as_string() == "word20\n"
+
+
+def test_only_dirty_tile_is_read():
+    screen, backend, reader = _setup()
+    reader.read_screen()
+
+    ImageDraw.Draw(screen).rectangle((320, 120, 340, 130), fill="black")
+    contents = reader.read_screen()
+
+    # The dirty tile plus margin, clipped to the screen.
+    assert backend.image_sizes[1:] == [(110, 110)]
+    assert [
+        (word.left, word.top) for line in contents.result.lines for word in line.words
+    ] == [(20, 20), (320, 120)]
+
+
+def test_tile_is_read_again_if_previous_read_did_not_cover_request():
+    _, backend, reader = _setup()
+    reader.read_screen((0, 0, 50, 50))
+
+    contents = reader.read_screen((0, 0, 100, 100))
+
+    assert len(backend.image_sizes) == 2
+    assert contents.bounding_box == (0, 0, 100, 100)
+    assert contents.as_string() == "word20\n"
+
+
+class NonPillowScreenReader:
+    """Reader whose screenshots aren't Pillow images, like Talon's."""
+
+    def __init__(self):
+        self.captures = []
+        self.reads = []
+
+    def _clean_screenshot(self, bounding_box):
+        self.captures.append(bounding_box)
+        return object(), bounding_box
+
+    def read_screen(self, bounding_box=None):
+        self.reads.append(bounding_box)
+        return ScreenContents(
+            screen_coordinates=None,
+            bounding_box=bounding_box,
+            screenshot=object(),
+            result=_base.OcrResult([]),
+            confidence_threshold=0.5,
+            homophones={},
+            search_radius=None,
+        )
+
+
+def test_non_pillow_screenshots_are_read_without_tiles():
+    ocr_reader = NonPillowScreenReader()
+    reader = DirtyTileReader(cast(Reader, ocr_reader), tile_size=100)
+
+    reader.read_screen((150, 150, 250, 250))
+    reader.read_screen((160, 160, 260, 260))
+
+    # Only the first capture is aligned to the grid.
+    assert ocr_reader.captures == [(100, 100, 300, 300)]
+    assert ocr_reader.reads == [(150, 150, 250, 250), (160, 160, 260, 260)]
+
+
+def _parallel_setup(**kwargs):
+    screen = Image.new("RGB", (400, 400), "white")
+    draw = ImageDraw.Draw(screen)
+    draw.rectangle((20, 20, 40, 30), fill="black")
+    # Within the overlap between the two bands.
+    draw.rectangle((60, 195, 80, 205), fill="black")
+    draw.rectangle((20, 320, 40, 330), fill="black")
+    backend = FakeBackend()
+    kwargs.setdefault("reader_factory", functools.partial(Reader, FakeBackend()))
+    reader = ParallelTileReader(
+        FakeScreenReader(backend, screen), max_workers=2, overlap=100, **kwargs
+    )
+    return backend, reader
+
+
+def _word_boxes(contents):
+    return [
+        (word.left, word.top, word.width, word.height)
+        for line in contents.result.lines
+        for word in line.words
+    ]
+
+
+def test_parallel_reader_stitches_bands():
+    backend, reader = _parallel_setup()
+    try:
+        contents = reader.read_screen()
+    finally:
+        reader.shutdown()
+
+    # Bands are read in the worker processes.
+    assert backend.image_sizes == []
+    assert contents.bounding_box == (0, 0, 400, 400)
+    assert _word_boxes(contents) == [
+        (20, 20, 21, 11),
+        (60, 195, 21, 11),
+        (20, 320, 21, 11),
+    ]
+
+
+def test_parallel_reader_reads_small_area_directly():
+    backend, reader = _parallel_setup()
+    try:
+        contents = reader.read_screen((0, 0, 100, 100))
+    finally:
+        reader.shutdown()
+
+    assert backend.image_sizes == [(100, 100)]
+    assert _word_boxes(contents) == [(20, 20, 21, 11)]
+
+
+def test_parallel_reader_without_factory_reads_serially():
+    backend, reader = _parallel_setup(reader_factory=None)
+    try:
+        contents = reader.read_screen()
+    finally:
+        reader.shutdown()
+
+    # The wrapped reader isn't shared between threads.
+    assert backend.image_sizes == [(400, 400)]
+    assert reader._executor is None
+    assert _word_boxes(contents) == [
+        (20, 20, 21, 11),
+        (60, 195, 21, 11),
+        (20, 320, 21, 11),
+    ]
+
+
+class LayoutScreenReader:
+    """Reader for a screen with fixed words, which reads downscaled captures with
+    the last letter of each word misread."""
+
+    radius = 50
+    confidence_threshold = 0.75
+    homophones: dict[str, list[str]] = {}
+
+    def __init__(self, words: list[_base.OcrWord], size=(1000, 800)):
+        self.words = words
+        self.size = size
+        self.capture_box = None
+        self.reads: list[tuple[tuple[int, int, int, int], tuple[int, int]]] = []
+
+    def _clean_screenshot(self, bounding_box):
+        self.capture_box = bounding_box or (0, 0, *self.size)
+        left, top, right, bottom = self.capture_box
+        return Image.new("RGB", (right - left, bottom - top), "white"), (
+            self.capture_box
+        )
+
+    def read_screen(self, bounding_box=None):
+        screenshot, bounding_box = self._clean_screenshot(bounding_box)
+        return self.read_image(screenshot, bounding_box)
+
+    def read_image(self, image, bounding_box=None):
+        self.reads.append((bounding_box, image.size))
+        capture_width = self.capture_box[2] - self.capture_box[0]
+        is_coarse = (
+            bounding_box == (0, 0, image.width, image.height)
+            and image.width < capture_width
+        )
+        scale = image.width / capture_width if is_coarse else 1
+        area = self.capture_box if is_coarse else bounding_box
+        words = []
+        for word in self.words:
+            if not (
+                area[0] <= word.left
+                and word.left + word.width <= area[2]
+                and area[1] <= word.top
+                and word.top + word.height <= area[3]
+            ):
+                continue
+            if not is_coarse:
+                words.append(word)
+            else:
+                words.append(
+                    _base.OcrWord(
+                        word.text[:-1] + "x",
+                        (word.left - area[0]) * scale,
+                        (word.top - area[1]) * scale,
+                        word.width * scale,
+                        word.height * scale,
+                    )
+                )
+        return ScreenContents(
+            screen_coordinates=None,
+            bounding_box=bounding_box,
+            screenshot=image,
+            result=_base.OcrResult([_base.OcrLine([word]) for word in words]),
+            confidence_threshold=self.confidence_threshold,
+            homophones=self.homophones,
+            search_radius=None,
+        )
+
+
+def _layout_reader():
+    return LayoutScreenReader(
+        [
+            _base.OcrWord("hello", 100, 100, 50, 20),
+            _base.OcrWord("target", 700, 600, 60, 20),
+            _base.OcrWord("other", 900, 100, 50, 20),
+        ]
+    )
+
+
+def test_coarse_to_fine_reader_reads_around_candidates():
+    reader = _layout_reader()
+    coarse_to_fine = CoarseToFineReader(reader, window_padding=(100, 20))
+
+    contents = coarse_to_fine.read_screen(None, "a target")
+
+    assert reader.reads == [
+        ((0, 0, 500, 400), (500, 400)),
+        ((600, 580, 860, 640), (260, 60)),
+    ]
+    assert contents.bounding_box == (0, 0, 1000, 800)
+    assert contents.as_string() == "target\n"
+    assert contents.find_matching_words("target")
+
+
+def test_coarse_to_fine_reader_falls_back_to_center_or_whole_area():
+    reader = _layout_reader()
+    coarse_to_fine = CoarseToFineReader(reader)
+
+    contents = coarse_to_fine.read_screen((0, 0, 300, 300), "missing")
+    assert reader.reads[1:] == [((100, 100, 200, 200), (100, 100))]
+    assert contents.as_string() == "hello\n"
+
+    reader.reads.clear()
+    contents = coarse_to_fine.read_screen(None, "missing")
+    assert reader.reads[1:] == [((0, 0, 1000, 800), (1000, 800))]
+    assert contents.as_string() == "hello\ntarget\nother\n"
+
+
+def test_ocr_cache_reads_large_areas_coarse_to_fine():
+    reader = _layout_reader()
+    cache = OcrCache(
+        cast(Reader, reader), coarse_to_fine=True, coarse_to_fine_min_area=200 * 200
+    )
+
+    cache.read((1, 2), (0, 0, 1000, 800), "target")
+    cache.read((1, 2), (0, 0, 1000, 800), "target")
+    # Partial reads aren't cached as a reading of the whole area.
+    assert len(reader.reads) == 4
+
+    cache.read((1, 2), (0, 0, 100, 100), "target")
+    cache.read((1, 2), (0, 0, 100, 100), "target")
+    # Small areas are read at full resolution and cached.
+    assert reader.reads[4:] == [((0, 0, 100, 100), (100, 100))]
+
+
+def test_ocr_cache_stores_fine_windows_with_their_bounds():
+    reader = _layout_reader()
+    cache = OcrCache(
+        cast(Reader, reader), coarse_to_fine=True, coarse_to_fine_min_area=200 * 200
+    )
+
+    cache.read((1, 2), (0, 0, 1000, 800), "target")
+    assert len(reader.reads) == 2
+    window = reader.reads[1][0]
+    assert _merging.contains(window, (650, 580, 800, 640))
+
+    contents = cache.read((1, 2), (650, 580, 800, 640), "target")
+    # Served by the window that was read at full resolution.
+    assert len(reader.reads) == 2
+    assert contents.as_string() == "target\n"
+    assert contents.screenshot.size == (150, 60)
+    assert cache.stats.hits == 1
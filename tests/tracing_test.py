@@ -0,0 +1,71 @@
+import json
+import threading
+import time
+
+from gaze_ocr._tracing import Tracer
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+
+    with tracer.span("outer"):
+        pass
+
+    assert tracer.chrome_trace()["traceEvents"] == []
+
+
+def test_disabled_tracer_does_not_build_arguments():
+    tracer = Tracer()
+
+    def args():
+        raise AssertionError("Arguments were built.")
+
+    with tracer.span("outer", args):
+        pass
+
+
+def test_spans_export_as_nested_complete_events():
+    tracer = Tracer(enabled=True)
+
+    with tracer.span("outer", lambda: {"words": "hello", "count": 2}):
+        time.sleep(0.001)
+        with tracer.span("inner", lambda: {"bounds": (0, 0, 10, 10)}):
+            pass
+
+    events = tracer.chrome_trace()["traceEvents"]
+    assert [event["name"] for event in events] == ["inner", "outer"]
+    inner, outer = events
+    assert inner["ph"] == outer["ph"] == "X"
+    assert inner["tid"] == outer["tid"] == threading.get_ident()
+    assert outer["ts"] <= inner["ts"]
+    assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    assert outer["args"] == {"words": "hello", "count": 2}
+    assert inner["args"] == {"bounds": "(0, 0, 10, 10)"}
+    json.dumps(tracer.chrome_trace())
+
+
+def test_ring_buffer_drops_oldest_spans():
+    tracer = Tracer(capacity=2, enabled=True)
+
+    for name in ["first", "second", "third"]:
+        with tracer.span(name):
+            pass
+
+    assert [event["name"] for event in tracer.chrome_trace()["traceEvents"]] == [
+        "second",
+        "third",
+    ]
+
+
+def test_span_is_recorded_when_body_raises():
+    tracer = Tracer(enabled=True)
+
+    try:
+        with tracer.span("failing"):
+            raise ValueError()
+    except ValueError:
+        pass
+
+    assert [event["name"] for event in tracer.chrome_trace()["traceEvents"]] == [
+        "failing"
+    ]